@@ -0,0 +1,3 @@
+# Full suite: ./bench.sh [--shape SHAPE] [--scale X] [--output results.json]
+# Inline tokenizer only: PYTHONPATH=src python3 -m benchmarks.inline
+PYTHONPATH=src python3 -m benchmarks "$@"
@@ -0,0 +1,186 @@
+import asyncio
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from generate_content import generate_page_streaming, page_dest_path, render_page, resolve_template, streaming_threshold_bytes
+from output_writer import write_output
+from page_cache import PageCache
+from sharding import shard_of
+from site_index import SiteIndex
+from template import Template
+
+default_io_concurrency = 8
+# Marks the end of a queue's input; each consumer of a queue receives one
+done = None
+
+
+class PageError(Exception):
+    # Raised by a pipeline stage so the first failing page (or content directory that
+    # cannot be listed) stops the whole build
+    def __init__(self, from_path: Path, dest_path: Path, error: Exception):
+        super().__init__(f"{type(error).__name__}: {error}")
+        self.from_path = from_path
+        self.dest_path = dest_path
+
+
+def list_directory(directory: Path) -> list:
+    # Runs in a thread: both iterdir and is_dir touch the filesystem
+    return [(path, path.is_dir()) for path in directory.iterdir()]
+
+def read_source(from_path: Path) -> str | None:
+    # None tells the render stage to stream the page straight from the file instead
+    if from_path.stat().st_size >= streaming_threshold_bytes:
+        return None
+    with open(from_path, "r") as from_file:
+        return from_file.read()
+
+def write_page(dest_path: Path, page: str) -> bool:
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    return write_output(dest_path, page)
+
+def stream_page(from_path: Path, template, dest_path: Path, verbose: bool=False) -> tuple:
+    # Large sources bypass the queues: they are read, rendered and written block by block
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    links = []
+    metadata = {}
+    if not generate_page_streaming(from_path, template, dest_path, verbose, links, metadata):
+        raise OSError(f"could not stream '{from_path}'")
+    return None, links, metadata
+
+async def discover(content_dir_path: Path, dest_dir_path: Path, pages: asyncio.Queue, limit: asyncio.Semaphore, shard: tuple | None=None):
+    # Lists sibling directories concurrently (at most `limit` at a time) and queues each
+    # page as soon as its directory has been listed, so reading starts before the walk ends
+    async def walk(directory: Path, dest_dir: Path):
+        async with limit:
+            try:
+                entries = await asyncio.to_thread(list_directory, directory)
+            except OSError as e:
+                raise PageError(directory, dest_dir, e) from e
+        subdirectories = []
+        for path, is_dir in entries:
+            if is_dir:
+                subdirectories.append(walk(path, dest_dir / path.name))
+                continue
+            dest_path = page_dest_path(path, dest_dir)
+            if shard is None or shard_of(dest_path.relative_to(dest_dir_path).as_posix(), shard[1]) == shard[0]:
+                await pages.put((path, dest_path))
+        await asyncio.gather(*subdirectories)
+    await walk(content_dir_path, dest_dir_path)
+
+async def read_pages(pages: asyncio.Queue, sources: asyncio.Queue, template_path: Path):
+    while (page := await pages.get()) is not done:
+        from_path, dest_path = page
+        print(f"Generating page from '{from_path}' to '{dest_path}' using '{template_path}'")
+        try:
+            from_content = await asyncio.to_thread(read_source, from_path)
+        except Exception as e:
+            raise PageError(from_path, dest_path, e) from e
+        await sources.put((from_path, dest_path, from_content))
+
+async def render_pages(sources: asyncio.Queue, outputs: asyncio.Queue, executor, template, verbose: bool=False, cache: PageCache | None=None):
+    loop = asyncio.get_running_loop()
+    while (source := await sources.get()) is not done:
+        from_path, dest_path, from_content = source
+        try:
+            if from_content is None:
+                page, links, metadata = await asyncio.to_thread(stream_page, from_path, template, dest_path, verbose)
+            else:
+                page, links, metadata = await loop.run_in_executor(executor, render_page, from_content, template, cache, verbose)
+        except Exception as e:
+            raise PageError(from_path, dest_path, e) from e
+        await outputs.put((from_path, dest_path, page, links, metadata))
+
+async def write_pages(outputs: asyncio.Queue, site_index: SiteIndex | None=None):
+    while (output := await outputs.get()) is not done:
+        from_path, dest_path, page, links, metadata = output
+        if page is not None:
+            try:
+                await asyncio.to_thread(write_page, dest_path, page)
+            except Exception as e:
+                raise PageError(from_path, dest_path, e) from e
+        if site_index is not None:
+            site_index.add_page(from_path, dest_path, links, metadata)
+
+async def run_stage(workers: list, queue: asyncio.Queue, consumers: int):
+    # Waits for every worker of a stage, then tells each consumer of the next stage to stop
+    await asyncio.gather(*workers)
+    for _ in range(consumers):
+        await queue.put(done)
+
+async def run_pipeline(content_dir_path: Path, dest_dir_path: Path, template: Template, executor, render_workers: int, io_concurrency: int, queue_size: int, verbose: bool=False, cache: PageCache | None=None, site_index: SiteIndex | None=None, shard: tuple | None=None):
+    # discover -> pages -> read -> sources -> render -> outputs -> write. Every queue is
+    # bounded, so a slow stage holds the ones before it back instead of buffering the site.
+    pages = asyncio.Queue(queue_size)
+    sources = asyncio.Queue(queue_size)
+    outputs = asyncio.Queue(queue_size)
+    async with asyncio.TaskGroup() as group:
+        listing = asyncio.Semaphore(io_concurrency)
+        group.create_task(run_stage([discover(content_dir_path, dest_dir_path, pages, listing, shard)], pages, io_concurrency))
+        readers = [read_pages(pages, sources, template.path) for _ in range(io_concurrency)]
+        group.create_task(run_stage(readers, sources, render_workers))
+        renderers = [render_pages(sources, outputs, executor, template, verbose, cache) for _ in range(render_workers)]
+        group.create_task(run_stage(renderers, outputs, io_concurrency))
+        for _ in range(io_concurrency):
+            group.create_task(write_pages(outputs, site_index))
+
+def generate_pages_async(content_dir_path: str | Path, template: str | Path | Template, dest_dir_path: str | Path, basepath: str | Path, jobs: int=1, io_concurrency: int=default_io_concurrency, queue_size: int | None=None, verbose=False, cache: PageCache | None=None, site_index: SiteIndex | None=None, shard: tuple | None=None) -> bool:
+    # Same output as generate_pages_recursive, but directory listing, reads and writes run
+    # in threads (up to io_concurrency of each at once) and overlap with parsing and
+    # rendering, which run on `jobs` worker processes (or one worker thread when jobs is 1).
+    # Meant for content and output on high-latency storage such as NFS.
+    if not isinstance(content_dir_path, (str, Path)):
+        print(f"content_dir_path must be a string or Path object.")
+        return False
+    content_dir_path = Path(content_dir_path)
+    if not isinstance(dest_dir_path, (str, Path)):
+        print(f"dest_dir_path must be a string or Path object.")
+        return False
+    dest_dir_path = Path(dest_dir_path)
+    if not isinstance(basepath, (str, Path)):
+        print(f"basepath must be a string or Path object.")
+        return False
+    basepath = Path(basepath)
+    if io_concurrency < 1 or jobs < 1:
+        print(f"io_concurrency and jobs must be at least 1.")
+        return False
+    if queue_size is None:
+        queue_size = 2 * max(io_concurrency, jobs)
+
+    template = resolve_template(template, basepath)
+    if template is None:
+        return False
+
+    # The default thread pool runs the blocking file operations: enough threads for every
+    # reader and writer, plus one per render worker for pages streamed from large sources
+    io_threads = ThreadPoolExecutor(max_workers=2 * io_concurrency + jobs)
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else ThreadPoolExecutor(max_workers=1)
+    if jobs > 1:
+        # Starts the worker processes now: forking once the I/O threads are running could
+        # copy a lock some thread holds into the children
+        executor.submit(int).result()
+    async def build():
+        asyncio.get_running_loop().set_default_executor(io_threads)
+        await run_pipeline(content_dir_path, dest_dir_path, template, executor, jobs, io_concurrency, queue_size, verbose, cache, site_index, shard)
+
+    success = True
+    try:
+        asyncio.run(build())
+    except* PageError as group:
+        error = group.exceptions[0]
+        print(f"Error generating '{error.dest_path}' from '{error.from_path}': {error}")
+        print(f"Stopping build after failure on '{error.from_path}'.")
+        success = False
+    except* Exception as group:
+        # Anything else a stage raised (e.g. while indexing a page); reported the same way
+        # instead of escaping as an ExceptionGroup traceback
+        error = group.exceptions[0]
+        print(f"Error generating pages from '{content_dir_path}': {type(error).__name__}: {error}")
+        print(f"Stopping build after failure.")
+        success = False
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        io_threads.shutdown(wait=True)
+    if cache is not None:
+        cache.evict()
+    return success
@@ -0,0 +1,36 @@
+# Runs the benchmark suite over synthetic corpora and prints or saves JSON results.
+#   PYTHONPATH=src python3 -m benchmarks [--shape SHAPE ...] [--scale X] [--output results.json]
+import argparse
+import json
+
+from benchmarks.corpus import shapes
+from benchmarks.suite import run_suite, stage_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown parsing, rendering and full builds.")
+    parser.add_argument("--shape", action="append", choices=list(shapes), help="corpus shape to run (repeatable; default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the page count (block count for few-huge)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the best time is kept")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for the end-to-end build")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    suite = run_suite(args.shape or list(shapes), args.scale, args.seed, args.repeat, args.jobs)
+
+    for result in suite["results"]:
+        print(f"{result['shape']}: {result['pages']} pages, {result['bytes'] / 1_000_000:.2f} MB")
+        for name in stage_names:
+            stage = result["stages"][name]
+            print(f"  {name:<22} {stage['seconds']:>9.4f}s {stage['mb_per_second']:>9.2f} MB/s")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(suite, output_file, indent=2)
+        print(f"Wrote results to '{args.output}'")
+    else:
+        print(json.dumps(suite, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Deterministic generator of synthetic content trees for benchmarking. The same
+# shape, scale and seed always produce byte-identical files.
+import random
+
+from pathlib import Path
+
+template_html = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+words = (
+    "the of and to in is was for on that with as by at from it his an were are which this be "
+    "or has had first one their its new after who they two her she been other when there all "
+    "during into school time may years more most only over city some world would where later up "
+    "such used many can state about national out known university united then made"
+).split()
+
+# name: (pages, blocks per page, directory depth, inline density, share of code blocks)
+shapes = {
+    "many-small": (1000, 12, 1, 0.15, 0.05),
+    "few-huge": (3, 20000, 0, 0.15, 0.05),
+    "deep": (400, 12, 8, 0.15, 0.05),
+    "inline-heavy": (200, 40, 1, 0.7, 0.0),
+    "code-heavy": (200, 40, 1, 0.1, 0.6),
+}
+
+
+def make_sentence(rng: random.Random, inline_density: float) -> str:
+    parts = []
+    for _ in range(rng.randint(8, 20)):
+        word = rng.choice(words)
+        if rng.random() < inline_density:
+            kind = rng.randrange(5)
+            if kind == 0:
+                word = f"**{word}**"
+            elif kind == 1:
+                word = f"_{word}_"
+            elif kind == 2:
+                word = f"`{word}()`"
+            elif kind == 3:
+                word = f"[{word}](/posts/{rng.choice(words)})"
+            else:
+                word = f"![{word}](/images/{rng.choice(words)}.png)"
+        parts.append(word)
+    return " ".join(parts).capitalize() + "."
+
+def make_block(rng: random.Random, inline_density: float, code_share: float) -> str:
+    if rng.random() < code_share:
+        lines = [f"    {rng.choice(words)}_{rng.choice(words)} = {rng.randint(0, 999)}" for _ in range(rng.randint(3, 12))]
+        # A blank line inside the fence exercises the fence-aware block scanner
+        lines.insert(len(lines) // 2, "")
+        return "```\n" + "\n".join(lines) + "\n```"
+    kind = rng.randrange(10)
+    if kind == 0:
+        return f"{'#' * rng.randint(2, 4)} {make_sentence(rng, 0)[:40]}"
+    if kind == 1:
+        return "\n".join(f"- {make_sentence(rng, inline_density)}" for _ in range(rng.randint(2, 6)))
+    if kind == 2:
+        return "\n".join(f"{i}. {make_sentence(rng, inline_density)}" for i in range(1, rng.randint(3, 7)))
+    if kind == 3:
+        return "\n".join(f"> {make_sentence(rng, inline_density)}" for _ in range(rng.randint(1, 3)))
+    return "\n".join(make_sentence(rng, inline_density) for _ in range(rng.randint(1, 5)))
+
+def make_page(rng: random.Random, title: str, blocks: int, inline_density: float, code_share: float) -> str:
+    body = [f"# {title}"]
+    body.extend(make_block(rng, inline_density, code_share) for _ in range(blocks))
+    return "\n\n".join(body) + "\n"
+
+def generate_corpus(root: str | Path, shape: str, scale: float=1.0, seed: int=0) -> dict:
+    # Writes root/content/**.md, root/static/index.css and root/template.html.
+    # Returns a summary with the page count and total markdown bytes.
+    if shape not in shapes:
+        raise ValueError(f"Unknown corpus shape '{shape}'; expected one of {', '.join(shapes)}")
+    pages, blocks, depth, inline_density, code_share = shapes[shape]
+    if shape == "few-huge":
+        blocks = max(1, int(blocks * scale))
+    else:
+        pages = max(1, int(pages * scale))
+
+    rng = random.Random(f"{seed}:{shape}")
+    root = Path(root)
+    content_dir = root / "content"
+    total_bytes = 0
+    for number in range(pages):
+        directory = content_dir
+        for level in range(depth):
+            directory = directory / f"section{(number >> level) % 4}"
+        page_dir = directory / f"post{number}"
+        page_dir.mkdir(parents=True, exist_ok=True)
+        markdown = make_page(rng, f"Post {number}", blocks, inline_density, code_share)
+        (page_dir / "index.md").write_text(markdown)
+        total_bytes += len(markdown.encode("utf-8"))
+
+    (root / "static").mkdir(parents=True, exist_ok=True)
+    (root / "static" / "index.css").write_text("body { margin: 0; }\n")
+    (root / "template.html").write_text(template_html)
+    return {"shape": shape, "scale": scale, "seed": seed, "pages": pages, "bytes": total_bytes}
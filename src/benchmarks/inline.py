@@ -0,0 +1,58 @@
+# Compares the single-pass inline scanner in text_to_text_nodes with the original
+# chain of split_nodes_* passes (split_text_nodes, also the scanner's fallback).
+#   PYTHONPATH=src python3 -m benchmarks.inline [--lines N] [--repeat N]
+import argparse
+import random
+import time
+
+from inline_markdown import split_text_nodes, text_to_text_nodes
+
+inline_pieces = [
+    "plain words here ",
+    "**bold text** ",
+    "_italic text_ ",
+    "`inline code` ",
+    "![an image](/images/picture.png) ",
+    "[a link](https://www.example.com/path) ",
+    "more plain text, with punctuation. ",
+]
+
+def make_lines(count: int, pieces_per_line: int=12, seed: int=0) -> list:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(inline_pieces) for _ in range(pieces_per_line)) for _ in range(count)]
+
+def time_function(function, lines: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            function(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(line_count: int=5000, repeat: int=5) -> dict:
+    lines = make_lines(line_count)
+    for line in lines:
+        if text_to_text_nodes(line) != split_text_nodes(line):
+            raise AssertionError(f"scanner and split chain disagree on {line!r}")
+    megabytes = sum(len(line) for line in lines) / 1_000_000
+    results = {}
+    for name, function in [("split_chain", split_text_nodes), ("scanner", text_to_text_nodes)]:
+        seconds = time_function(function, lines, repeat)
+        results[name] = {"seconds": seconds, "mb_per_second": megabytes / seconds}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inline markdown tokenizing.")
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.lines, args.repeat)
+    for name, result in results.items():
+        print(f"{name:<12} {result['seconds']:.4f}s  {result['mb_per_second']:.2f} MB/s")
+    speedup = results["split_chain"]["seconds"] / results["scanner"]["seconds"]
+    print(f"scanner speedup: {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Per-stage and end-to-end timings over a synthetic corpus.
+import contextlib
+import io
+import platform
+import shutil
+import tempfile
+import time
+
+from pathlib import Path
+
+from benchmarks.corpus import generate_corpus
+from block_markdown import BlockType, iter_blocks, markdown_to_blocks, markdown_to_html_node
+from generate_content import generate_pages_recursive
+from inline_markdown import text_to_text_nodes
+
+stage_names = ["markdown_to_blocks", "text_to_text_nodes", "markdown_to_html_node", "to_html", "build"]
+
+
+def inline_texts(markdown: str) -> list:
+    # The strings the block converters hand to text_to_text_nodes
+    texts = []
+    for block_type, lines in iter_blocks(markdown):
+        match block_type:
+            case BlockType.CODE:
+                continue
+            case BlockType.ULIST | BlockType.OLIST:
+                texts.extend(line.split(" ", 1)[1] for line in lines)
+            case BlockType.HEADING:
+                texts.append(lines[0].split(" ", 1)[1])
+            case BlockType.QUOTE:
+                texts.append(" ".join(" ".join(lines).split()).replace("> ", ""))
+            case _:
+                texts.append(" ".join(" ".join(lines).split()))
+    return texts
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_shape(shape: str, scale: float=1.0, seed: int=0, repeat: int=3, jobs: int=1) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        corpus = generate_corpus(root, shape, scale, seed)
+        sources = [path.read_text() for path in sorted((root / "content").rglob("*.md"))]
+        texts = [text for source in sources for text in inline_texts(source)]
+        trees = [markdown_to_html_node(source) for source in sources]
+        dest = root / "docs"
+
+        def build():
+            if dest.exists():
+                shutil.rmtree(dest)
+            dest.mkdir()
+            # generate_page reports every page; keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                if not generate_pages_recursive(root / "content", root / "template.html", dest, "/", jobs):
+                    raise RuntimeError(f"Build of the '{shape}' corpus failed")
+
+        stages = {
+            "markdown_to_blocks": lambda: [markdown_to_blocks(source) for source in sources],
+            "text_to_text_nodes": lambda: [text_to_text_nodes(text) for text in texts],
+            "markdown_to_html_node": lambda: [markdown_to_html_node(source) for source in sources],
+            "to_html": lambda: [tree.to_html() for tree in trees],
+            "build": build,
+        }
+        megabytes = corpus["bytes"] / 1_000_000
+        results = {}
+        for name in stage_names:
+            seconds = best_time(stages[name], repeat)
+            results[name] = {"seconds": round(seconds, 6), "mb_per_second": round(megabytes / seconds, 3)}
+        results["build"]["pages_per_second"] = round(corpus["pages"] / results["build"]["seconds"], 1)
+
+    return {**corpus, "repeat": repeat, "jobs": jobs, "stages": results}
+
+def run_suite(shapes: list, scale: float=1.0, seed: int=0, repeat: int=3, jobs: int=1) -> dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [run_shape(shape, scale, seed, repeat, jobs) for shape in shapes],
+    }
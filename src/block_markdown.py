@@ -1,7 +1,13 @@
+import re
+
 from enum import Enum
 
+import inline_memo
+import profiler
+
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from inline_markdown import text_node_to_html_node, text_to_text_nodes
+from link_checker import collect_block_links
 
 
 class BlockType(Enum):
@@ -11,6 +17,11 @@ class BlockType(Enum):
     QUOTE = "quote"
     ULIST = "unordered_list"
     OLIST = "ordered_list"
+    FRONT_MATTER = "front_matter"
+
+# A front-matter line: "key: value", with a key that can also be a template placeholder
+front_matter_pattern = re.compile(r"(\w[\w-]*)\s*:(.*)")
+front_matter_fence = "---"
 
 def block_to_block_type(block: str) -> BlockType:
     if is_code_block(block):
@@ -69,26 +80,153 @@ def is_ordered_list_block(block_list: list) -> bool:
 def markdown_to_blocks(markdown: str) -> list:
     if type(markdown) != str:
         raise TypeError("Markdown must be a string.")
-    return [block.strip() for block in markdown.split("\n\n") if block != ""]
+    return ["\n".join(lines) for _, lines in iter_blocks(markdown)]
+
+def iter_blocks(markdown):
+    # Scans the markdown line by line and lazily yields (BlockType, lines) for each block.
+    # `markdown` may be a string or any iterable of lines, such as an open file.
+    # Blocks are separated by blank lines, except inside a ``` fence, which runs
+    # until its closing ``` even if it contains blank lines.
+    for _, block_type, block_lines in iter_numbered_blocks(markdown):
+        yield block_type, block_lines
+
+def iter_numbered_blocks(markdown):
+    # Same scan as iter_blocks, yielding (start line, BlockType, lines); lines count from 1.
+    # A "---" on the first line opens a front-matter header, which runs to the next "---"
+    # line and is yielded as a FRONT_MATTER block of the lines in between.
+    if isinstance(markdown, str):
+        lines = markdown.split("\n")
+    else:
+        lines = (line.rstrip("\n") for line in markdown)
+
+    block_lines = []
+    start_line = 0
+    in_fence = False
+    in_front_matter = False
+    for line_number, line in enumerate(lines, start=1):
+        if in_front_matter:
+            if line.rstrip() == front_matter_fence:
+                in_front_matter = False
+                yield 1, BlockType.FRONT_MATTER, block_lines
+                block_lines = []
+            else:
+                block_lines.append(line)
+            continue
+        if line_number == 1 and line.rstrip() == front_matter_fence:
+            in_front_matter = True
+            continue
+
+        if in_fence:
+            block_lines.append(line)
+            if line.rstrip().endswith("```"):
+                in_fence = False
+                block_lines[-1] = line.rstrip()
+                yield start_line, BlockType.CODE, block_lines
+                block_lines = []
+            continue
+
+        if line.strip() == "":
+            if block_lines:
+                yield start_line, *finish_block(block_lines)
+                block_lines = []
+            continue
+
+        if not block_lines:
+            start_line = line_number
+            line = line.lstrip()
+            if line.startswith("```"):
+                # A fence can open and close on the same line, e.g. ```code```
+                if len(line.rstrip()) > 6 and line.rstrip().endswith("```"):
+                    yield start_line, BlockType.CODE, [line.rstrip()]
+                else:
+                    block_lines.append(line)
+                    in_fence = True
+                continue
+        block_lines.append(line)
+
+    if in_front_matter:
+        raise ValueError("Front matter opened on line 1 is never closed with '---'.")
+    if block_lines:
+        if in_fence:
+            # An unterminated fence runs to the end of the document
+            yield start_line, BlockType.CODE, block_lines
+        else:
+            yield start_line, *finish_block(block_lines)
+
+def parse_front_matter(block_lines: list) -> dict:
+    # "key: value" lines (from line 2 on) -> {key: value}. Keys are letters, digits,
+    # underscores and hyphens ("last-modified"). Blank lines are skipped and a value in
+    # matching quotes loses them.
+    metadata = {}
+    for line_number, line in enumerate(block_lines, start=2):
+        if line.strip() == "":
+            continue
+        match = front_matter_pattern.fullmatch(line.strip())
+        if match is None:
+            raise ValueError(f"Front matter line {line_number} is not 'key: value' (keys may only use letters, digits, '_' and '-'): '{line}'")
+        value = match.group(2).strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        metadata[match.group(1)] = value
+    return metadata
+
+def update_metadata(metadata: dict, block_type: BlockType, block_lines: list):
+    # Fills a page's metadata from its front matter and, unless the front matter set one,
+    # takes "title" from the first "# " heading
+    if block_type == BlockType.FRONT_MATTER:
+        metadata.update(parse_front_matter(block_lines))
+    elif "title" not in metadata and block_type != BlockType.CODE and f"{block_lines[0]} ".startswith("# "):
+        metadata["title"] = "\n".join(block_lines)[2:]
+
+def finish_block(block_lines: list) -> tuple:
+    block_lines[-1] = block_lines[-1].rstrip()
+    return classify_block_lines(block_lines), block_lines
+
+def classify_block_lines(block_lines: list) -> BlockType:
+    # Same rules as block_to_block_type for non-code blocks, checked in a single pass over the lines
+    if len(block_lines) == 1 and is_heading_block(block_lines):
+        return BlockType.HEADING
+    quote = ulist = olist = True
+    for number, line in enumerate(block_lines, start=1):
+        quote = quote and line.startswith(">")
+        ulist = ulist and line[:2] == "- "
+        olist = olist and line.startswith(f"{number}. ")
+        if not (quote or ulist or olist):
+            return BlockType.PARAGRAPH
+    if quote:
+        return BlockType.QUOTE
+    if ulist:
+        return BlockType.ULIST
+    return BlockType.OLIST
 
-def markdown_to_html_node(markdown: str, verbose=False) -> HTMLNode:
+def markdown_to_html_node(markdown: str, verbose=False, links: list=None, metadata: dict=None) -> HTMLNode:
+    # When `links` is a list, every link and image URL is appended to it as [line, url].
+    # When `metadata` is a dict, it is filled with the page's front matter and title.
     if verbose:
         print(f"markdown:-->{markdown}")
+    # scan markdown into blocks, one pass over its lines
+    return blocks_to_html_node(iter_numbered_blocks(markdown), verbose, links, metadata)
+
+def blocks_to_html_node(blocks, verbose=False, links: list=None, metadata: dict=None) -> HTMLNode:
+    # `blocks` are (start line, BlockType, lines) as yielded by iter_numbered_blocks
     # create ParentNode (HTMLNode) for entire document; this ParentNode should be a single <div> element
     document_children = [] # need to fill children before we can initialize the ParentNode
 
-    # split markdown into blocks
-    blocks = markdown_to_blocks(markdown)
-    if verbose:
-        print(f"blocks: {blocks}")
-
-    # for each block
-    for block in blocks:
+    for start_line, block_type, block_lines in blocks:
+        if verbose:
+            print(f"block: {block_lines}")
+            print(f"block_type: {block_type}")
+        if metadata is not None:
+            update_metadata(metadata, block_type, block_lines)
+        if block_type == BlockType.FRONT_MATTER:
+            continue
         # Convert block to HTMLNode
-        block_node = block_to_html_node(block, verbose)
+        block_node = block_lines_to_html_node(block_type, block_lines)
+        if links is not None:
+            links.extend(collect_block_links(block_node, start_line, block_lines))
         # Add ParentNode to children of the document node
         document_children.append(block_node)
-       
+
     document_node = ParentNode(tag="div", children=document_children)
     if verbose:
         print(f"document_children: {document_children}")
@@ -96,6 +234,19 @@ def markdown_to_html_node(markdown: str, verbose=False) -> HTMLNode:
         print(f"document_node.to_html(): [starts on next line]\n{document_node.to_html()}")
     return document_node
 
+def iter_blocks_html(blocks, resolver=None, links: list=None):
+    # Streams a document's HTML block by block, so only one block's nodes exist at a time.
+    # Takes the same numbered blocks as blocks_to_html_node; front matter renders nothing.
+    yield "<div>"
+    for start_line, block_type, block_lines in blocks:
+        if block_type == BlockType.FRONT_MATTER:
+            continue
+        block_node = block_lines_to_html_node(block_type, block_lines)
+        if links is not None:
+            links.extend(collect_block_links(block_node, start_line, block_lines))
+        yield from block_node.iter_html(resolver)
+    yield "</div>"
+
 def block_to_html_node(block, verbose=False):
     if verbose:
         print(f"block: {block}")
@@ -123,11 +274,32 @@ def block_to_html_node(block, verbose=False):
         print(f"block_node: {block_node}")
     return block_node
 
+def block_lines_to_html_node(block_type: BlockType, block_lines: list) -> HTMLNode:
+    if block_type == BlockType.CODE:
+        return code_lines_to_html_node(block_lines)
+    block = "\n".join(block_lines)
+    match block_type:
+        case BlockType.PARAGRAPH:
+            return paragraph_to_html_node(block)
+        case BlockType.HEADING:
+            return heading_to_html_node(block)
+        case BlockType.QUOTE:
+            return quote_to_html_node(block)
+        case BlockType.ULIST:
+            return ulist_to_html_node(block)
+        case BlockType.OLIST:
+            return olist_to_html_node(block)
+        case _:
+            raise TypeError(f"Unrecognized BlockType:'{block_type}'")
+
+# The block converters below build nodes from parser output with ParentNode._make and
+# LeafNode._make, skipping constructor validation on the hot path.
+
 def paragraph_to_html_node(block: str) -> HTMLNode:
     block = remove_unnecessary_whitespace_and_newlines(block)
     block_tag = "p"
     block_html_nodes = text_to_children_html_nodes(block)
-    return ParentNode(tag=block_tag, children=block_html_nodes)
+    return ParentNode._make(tag=block_tag, children=block_html_nodes)
 
 def heading_to_html_node(block: str) -> HTMLNode:
     block = remove_unnecessary_whitespace_and_newlines(block)
@@ -137,49 +309,73 @@ def heading_to_html_node(block: str) -> HTMLNode:
     # Remove leading "#"s and single space
     block = " ".join(sections[1:])
     block_html_nodes = text_to_children_html_nodes(block)
-    return ParentNode(tag=block_tag, children=block_html_nodes)
+    return ParentNode._make(tag=block_tag, children=block_html_nodes)
 
 def code_to_html_node(block: str) -> HTMLNode:
     # Strip leading triple backticks and newlines, and trailing backticks (not newlines) 
     block = block[4:-3]
     # Leave the text within the block unconverted
-    plain_text_node = LeafNode(tag=None, value=block)
+    plain_text_node = LeafNode._make(tag=None, value=block)
     # Wrap the text in a <code> tag
-    code_node = ParentNode(tag="code", children=[plain_text_node])
+    code_node = ParentNode._make(tag="code", children=[plain_text_node])
     # Wrap the <code> element with <pre> tags
-    return ParentNode(tag="pre", children=[code_node])
+    return ParentNode._make(tag="pre", children=[code_node])
+
+def code_lines_to_html_node(block_lines: list) -> HTMLNode:
+    # Text after the opening ``` is an info string (e.g. a language name) and is dropped
+    if len(block_lines) == 1:
+        code = block_lines[0][3:-3]
+    else:
+        code = "".join(f"{line}\n" for line in block_lines[1:-1])
+        last_line = block_lines[-1]
+        # The closing line may carry code before its ```; an unterminated fence has no closing line
+        code += last_line[:-3] if last_line.endswith("```") else f"{last_line}\n"
+    plain_text_node = LeafNode._make(tag=None, value=code)
+    code_node = ParentNode._make(tag="code", children=[plain_text_node])
+    return ParentNode._make(tag="pre", children=[code_node])
 
 def quote_to_html_node(block: str) -> HTMLNode:
     block = remove_unnecessary_whitespace_and_newlines(block)
     block = block.replace("> ", "")
     block_html_nodes = text_to_children_html_nodes(block)
-    return ParentNode(tag="blockquote", children=block_html_nodes)
+    return ParentNode._make(tag="blockquote", children=block_html_nodes)
 
 def ulist_to_html_node(block: str) -> HTMLNode:
     lines = block.split("\n")
     # Remove leading "- " each line
     lines = [line[2:] for line in lines]
     # Wrap each line in an <li> tag
-    block_html_nodes = [ParentNode(tag="li", children=text_to_children_html_nodes(line)) for line in lines]
+    block_html_nodes = [ParentNode._make(tag="li", children=text_to_children_html_nodes(line)) for line in lines]
     # Wrap entire block in a <ul> tag
-    return ParentNode(tag="ul", children=block_html_nodes)
+    return ParentNode._make(tag="ul", children=block_html_nodes)
 
 def olist_to_html_node(block: str) -> HTMLNode:
     lines = block.split("\n")
     # Remove the leading number, decimal point, and space from each line
     lines = [". ".join(line.split(". ")[1:]) for line in lines]
     # Wrap each line in an <li> tag
-    block_html_nodes = [ParentNode(tag="li", children=text_to_children_html_nodes(line)) for line in lines]
+    block_html_nodes = [ParentNode._make(tag="li", children=text_to_children_html_nodes(line)) for line in lines]
     # Wrap entire block in an <ol> tag
-    return ParentNode(tag="ol", children=block_html_nodes)
+    return ParentNode._make(tag="ol", children=block_html_nodes)
 
 def text_to_children_html_nodes(block: str, verbose=False) -> list:
+    # Repeated inline text is rebuilt from the memo, when one is enabled, instead of parsed again
+    memo = inline_memo.current
+    if memo is not None:
+        records = memo.get(block)
+        if records is not None:
+            return [LeafNode._make(tag=tag, value=value, props=None if props is None else dict(props)) for tag, value, props in records]
     # convert text within block into TextNodes of correct type using text_to_text_nodes()
-    block_text_nodes = text_to_text_nodes(block)
+    if profiler.current is not None:
+        block_text_nodes = profiler.current.timed("text_to_text_nodes", text_to_text_nodes, block)
+    else:
+        block_text_nodes = text_to_text_nodes(block)
     if verbose:
         print(f"block_text_nodes: {block_text_nodes}")
     # convert TextNodes to LeafNodes using text_node_to_html_node()
     block_html_nodes = [text_node_to_html_node(text_node) for text_node in block_text_nodes]
+    if memo is not None:
+        memo.put(block, block_html_nodes)
     return block_html_nodes
 
 def remove_unnecessary_whitespace_and_newlines(text: str) -> str:
@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Kept to the standard library, so the client starts in a fraction of a full build's time
+default_socket_path = ".build/daemon.sock"
+
+
+def send_request(socket_path: str, request: dict, output=sys.stdout) -> bool:
+    # Sends one request to the build daemon and copies its output to `output` as it
+    # arrives. Returns the daemon's verdict.
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(socket_path)
+            client.sendall(f"{json.dumps(request)}\n".encode("utf-8"))
+            with client.makefile("r", encoding="utf-8") as replies:
+                for line in replies:
+                    message = json.loads(line)
+                    if "output" in message:
+                        output.write(message["output"])
+                        output.flush()
+                    elif "success" in message:
+                        return message["success"]
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No build daemon is listening on '{socket_path}'; start one with 'python3 src/main.py --daemon'.")
+        return False
+    print("The build daemon closed the connection before the build finished.")
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask a running build daemon to build the site.")
+    parser.add_argument("command", nargs="?", choices=("build", "status", "stop"), default="build")
+    parser.add_argument("paths", nargs="*", metavar="PATH", help="with build, the changed files or directories; only these are checked (default: every watched file)")
+    parser.add_argument("--force", action="store_true", help="rebuild from the manifest even if no watched file changed")
+    parser.add_argument("--socket", default=default_socket_path, metavar="PATH", help=f"the daemon's socket (default: {default_socket_path})")
+    args = parser.parse_args()
+    request = {"command": args.command}
+    if args.force:
+        request["force"] = True
+    if args.paths:
+        if args.command != "build":
+            parser.error("paths can only be given with build")
+        # The daemon may run in another directory
+        request["paths"] = [os.path.abspath(path) for path in args.paths]
+    sys.exit(0 if send_request(args.socket, request) else 1)
+
+if __name__ == "__main__":
+    main()
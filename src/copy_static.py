@@ -1,6 +1,23 @@
+import json
+import os
 import shutil
 
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+
+from manifest import hash_file, load_manifest, save_manifest
+
+try:
+    import fcntl
+except ImportError: # not available on Windows; reflinks fall back to copying
+    fcntl = None
+
+FICLONE = 0x40049409
+link_modes = ("copy", "hardlink", "reflink")
+# Written to the root of dest when assets are fingerprinted: {"index.css": "index.<hash>.css", ...}
+asset_manifest_name = "asset-manifest.json"
+fingerprint_length = 10
+# Fetched by browsers and crawlers under fixed names, so never fingerprinted
+fixed_name_assets = {"favicon.ico", "robots.txt"}
 
 
 def copy_directory_recursive(src: str | Path, dest: str | Path, remove_dest: bool=True, verbose: bool = False) -> bool:
@@ -20,16 +37,90 @@ def copy_directory_recursive(src: str | Path, dest: str | Path, remove_dest: boo
 
     if remove_dest and not remove_directory_contents(dest_path, verbose):
         return False
+    dest_path.mkdir(parents=True, exist_ok=True)
     
     for dir_or_file in src_path.iterdir():
         new_path = dest_path / dir_or_file.name
         if dir_or_file.is_dir():
-            new_path.mkdir()
+            new_path.mkdir(exist_ok=True)
             copy_directory_recursive(dir_or_file, new_path, False, verbose)
-        elif shutil.copy(dir_or_file, dest_path) and verbose:
+        elif shutil.copy2(dir_or_file, dest_path) and verbose:
             print(f"Copied file '{dir_or_file}' to '{new_path}'")
     return True
 
+def fingerprinted_name(key: str, file_hash: str) -> str:
+    # "images/a.png" -> "images/a.<hash>.png"; the hash goes before the last suffix only
+    if key in fixed_name_assets:
+        return key
+    path = PurePosixPath(key)
+    fingerprint = file_hash[:fingerprint_length]
+    if path.suffix:
+        return path.with_name(f"{path.stem}.{fingerprint}{path.suffix}").as_posix()
+    return path.with_name(f"{path.name}.{fingerprint}").as_posix()
+
+def copy_directory_fingerprinted(src: str | Path, dest: str | Path, remove_dest: bool=True, verbose: bool=False) -> bool:
+    # Like copy_directory_recursive, but every file is written under its fingerprinted
+    # name, so it can be served with immutable cache headers; the original names are
+    # recorded in the asset manifest
+    if not isinstance(src, (str, Path)):
+        print(f"src must be a string or Path object.")
+        return False
+    src_path = Path(src)
+    if not isinstance(dest, (str, Path)):
+        print(f"dest must be a string or Path object.")
+        return False
+    dest_path = Path(dest)
+
+    if remove_dest and not remove_directory_contents(dest_path, verbose):
+        return False
+    dest_path.mkdir(parents=True, exist_ok=True)
+
+    assets = {}
+    for src_file in sorted(src_path.rglob("*")):
+        if not src_file.is_file():
+            continue
+        key = src_file.relative_to(src_path).as_posix()
+        assets[key] = fingerprinted_name(key, hash_file(src_file))
+        dest_file = dest_path / assets[key]
+        try:
+            dest_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src_file, dest_file)
+        except Exception as e:
+            print(f"Error copying '{src_file}' to '{dest_file}': {e}")
+            return False
+        if verbose:
+            print(f"Copied file '{src_file}' to '{dest_file}'")
+    return save_asset_manifest(dest_path, assets)
+
+def fingerprint_asset_urls(src: str | Path) -> dict:
+    # The URL map copy_directory_fingerprinted would record for src, without copying anything
+    src_path = Path(src)
+    return {
+        f"/{key}": f"/{fingerprinted_name(key, hash_file(src_file))}"
+        for src_file in sorted(src_path.rglob("*")) if src_file.is_file()
+        for key in [src_file.relative_to(src_path).as_posix()]
+    }
+
+def save_asset_manifest(dest: str | Path, assets: dict) -> bool:
+    asset_manifest_path = Path(dest) / asset_manifest_name
+    try:
+        with open(asset_manifest_path, "w") as asset_manifest_file:
+            json.dump(dict(sorted(assets.items())), asset_manifest_file, indent=2)
+    except OSError as e:
+        print(f"Error writing asset manifest '{asset_manifest_path}': {e}")
+        return False
+    return True
+
+def load_asset_urls(dest: str | Path) -> dict:
+    # The asset manifest as a URL rewrite map, {"/index.css": "/index.<hash>.css", ...};
+    # empty if assets were not fingerprinted
+    try:
+        with open(Path(dest) / asset_manifest_name, "r") as asset_manifest_file:
+            assets = json.load(asset_manifest_file)
+    except (OSError, ValueError):
+        return {}
+    return {f"/{key}": f"/{name}" for key, name in assets.items()}
+
 def remove_directory_contents(directory: str | Path, verbose: bool=False) -> bool:
     if not isinstance(directory, (str, Path)):
         print(f"'{directory}' must be a string or Path object.")
@@ -56,3 +147,172 @@ def remove_directory_contents(directory: str | Path, verbose: bool=False) -> boo
         return False
     return True
 
+
+def sync_directory(src: str | Path, dest: str | Path, manifest_path: str | Path, use_hash: bool=False, link_mode: str="copy", verbose: bool=False, fingerprint: bool=False) -> bool:
+    # Incremental alternative to copy_directory_recursive(..., remove_dest=True): only new or
+    # changed files are written, files whose source was deleted are removed, and everything
+    # else in dest (including generated pages) is left alone. With fingerprint, files are
+    # placed under fingerprinted names as in copy_directory_fingerprinted.
+    if not isinstance(src, (str, Path)):
+        print(f"src must be a string or Path object.")
+        return False
+    src_path = Path(src)
+    if not isinstance(dest, (str, Path)):
+        print(f"dest must be a string or Path object.")
+        return False
+    dest_path = Path(dest)
+    if link_mode not in link_modes:
+        print(f"link_mode must be one of {', '.join(link_modes)}.")
+        return False
+    if not src_path.is_dir():
+        print(f"Directory not found at '{src_path}'.")
+        return False
+
+    manifest = load_manifest(manifest_path)
+    old_files = manifest["static"]
+    new_files = {}
+    copied = 0
+
+    for src_file in sorted(src_path.rglob("*")):
+        if not src_file.is_file():
+            continue
+        key = src_file.relative_to(src_path).as_posix()
+        stat = src_file.stat()
+        record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        old_record = old_files.get(key)
+        if use_hash:
+            record["hash"] = old_files.get(key, {}).get("hash")
+        if fingerprint:
+            # The name depends on the content, so the hash is always needed; it is reused
+            # from the manifest while size and mtime are unchanged
+            if old_record and old_record.get("hash") and old_record.get("size") == stat.st_size and old_record.get("mtime_ns") == stat.st_mtime_ns:
+                record["hash"] = old_record["hash"]
+            else:
+                record["hash"] = hash_file(src_file)
+            record["name"] = fingerprinted_name(key, record["hash"])
+            if old_record and old_record.get("name") != record["name"]:
+                old_record = None
+        elif old_record and "name" in old_record:
+            old_record = None
+        dest_file = dest_path / record.get("name", key)
+
+        if is_file_unchanged(src_file, dest_file, stat, old_record, use_hash, record):
+            new_files[key] = record
+            continue
+
+        try:
+            dest_file.parent.mkdir(parents=True, exist_ok=True)
+            place_file(src_file, dest_file, link_mode)
+        except Exception as e:
+            print(f"Error copying '{src_file}' to '{dest_file}': {e}")
+            return False
+        if use_hash:
+            record["hash"] = hash_file(src_file)
+        new_files[key] = record
+        copied += 1
+        if verbose:
+            print(f"Copied file '{src_file}' to '{dest_file}'")
+
+    removed = 0
+    old_names = {record.get("name", key) for key, record in old_files.items()}
+    new_names = {record.get("name", key) for key, record in new_files.items()}
+    for name in old_names - new_names:
+        stale_file = dest_path / name
+        if stale_file.is_file() or stale_file.is_symlink():
+            stale_file.unlink()
+            removed += 1
+            if verbose:
+                print(f"Removed stale file '{stale_file}'")
+            remove_empty_parents(stale_file.parent, dest_path)
+
+    print(f"Synced '{src_path}' to '{dest_path}': {copied} copied, {len(new_files) - copied} unchanged, {removed} removed.")
+    if fingerprint:
+        if not save_asset_manifest(dest_path, {key: record["name"] for key, record in new_files.items()}):
+            return False
+    elif any("name" in record for record in old_files.values()):
+        # Fingerprinting was switched off; the old asset manifest no longer applies
+        (dest_path / asset_manifest_name).unlink(missing_ok=True)
+    manifest["static"] = new_files
+    return save_manifest(manifest_path, manifest)
+
+def is_file_unchanged(src_file: Path, dest_file: Path, stat, old_record: dict | None, use_hash: bool, record: dict) -> bool:
+    if not dest_file.exists():
+        return False
+    if old_record is None:
+        # Nothing recorded yet (e.g. first sync into an existing tree): compare against dest itself
+        dest_stat = dest_file.stat()
+        if dest_stat.st_size == stat.st_size and dest_stat.st_mtime_ns == stat.st_mtime_ns:
+            return True
+        if use_hash and dest_stat.st_size == stat.st_size:
+            record["hash"] = hash_file(src_file)
+            return record["hash"] == hash_file(dest_file)
+        return False
+    if old_record.get("size") == stat.st_size and old_record.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if use_hash and old_record.get("size") == stat.st_size and old_record.get("hash"):
+        # Touched but identical content: record the new mtime and keep dest as it is
+        record["hash"] = hash_file(src_file)
+        return record["hash"] == old_record["hash"]
+    return False
+
+def place_file(src_file: Path, dest_file: Path, link_mode: str):
+    # dest is always unlinked first, so a previous hardlink to src is never written through
+    if dest_file.exists() or dest_file.is_symlink():
+        dest_file.unlink()
+    if link_mode == "hardlink":
+        try:
+            os.link(src_file, dest_file)
+            return
+        except OSError:
+            pass # e.g. src and dest on different filesystems
+    elif link_mode == "reflink":
+        if reflink_file(src_file, dest_file):
+            return
+    shutil.copy2(src_file, dest_file)
+
+def reflink_file(src_file: Path, dest_file: Path) -> bool:
+    # Copy-on-write clone (Btrfs, XFS, ...) via the Linux FICLONE ioctl
+    if fcntl is None:
+        return False
+    try:
+        with open(src_file, "rb") as src_stream, open(dest_file, "wb") as dest_stream:
+            fcntl.ioctl(dest_stream.fileno(), FICLONE, src_stream.fileno())
+    except OSError:
+        if dest_file.exists():
+            dest_file.unlink()
+        return False
+    shutil.copystat(src_file, dest_file)
+    return True
+
+def remove_unlisted_files(directory: str | Path, keep: set, verbose: bool=False) -> bool:
+    # Deletes every file under directory whose relative path ("blog/index.html") is not in
+    # keep, then the directories left empty. A full build syncs into its output and uses this
+    # to drop what it no longer produces, instead of emptying the output first.
+    if not isinstance(directory, (str, Path)):
+        print(f"directory must be a string or Path object.")
+        return False
+    path = Path(directory)
+    if not path.is_dir():
+        return True
+    removed = 0
+    # Reverse order visits a directory's contents before the directory itself
+    for entry in sorted(path.rglob("*"), reverse=True):
+        try:
+            if entry.is_dir() and not entry.is_symlink():
+                if not any(entry.iterdir()):
+                    entry.rmdir()
+            elif entry.relative_to(path).as_posix() not in keep:
+                entry.unlink()
+                removed += 1
+                if verbose:
+                    print(f"Removed stale file '{entry}'")
+        except OSError as e:
+            print(f"Error removing '{entry}': {e}")
+            return False
+    print(f"Removed {removed} stale file(s) from '{path}'.")
+    return True
+
+def remove_empty_parents(directory: Path, root: Path):
+    while directory != root and directory.is_dir() and not any(directory.iterdir()):
+        directory.rmdir()
+        directory = directory.parent
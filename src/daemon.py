@@ -0,0 +1,138 @@
+import json
+import os
+import socket
+import socketserver
+import time
+
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from watch import Watcher
+
+
+class ClientStream:
+    # File-like object that forwards everything printed during a request to the client as
+    # {"output": text} lines. A client that hangs up doesn't stop the build.
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.connected = True
+
+    def send(self, message: dict):
+        if not self.connected:
+            return
+        try:
+            self.wfile.write(f"{json.dumps(message)}\n".encode("utf-8"))
+            self.wfile.flush()
+        except OSError:
+            self.connected = False
+
+    def write(self, text: str) -> int:
+        if text:
+            self.send({"output": text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    # One request per connection: a JSON line such as {"command": "build"}. The reply is a
+    # stream of {"output": ...} lines ending with {"success": true|false}.
+    def handle(self):
+        stream = ClientStream(self.wfile)
+        try:
+            request = json.loads(self.rfile.readline())
+            command = request["command"]
+        except (ValueError, KeyError, TypeError):
+            stream.write("Malformed request; expected a JSON line with a 'command'.\n")
+            stream.send({"success": False})
+            return
+        with redirect_stdout(stream):
+            success = self.server.build_daemon.handle(command, request)
+        stream.send({"success": success})
+
+
+class BuildDaemon:
+    # Keeps a Watcher (and with it the content snapshot, the page cache and the compiled
+    # template) alive between builds and runs a build for every request on a Unix domain
+    # socket. Requests are served one at a time, so builds never overlap.
+    def __init__(self, watcher: Watcher, socket_path: str | Path):
+        self.watcher = watcher
+        self.socket_path = Path(socket_path)
+        self.builds = 0
+        self.started = time.monotonic()
+        self.stopping = False
+
+    def handle(self, command: str, request: dict) -> bool:
+        if command == "build":
+            paths = request.get("paths")
+            if paths is not None and not (isinstance(paths, list) and all(isinstance(path, str) for path in paths)):
+                print("'paths' must be a list of file or directory paths.")
+                return False
+            return self.build(request.get("force", False), paths)
+        if command == "status":
+            return self.status()
+        if command == "stop":
+            print("Stopping build daemon.")
+            self.stopping = True
+            return True
+        print(f"Unknown command '{command}'.")
+        return False
+
+    def build(self, force: bool=False, paths: list | None=None) -> bool:
+        # Only what changed since the last build is rebuilt; force rebuilds from the
+        # manifest as a fresh incremental build would. `paths`, the files or directories
+        # the client knows changed, spares the daemon stat'ing every watched file.
+        started = time.perf_counter()
+        self.builds += 1
+        changed = self.watcher.poll(paths)
+        if force:
+            try:
+                success = self.watcher.build()
+            except Exception as e:
+                print(f"Rebuild failed: {type(e).__name__}: {e}")
+                success = False
+        elif changed:
+            success = self.watcher.rebuild(changed)
+        else:
+            print("No changes; the site is up to date.")
+            success = True
+        print(f"Build {self.builds} finished in {time.perf_counter() - started:.3f}s.")
+        return success
+
+    def status(self) -> bool:
+        cache = self.watcher.cache
+        cache_stats = "disabled" if cache is None else f"{cache.hits} hit(s), {cache.misses} miss(es)"
+        print(f"Build daemon for '{self.watcher.content_dir_path}' -> '{self.watcher.dest_dir_path}': "
+              f"{self.builds} build(s), {len(self.watcher.snapshot)} file(s) tracked, page cache {cache_stats}, "
+              f"up {time.monotonic() - self.started:.0f}s.")
+        return True
+
+    def serve(self) -> bool:
+        if not self.claim_socket():
+            return False
+        with socketserver.UnixStreamServer(str(self.socket_path), BuildRequestHandler) as server:
+            server.build_daemon = self
+            # Only the owner may trigger builds
+            os.chmod(self.socket_path, 0o600)
+            print(f"Build daemon listening on '{self.socket_path}'.")
+            try:
+                while not self.stopping:
+                    server.handle_request()
+            finally:
+                self.socket_path.unlink(missing_ok=True)
+        return True
+
+    def claim_socket(self) -> bool:
+        # A socket file nobody is listening on was left by a daemon that died; replace it
+        if not self.socket_path.exists():
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            return True
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()
+                return True
+        print(f"A build daemon is already listening on '{self.socket_path}'.")
+        return False
@@ -1,14 +1,42 @@
+import hashlib
+import itertools
+import json
+
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from block_markdown import markdown_to_html_node
+import profiler
+
+from block_markdown import BlockType, blocks_to_html_node, iter_blocks_html, iter_numbered_blocks, markdown_to_html_node, update_metadata
+from link_checker import LinkIndex
+from manifest import hash_file, hash_text, load_manifest, save_manifest
+from minify import minify_chunks
+from output_writer import OutputWriter, write_output
+from page_cache import PageCache, parser_version
+from page_metadata import MetadataIndex
+from sharding import shard_pages
+from site_index import SiteIndex
+from template import Template, load_template
+
+# Sources at least this large are converted block by block straight from the file,
+# instead of being read, parsed and rendered as a whole
+streaming_threshold_bytes = 8 * 1024 * 1024
 
 def extract_title(markdown: str):
-    sections = markdown.split("\n\n")
-    for section in sections:
-        if section.startswith("# "):
-            return section[2:]
+    # The front matter's title, else the first "# " heading. Page generation gets the title
+    # from the parse itself; this scans only as far as the title.
+    metadata = {}
+    for _, block_type, block_lines in iter_numbered_blocks(markdown):
+        update_metadata(metadata, block_type, block_lines)
+        if "title" in metadata:
+            return metadata["title"]
     raise ValueError("Markdown does not contain a header.")
 
+def page_title(metadata: dict) -> str:
+    if "title" not in metadata:
+        raise ValueError("Markdown does not contain a header.")
+    return metadata["title"]
+
 def generate_page(from_path: str | Path, template_path:str | Path, dest_path: str | Path, basepath: str | Path, verbose: bool=False) -> bool:
     if not isinstance(from_path, (str, Path)):
         print(f"from_path must be a string or Path object.")
@@ -27,7 +55,39 @@ def generate_page(from_path: str | Path, template_path:str | Path, dest_path: st
         return False
     basepath = Path(basepath)
 
-    print(f"Generating page from '{from_path}' to '{dest_path}' using '{template_path}'")
+    template = load_template(template_path, basepath)
+    if template is None:
+        return False
+    return generate_page_with_template(from_path, template, dest_path, verbose)
+
+def parse_markdown(markdown: str, cache: PageCache | None=None, verbose: bool=False, links: list=None, metadata: dict=None):
+    # Reuses the parsed tree from the page cache when this exact source was parsed before.
+    # When `links` is a list, the page's [line, url] links are appended to it; when
+    # `metadata` is a dict, it is filled with the page's front matter and title.
+    if cache is None:
+        return markdown_to_html_node(markdown, verbose, links, metadata)
+    source_hash = hash_text(markdown)
+    entry = cache.get_page(source_hash)
+    if entry is None:
+        page_links = []
+        page_metadata = {}
+        html_node = markdown_to_html_node(markdown, verbose, page_links, page_metadata)
+        cache.put(source_hash, html_node, page_links, page_metadata)
+    else:
+        html_node, page_links, page_metadata = entry
+    if links is not None:
+        links.extend(page_links)
+    if metadata is not None:
+        metadata.update(page_metadata)
+    return html_node
+
+def generate_page_with_template(from_path: Path, template: Template, dest_path: Path, verbose: bool=False, cache: PageCache | None=None, links: list=None, metadata: dict=None) -> bool:
+    # `links` and `metadata`, when given, are filled as in parse_markdown
+    print(f"Generating page from '{from_path}' to '{dest_path}' using '{template.path}'")
+    if profiler.current is not None:
+        return generate_page_profiled(from_path, template, dest_path, profiler.current, verbose, cache, links, metadata)
+    if from_path.exists() and from_path.stat().st_size >= streaming_threshold_bytes:
+        return generate_page_streaming(from_path, template, dest_path, verbose, links, metadata)
 
     try:
         with open(from_path, 'r') as from_file:
@@ -35,39 +95,125 @@ def generate_page(from_path: str | Path, template_path:str | Path, dest_path: st
     except FileNotFoundError as fnfe:
         print(f"Source file '{from_path}' not found.")
         return False
-    
+
+    values = page_values(from_content, template, cache, verbose, links, metadata)
     try:
-        with open(template_path, 'r') as template_file:
-            template_content = template_file.read()
-    except FileNotFoundError as fnfe:
-        print(f"Template file '{template_path}' not found.")
+        with OutputWriter(dest_path) as dest_file:
+            template.write(dest_file, values)
+    except Exception as e:
+        print(f"Error writing to '{dest_path}': {e}")
         return False
-    
-    html = markdown_to_html_node(from_content, verbose).to_html()
-    title = extract_title(from_content)
+    return True
+
+def page_values(from_content: str, template: Template, cache: PageCache | None=None, verbose: bool=False, links: list=None, metadata: dict=None) -> dict:
+    # The template slot values for a page. Content is a lazy stream of chunks: link and
+    # image URLs are resolved as the nodes are rendered, while the template's own
+    # attributes were resolved when it was compiled.
+    if metadata is None:
+        metadata = {}
+    html_node = parse_markdown(from_content, cache, verbose, links, metadata)
+    html_chunks = html_node.iter_html(template.resolver)
+    return slot_values(template, metadata, minify_chunks(html_chunks) if template.minify else html_chunks)
 
-    template_content = template_content.replace("{{ Title }}", title)
-    template_content = template_content.replace("{{ Content }}", html)
-    template_content = template_content.replace('href="/', f'href="{basepath}/')
-    template_content = template_content.replace('src="/', f'src="{basepath}/')
+def slot_values(template: Template, metadata: dict, content) -> dict:
+    # Every other slot in the template is filled from the page's front matter, and left
+    # empty on pages that don't set it
+    values = {slot: metadata.get(slot, "") for slot in template.slots}
+    values["Title"] = page_title(metadata)
+    values["Content"] = content
+    return values
 
+def render_page(from_content: str, template: Template, cache: PageCache | None=None, verbose: bool=False) -> tuple:
+    # Returns (page, links, metadata) with the whole page rendered to a string, for
+    # callers that hand the page to a separate writer
+    links = []
+    metadata = {}
+    page = template.render(page_values(from_content, template, cache, verbose, links, metadata))
+    return page, links, metadata
+
+def generate_page_streaming(from_path: Path, template: Template, dest_path: Path, verbose: bool=False, links: list=None, metadata: dict=None) -> bool:
+    # Constant-memory pipeline for very large sources: blocks are read from the file,
+    # rendered and written into the template's Content slot one at a time. Memory is
+    # bounded by the largest block, plus any blocks before the title, which are held
+    # until the title is known. The page cache is bypassed.
+    if metadata is None:
+        metadata = {}
     try:
-        with open(dest_path, 'w') as dest_file:
-            dest_file.write(template_content)
-    except Exception as e:
-        print(f"Error writing to '{dest_path}': {e}")
+        from_file = open(from_path, 'r')
+    except FileNotFoundError as fnfe:
+        print(f"Source file '{from_path}' not found.")
         return False
+
+    with from_file:
+        blocks = iter_numbered_blocks(from_file)
+        head_blocks = []
+        # Front matter can only come first, so once the title is known so is every other key
+        for start_line, block_type, block_lines in blocks:
+            update_metadata(metadata, block_type, block_lines)
+            if block_type != BlockType.FRONT_MATTER:
+                head_blocks.append((start_line, block_type, block_lines))
+            if "title" in metadata:
+                break
+
+        html_chunks = iter_blocks_html(itertools.chain(head_blocks, blocks), template.resolver, links)
+        values = slot_values(template, metadata, minify_chunks(html_chunks) if template.minify else html_chunks)
+        try:
+            with OutputWriter(dest_path) as dest_file:
+                template.write(dest_file, values)
+        except OSError as e:
+            print(f"Error writing to '{dest_path}': {e}")
+            return False
     return True
 
-def generate_pages_recursive(content_dir_path: str | Path, template_path: str | Path, dest_dir_path: str | Path, basepath: str| Path, verbose=False) -> bool:
+def generate_page_profiled(from_path: Path, template: Template, dest_path: Path, build_profiler: profiler.BuildProfiler, verbose: bool=False, cache: PageCache | None=None, links: list=None, metadata: dict=None) -> bool:
+    # Produces the same page as generate_page_with_template, but runs each stage to
+    # completion instead of streaming so every stage can be timed on its own
+    build_profiler.start_page(from_path.as_posix())
+    try:
+        try:
+            from_content = build_profiler.timed("read", from_path.read_text)
+        except FileNotFoundError as fnfe:
+            print(f"Source file '{from_path}' not found.")
+            return False
+
+        entry = None
+        if cache is not None:
+            source_hash = hash_text(from_content)
+            entry = build_profiler.timed("cache", cache.get_page, source_hash)
+        if entry is None:
+            page_links = []
+            page_metadata = {}
+            blocks = build_profiler.timed("markdown_to_blocks", lambda: list(iter_numbered_blocks(from_content)))
+            html_node = build_profiler.timed("block_to_html_node", blocks_to_html_node, blocks, verbose, page_links, page_metadata)
+            if cache is not None:
+                build_profiler.timed("cache", cache.put, source_hash, html_node, page_links, page_metadata)
+        else:
+            html_node, page_links, page_metadata = entry
+        if links is not None:
+            links.extend(page_links)
+        if metadata is not None:
+            metadata.update(page_metadata)
+        if template.minify:
+            html = build_profiler.timed("to_html", lambda: "".join(minify_chunks(html_node.iter_html(template.resolver))))
+        else:
+            html = build_profiler.timed("to_html", html_node.to_html, template.resolver)
+        page = build_profiler.timed("template", template.render, slot_values(template, page_metadata, html))
+
+        try:
+            build_profiler.timed("write", write_output, dest_path, page)
+        except Exception as e:
+            print(f"Error writing to '{dest_path}': {e}")
+            return False
+        return True
+    finally:
+        build_profiler.end_page()
+
+def generate_pages_recursive(content_dir_path: str | Path, template: str | Path | Template, dest_dir_path: str | Path, basepath: str| Path, jobs: int=1, verbose=False, cache: PageCache | None=None, site_index: SiteIndex | None=None, shard: tuple | None=None) -> bool:
+    # With shard=(index, count), only that shard's slice of the discovered pages is generated
     if not isinstance(content_dir_path, (str, Path)):
         print(f"content_dir_path must be a string or Path object.")
         return False
     content_dir_path = Path(content_dir_path)
-    if not isinstance(template_path, (str, Path)):
-        print(f"template_path must be a string or Path object.")
-        return False
-    template_path = Path(template_path)
     if not isinstance(dest_dir_path, (str, Path)):
         print(f"dest_dir_path must be a string or Path object.")
         return False
@@ -76,16 +222,215 @@ def generate_pages_recursive(content_dir_path: str | Path, template_path: str |
         print(f"basepath must be a string or Path object.")
         return False
     basepath = Path(basepath)
-    
+
+    pages = discover_pages(content_dir_path, dest_dir_path)
+    if shard is not None:
+        pages = shard_pages(pages, dest_dir_path, shard)
+    return generate_pages(pages, template, basepath, jobs, verbose, cache, site_index)
+
+def discover_pages(content_dir_path: str | Path, dest_dir_path: str | Path) -> list:
+    # Returns (source, destination) pairs in directory walk order
+    content_dir_path = Path(content_dir_path)
+    dest_dir_path = Path(dest_dir_path)
+    pages = []
     for dir_or_file in content_dir_path.iterdir():
         if dir_or_file.is_dir():
-            new_dir_path = dest_dir_path / dir_or_file.name
-            new_dir_path.mkdir()
-            print(f"Created new directory: {new_dir_path}")
-            if not generate_pages_recursive(dir_or_file, template_path, new_dir_path, basepath, verbose):
-                return False
+            pages.extend(discover_pages(dir_or_file, dest_dir_path / dir_or_file.name))
         else:
-            new_file_path = dest_dir_path / dir_or_file.name.replace("md", "html")
-            if not generate_page(dir_or_file, template_path, new_file_path, basepath, verbose):
+            pages.append((dir_or_file, page_dest_path(dir_or_file, dest_dir_path)))
+    return pages
+
+def page_dest_path(from_path: Path, dest_dir_path: Path) -> Path:
+    return dest_dir_path / from_path.name.replace("md", "html")
+
+def resolve_template(template: str | Path | Template, basepath: str | Path) -> Template | None:
+    # The page generators take either a template path, compiled here with the plain
+    # basepath resolver, or a Template from load_template carrying the UrlResolver (asset
+    # URL rewrites, image sizes) and minify setting every page should be rendered with
+    if isinstance(template, Template):
+        return template
+    if not isinstance(template, (str, Path)):
+        print(f"template must be a string, Path or Template object.")
+        return None
+    if not isinstance(basepath, (str, Path)):
+        print(f"basepath must be a string or Path object.")
+        return None
+    return load_template(template, basepath)
+
+def generate_pages(pages: list, template: str | Path | Template, basepath: str | Path, jobs: int=1, verbose=False, cache: PageCache | None=None, site_index: SiteIndex | None=None) -> bool:
+    # Generates already-discovered (source, destination) pairs, fanning out over a
+    # process pool when jobs > 1. Every worker runs the same generate_page_with_template,
+    # so the output is identical to a serial build. The template is read and compiled
+    # once for the whole build.
+    template = resolve_template(template, basepath)
+    if template is None:
+        return False
+
+    for _, dest_path in pages:
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    success = generate_pages_with_template(pages, template, jobs, verbose, cache, site_index)
+    if cache is not None:
+        cache.evict()
+    return success
+
+def generate_page_indexed(from_path: Path, template: Template, dest_path: Path, verbose: bool=False, cache: PageCache | None=None) -> tuple:
+    # Returns (success, links, metadata) so what a worker process collects reaches the parent
+    links = []
+    metadata = {}
+    return generate_page_with_template(from_path, template, dest_path, verbose, cache, links, metadata), links, metadata
+
+def generate_pages_with_template(pages: list, template: Template, jobs: int=1, verbose=False, cache: PageCache | None=None, site_index: SiteIndex | None=None) -> bool:
+    # With a site_index, every generated page's links and metadata are added to it
+    if jobs <= 1 or len(pages) <= 1:
+        for from_path, dest_path in pages:
+            success, links, metadata = generate_page_indexed(from_path, template, dest_path, verbose, cache)
+            if not success:
                 return False
-    return True
\ No newline at end of file
+            if site_index is not None:
+                site_index.add_page(from_path, dest_path, links, metadata)
+        return True
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            (from_path, dest_path, executor.submit(generate_page_indexed, from_path, template, dest_path, verbose, cache))
+            for from_path, dest_path in pages
+        ]
+        # Results are taken in page order rather than as they finish, so the page a failed
+        # build blames (and the order pages are indexed in) is the same as with jobs=1
+        for from_path, dest_path, future in futures:
+            try:
+                success, links, metadata = future.result()
+            except Exception as e:
+                print(f"Error generating '{dest_path}' from '{from_path}': {type(e).__name__}: {e}")
+                success = False
+            if not success:
+                print(f"Stopping build after failure on '{from_path}'.")
+                executor.shutdown(wait=True, cancel_futures=True)
+                return False
+            if site_index is not None:
+                site_index.add_page(from_path, dest_path, links, metadata)
+    return True
+
+# Rendering code outside the parser (see page_cache.parser_modules) that shapes every page
+generator_modules = ["generate_content.py", "minify.py", "template.py", "url_resolver.py"]
+
+def generator_fingerprint() -> str:
+    # Any edit to the parser or renderer regenerates every page on the next incremental build
+    digest = hashlib.sha256(parser_version.encode())
+    source_dir = Path(__file__).parent
+    for module in generator_modules:
+        digest.update((source_dir / module).read_bytes())
+    return digest.hexdigest()[:16]
+
+generator_version = generator_fingerprint()
+
+# The manifest fields that decide whether a page must be regenerated. Size and mtime are
+# only recorded so unchanged sources don't have to be re-hashed on every build.
+page_input_fields = ("source", "source_hash", "template_hash", "basepath", "resolver_hash", "minify", "generator_version")
+
+def cached_source_hash(from_path: Path, stat, old_entry: dict) -> str:
+    if (
+        old_entry.get("source") == from_path.as_posix()
+        and old_entry.get("size") == stat.st_size
+        and old_entry.get("mtime_ns") == stat.st_mtime_ns
+        and "source_hash" in old_entry
+    ):
+        return old_entry["source_hash"]
+    return hash_file(from_path)
+
+def page_inputs(template: Template, basepath: str | Path) -> dict:
+    # The manifest fields (see page_input_fields) every page rendered with `template` shares
+    return {
+        # The compiled template already has its own URLs resolved and is minified as configured
+        "template_hash": hash_text(json.dumps([template.segments, template.slots])),
+        "basepath": str(Path(basepath)),
+        # Fingerprinted asset names and image sizes end up in the pages, so a changed asset
+        # or image regenerates them all
+        "resolver_hash": template.resolver.fingerprint(),
+        "minify": template.minify,
+        "generator_version": generator_version,
+    }
+
+def update_pages(manifest_pages: dict, pages: list, removed_keys, template: Template, dest_dir_path: Path, basepath: str | Path, jobs: int=1, verbose=False, cache: PageCache | None=None, inputs: dict | None=None) -> list | None:
+    # Brings the manifest's "pages" (changed in place) up to date for the given (source,
+    # destination) pairs, which may be every page or just the ones known to have changed:
+    # a page is regenerated unless its entry records the same inputs and its output exists.
+    # The pages under removed_keys lose their entry and output. Returns the regenerated
+    # pairs, or None if generation failed; entries of pages not regenerated yet are left
+    # without links, so they are retried even if their inputs don't change again.
+    if inputs is None:
+        inputs = page_inputs(template, basepath)
+    stale_pages = []
+    # Every input that affects a page is recorded with it, so a template or basepath
+    # change makes every entry differ and the whole site is regenerated
+    for from_path, dest_path in pages:
+        key = dest_path.relative_to(dest_dir_path).as_posix()
+        old_entry = manifest_pages.get(key, {})
+        stat = from_path.stat()
+        entry = {
+            "source": from_path.as_posix(),
+            "source_hash": cached_source_hash(from_path, stat, old_entry),
+            **inputs,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        manifest_pages[key] = entry
+        if all(old_entry.get(field) == entry[field] for field in page_input_fields) and "links" in old_entry and "metadata" in old_entry and dest_path.exists():
+            if verbose:
+                print(f"Skipping unchanged page '{dest_path}'")
+            entry["links"] = old_entry["links"]
+            entry["metadata"] = old_entry["metadata"]
+            continue
+        stale_pages.append((from_path, dest_path))
+
+    # Remove outputs whose sources no longer exist
+    for key in removed_keys:
+        manifest_pages.pop(key, None)
+        stale_path = dest_dir_path / key
+        if stale_path.exists():
+            stale_path.unlink()
+            print(f"Removed stale page '{stale_path}'")
+
+    site_index = SiteIndex(LinkIndex(dest_dir_path), MetadataIndex(dest_dir_path))
+    if not generate_pages(stale_pages, template, basepath, jobs, verbose, cache, site_index):
+        return None
+    for from_path, dest_path in stale_pages:
+        entry = manifest_pages[dest_path.relative_to(dest_dir_path).as_posix()]
+        entry["links"] = site_index.links.links_for(from_path)
+        entry["metadata"] = site_index.metadata.metadata_for(dest_path)
+
+    print(f"Regenerated {len(stale_pages)} page(s), {len(manifest_pages) - len(stale_pages)} unchanged.")
+    return stale_pages
+
+def generate_pages_incremental(content_dir_path: str | Path, template: str | Path | Template, dest_dir_path: str | Path, basepath: str | Path, manifest_path: str | Path, jobs: int=1, verbose=False, cache: PageCache | None=None, site_index: SiteIndex | None=None) -> bool:
+    if not isinstance(content_dir_path, (str, Path)):
+        print(f"content_dir_path must be a string or Path object.")
+        return False
+    content_dir_path = Path(content_dir_path)
+    if not isinstance(dest_dir_path, (str, Path)):
+        print(f"dest_dir_path must be a string or Path object.")
+        return False
+    dest_dir_path = Path(dest_dir_path)
+    if not isinstance(basepath, (str, Path)):
+        print(f"basepath must be a string or Path object.")
+        return False
+    basepath = Path(basepath)
+
+    template = resolve_template(template, basepath)
+    if template is None:
+        return False
+
+    manifest = load_manifest(manifest_path)
+    pages = discover_pages(content_dir_path, dest_dir_path)
+    removed_keys = manifest["pages"].keys() - {dest_path.relative_to(dest_dir_path).as_posix() for _, dest_path in pages}
+    if update_pages(manifest["pages"], pages, removed_keys, template, dest_dir_path, basepath, jobs, verbose, cache) is None:
+        # Pages written before the failure must not look up to date to the next build
+        save_manifest(manifest_path, manifest)
+        return False
+
+    # Links and metadata are recorded with each page so skipped pages still appear in the indexes
+    if site_index is not None:
+        for key, entry in manifest["pages"].items():
+            site_index.add_page(entry["source"], dest_dir_path / key, entry["links"], entry["metadata"])
+    return save_manifest(manifest_path, manifest)
@@ -1,4 +1,6 @@
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str=None, value: str=None, children: list=None, props: dict=None):
         if tag is not None:
             if type(tag) is not str:
@@ -17,33 +19,60 @@ class HTMLNode:
         self.value = value
         self.children = children # if children is not None else []
         self.props = props # if props is not None else {}
+
+    @classmethod
+    def _make(cls, tag: str=None, value: str=None, children: list=None, props: dict=None):
+        # Fast path for the parser: builds a node without __init__'s validation.
+        # Only use it for values already known to be well-formed.
+        node = object.__new__(cls)
+        node.tag = tag
+        node.value = value
+        node.children = children
+        node.props = props
+        return node
     
-    def to_html(self) -> str:
+    def to_html(self, resolver=None) -> str:
+        return "".join(self.iter_html(resolver))
+
+    def iter_html(self, resolver=None):
+        # Yields the element's HTML in chunks so callers can stream it instead of
+        # building the whole document as one string. URL attributes are passed
+        # through `resolver` (a UrlResolver) when one is given.
         raise NotImplementedError
+
+    def write_html(self, stream, resolver=None):
+        for chunk in self.iter_html(resolver):
+            stream.write(chunk)
     
-    def props_to_html(self):
+    def props_to_html(self, resolver=None):
         if self.props is None:
             return ""
-        props_as_list = [f'{prop}="{val}"' for prop, val in self.props.items()]
+        props = self.props if resolver is None else resolver.resolve_props(self.tag, self.props)
+        props_as_list = [f'{prop}="{val}"' for prop, val in props.items()]
         return f' {" ".join(props_as_list)}'
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props: dict=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
         
         if value is None:
             raise ValueError("LeafNode requires a value")
     
-    def to_html(self) -> str:
+    def iter_html(self, resolver=None):
         if self.tag is None:
-            return self.value
-        props_html = self.props_to_html()
-        return f'<{self.tag}{props_html}>{self.value}</{self.tag}>'
+            yield self.value
+            return
+        props_html = self.props_to_html(resolver)
+        yield f'<{self.tag}{props_html}>{self.value}</{self.tag}>'
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict=None):
         super().__init__(tag=tag, children=children, props=props)
         if tag is None: # in [None, ""]: # not sure if empty string should be accepted
@@ -52,7 +81,19 @@ class ParentNode(HTMLNode):
         if children in [None, []]:
             raise ValueError("ParentNode requires children")
     
-    def to_html(self):
-        props_html = self.props_to_html()
-        children_html = "".join(child.to_html() for child in self.children)
-        return f'<{self.tag}{props_html}>{children_html}</{self.tag}>'
\ No newline at end of file
+    def iter_html(self, resolver=None):
+        # Walks the tree with an explicit stack so each chunk is yielded once,
+        # rather than being re-joined at every nesting level
+        yield f'<{self.tag}{self.props_to_html(resolver)}>'
+        stack = [(iter(self.children), f'</{self.tag}>')]
+        while stack:
+            children, closing_tag = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    yield f'<{child.tag}{child.props_to_html(resolver)}>'
+                    stack.append((iter(child.children), f'</{child.tag}>'))
+                    break
+                yield from child.iter_html(resolver)
+            else:
+                stack.pop()
+                yield closing_tag
\ No newline at end of file
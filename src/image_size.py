@@ -0,0 +1,115 @@
+import json
+import struct
+
+from pathlib import Path
+
+from manifest import hash_file
+
+image_suffixes = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+IMAGE_SIZES_VERSION = 1
+# JPEG start-of-frame markers (every SOFn except DHT, JPG and DAC, which share the range)
+jpeg_sof_markers = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# JPEG markers that stand alone, without a length field
+jpeg_standalone_markers = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8, 0xD9}
+
+
+def read_image_size(path: str | Path) -> tuple | None:
+    # Returns (width, height) read from the image's header bytes, or None if the format is
+    # unknown or the header is malformed. Only as much of the file as the header needs is read.
+    with open(path, "rb") as image_file:
+        head = image_file.read(32)
+        if len(head) >= 24 and head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if len(head) >= 10 and head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if len(head) >= 30 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            image_file.seek(2)
+            return jpeg_size(image_file)
+    return None
+
+def webp_size(head: bytes) -> tuple | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    return None
+
+def jpeg_size(image_file) -> tuple | None:
+    # Walks the marker segments after SOI until the first start-of-frame segment
+    while True:
+        byte = image_file.read(1)
+        if byte != b"\xff":
+            return None
+        marker = image_file.read(1)
+        while marker == b"\xff": # fill bytes
+            marker = image_file.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in jpeg_standalone_markers:
+            continue
+        length_bytes = image_file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in jpeg_sof_markers:
+            frame = image_file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        image_file.seek(length - 2, 1)
+
+def measure_images(static_dir_path: str | Path, cache_path: str | Path) -> dict:
+    # Returns {"/images/a.png": (width, height), ...} for every image under static_dir_path.
+    # Dimensions are cached by file hash in cache_path, and each file's hash is reused while
+    # its size and mtime are unchanged, so unchanged images are neither hashed nor parsed.
+    static_dir_path = Path(static_dir_path)
+    cache_path = Path(cache_path)
+    cache = {"version": IMAGE_SIZES_VERSION, "files": {}, "sizes": {}}
+    try:
+        with open(cache_path, "r") as cache_file:
+            loaded = json.load(cache_file)
+        if loaded.get("version") == IMAGE_SIZES_VERSION:
+            cache = loaded
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    files = {}
+    sizes = {}
+    image_sizes = {}
+    for path in sorted(static_dir_path.rglob("*")):
+        if path.suffix.lower() not in image_suffixes or not path.is_file():
+            continue
+        key = path.relative_to(static_dir_path).as_posix()
+        stat = path.stat()
+        record = cache["files"].get(key, {})
+        if record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": hash_file(path)}
+        files[key] = record
+        if record["hash"] in cache["sizes"]:
+            size = cache["sizes"][record["hash"]]
+        else:
+            try:
+                size = read_image_size(path)
+            except OSError as e:
+                print(f"Error reading image '{path}': {e}")
+                size = None
+        sizes[record["hash"]] = size
+        if size is not None:
+            image_sizes[f"/{key}"] = tuple(size)
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w") as cache_file:
+            json.dump({"version": IMAGE_SIZES_VERSION, "files": files, "sizes": sizes}, cache_file, indent=2)
+    except OSError as e:
+        print(f"Error writing image size cache '{cache_path}': {e}")
+    return image_sizes
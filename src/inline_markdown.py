@@ -3,28 +3,35 @@ import re
 from htmlnode import LeafNode
 from textnode import TextNode, TextType
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def text_node_to_html_node(text_node: TextNode, resolver=None) -> LeafNode:
+    # With a resolver (a UrlResolver), link and image URLs are resolved now. The build
+    # leaves it out and resolves at render time instead, so parsed trees (and the page
+    # cache) stay independent of the basepath.
     if not isinstance(text_node, TextNode):
         raise TypeError("text_node must be a TextNode object")
 
+    # The tags and props below are fixed, so the LeafNodes skip constructor validation
+
     match text_node.text_type:
         case TextType.PLAIN:
-            return LeafNode(tag=None, value=text_node.text)
+            return LeafNode._make(tag=None, value=text_node.text)
 
         case TextType.BOLD:
-            return LeafNode(tag="b", value=text_node.text)
+            return LeafNode._make(tag="b", value=text_node.text)
 
         case TextType.ITALIC:
-            return LeafNode(tag="i", value=text_node.text)
+            return LeafNode._make(tag="i", value=text_node.text)
 
         case TextType.CODE:
-            return LeafNode(tag="code", value=text_node.text)
+            return LeafNode._make(tag="code", value=text_node.text)
 
         case TextType.LINK:
-            return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+            url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+            return LeafNode._make(tag="a", value=text_node.text, props={"href": url})
 
         case TextType.IMAGE:
-            return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
+            url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+            return LeafNode._make(tag="img", value="", props={"src": url, "alt": text_node.text})
         
         case _:
             raise TypeError("TextNode must have a valid TextType")
@@ -178,21 +185,108 @@ def extract_pattern_with_start_and_end_indices(pattern: str, num_groups: int, te
         matches_with_indices.append(tuple(grouping))
     return matches_with_indices
 
+# Single-pass inline scanner. Candidate token starts are found with one regex search,
+# code spans are opaque, and links/images are consumed whole, so delimiters inside
+# them (e.g. "_" in a URL or "**" in code) are never treated as emphasis.
+inline_token_pattern = re.compile(r"`|!\[|\[|\*\*|_")
+image_pattern = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]+)\)")
+link_pattern = re.compile(r"(?<!!)\[([^\[\]]+)\]\(([^\(\)]*)\)")
+emphasis_types = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+}
+
+def find_closing_delimiter(text: str, delimiter: str, start: int) -> int:
+    # Returns the index of the delimiter closing a span opened just before `start`, or -1.
+    # Code spans, links, images and nested emphasis of the other kind are skipped over,
+    # so their contents can never close the span.
+    pos = start
+    while True:
+        match = inline_token_pattern.search(text, pos)
+        if match is None:
+            return -1
+        token = match.group()
+        if token == delimiter:
+            return match.start()
+        if token == "`":
+            end = text.find("`", match.end())
+            # An unterminated backtick is literal text inside this span, like an unmatched
+            # nested delimiter
+            pos = match.end() if end == -1 else end + 1
+        elif token in emphasis_types:
+            end = find_closing_delimiter(text, token, match.end())
+            # An unmatched nested delimiter is just literal text inside this span
+            pos = match.end() if end == -1 else end + len(token)
+        else:
+            pattern = image_pattern if token == "![" else link_pattern
+            span = pattern.match(text, match.start())
+            pos = match.end() if span is None else span.end()
+
 def text_to_text_nodes(text: str) -> list:
     if type(text) != str:
         raise TypeError("Text to convert to TextNodes must be a string.")
+    if text == "":
+        return [TextNode(text, TextType.PLAIN)]
+    try:
+        return scan_text_nodes(text)
+    except SyntaxError:
+        # The scanner is stricter than the split chain where code spans overlap emphasis or
+        # links (e.g. "**`**``"); such text keeps the chain's reading, or its SyntaxError
+        return split_text_nodes(text)
+
+def split_text_nodes(text: str) -> list:
+    # The original multi-pass tokenizer: each split function runs over the whole text in turn
     new_nodes = [TextNode(text, TextType.PLAIN)]
-    split_functions = [
-        split_nodes_bold,
-        split_nodes_italic,
-        split_nodes_code,
-        split_nodes_image,
-        split_nodes_link
-    ]
-    for function in split_functions:
+    for function in [split_nodes_bold, split_nodes_italic, split_nodes_code, split_nodes_image, split_nodes_link]:
         new_nodes = function(new_nodes)
     return new_nodes
 
+def scan_text_nodes(text: str) -> list:
+    new_nodes = []
+    plain_start = 0
+    pos = 0
+    while True:
+        match = inline_token_pattern.search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        start = match.start()
+
+        if token == "`":
+            end = text.find("`", match.end())
+            if end == -1:
+                raise SyntaxError(f"unterminated '{token}' delimiter detected")
+            new_node = TextNode(text[match.end():end], TextType.CODE)
+            next_pos = end + 1
+        elif token in emphasis_types:
+            end = find_closing_delimiter(text, token, match.end())
+            if end == -1:
+                raise SyntaxError(f"unterminated '{token}' delimiter detected")
+            # Nested emphasis is kept as literal text of the outer span, as TextNodes are flat
+            new_node = TextNode(text[match.end():end], emphasis_types[token])
+            next_pos = end + len(token)
+        else:
+            text_type = TextType.IMAGE if token == "![" else TextType.LINK
+            pattern = image_pattern if token == "![" else link_pattern
+            span = pattern.match(text, start)
+            if span is None:
+                # Not a well-formed image or link; the bracket is plain text
+                pos = match.end()
+                continue
+            new_node = TextNode(span.group(1), text_type, span.group(2))
+            next_pos = span.end()
+
+        if start > plain_start:
+            new_nodes.append(TextNode(text[plain_start:start], TextType.PLAIN))
+        # Empty delimited sections are dropped, as split_nodes_delimiter does
+        if new_node.text or new_node.url is not None:
+            new_nodes.append(new_node)
+        pos = plain_start = next_pos
+
+    if plain_start < len(text):
+        new_nodes.append(TextNode(text[plain_start:], TextType.PLAIN))
+    return new_nodes
+
 def main():
     plain_node = TextNode("This is text with two `code block` words. `more code stuff`", TextType.PLAIN)
     new_nodes = split_nodes_delimiter([plain_node], "`", TextType.CODE)
@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+# The InlineMemo used by this process, if inline memoisation is enabled.
+# text_to_children_html_nodes checks this and parses every string when it is None.
+current = None
+
+default_max_entries = 10000
+
+
+class InlineMemo:
+    # Bounded LRU memo of inline text -> the nodes text_to_children_html_nodes built from it,
+    # for sites that repeat the same list items, disclaimers and link lists on many pages.
+    # Entries are stored as immutable (tag, value, props items) records and every hit builds
+    # fresh LeafNodes, so a caller changing the nodes it got can't change the memo or nodes
+    # handed out elsewhere.
+    def __init__(self, max_entries: int=default_max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+        global current
+        current = self
+
+    def stop(self):
+        global current
+        current = None
+
+    def get(self, text: str) -> tuple | None:
+        records = self.entries.get(text)
+        if records is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(text)
+        self.hits += 1
+        return records
+
+    def put(self, text: str, nodes: list):
+        self.entries[text] = tuple(
+            (node.tag, node.value, None if node.props is None else tuple(node.props.items()))
+            for node in nodes
+        )
+        self.entries.move_to_end(text)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return f"Inline memo: {self.hits} hit(s), {self.misses} miss(es) ({rate:.1f}% hit rate), {len(self.entries)} of {self.max_entries} entries used."
@@ -0,0 +1,92 @@
+import posixpath
+
+from pathlib import Path
+
+# The attribute holding the URL for each tag the parser creates links with
+link_attributes = {"a": "href", "img": "src"}
+
+
+def iter_node_links(node):
+    # Yields the URL of every link and image in a node's subtree, in document order
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.props and node.tag in link_attributes:
+            url = node.props.get(link_attributes[node.tag])
+            if url is not None:
+                yield url
+        if node.children:
+            stack.extend(reversed(node.children))
+
+def collect_block_links(block_node, start_line: int, block_lines: list) -> list:
+    # Returns [line, url] for each link and image in a parsed block. The line is the first
+    # one (at or after the previous link's) whose text contains "(url)"; a link the
+    # search can't place is reported at the previous link's line.
+    links = []
+    index = 0
+    for url in iter_node_links(block_node):
+        target = f"({url})"
+        for i in range(index, len(block_lines)):
+            if target in block_lines[i]:
+                index = i
+                break
+        links.append([start_line + index, url])
+    return links
+
+def link_target(page_path: str, url: str) -> str | None:
+    # The site path an internal link points at, such as "/blog/index.html" or "/images/a.png".
+    # Relative URLs are resolved against the page's own path. Returns None for links the
+    # checker can't verify: external URLs, other schemes (mailto:, tel:) and bare fragments.
+    url = url.split("#", 1)[0].split("?", 1)[0]
+    if url == "" or url.startswith("//") or ":" in url.split("/", 1)[0]:
+        return None
+    if not url.startswith("/"):
+        url = posixpath.join(posixpath.dirname(page_path), url)
+    return posixpath.normpath(url)
+
+def site_paths(dest_dir_path: str | Path, dest_paths, static_dir_path: str | Path) -> set:
+    # Every path the built site will serve: the generated pages plus the static files
+    dest_dir_path = Path(dest_dir_path)
+    paths = {f"/{dest_path.relative_to(dest_dir_path).as_posix()}" for dest_path in dest_paths}
+    static_dir_path = Path(static_dir_path)
+    if static_dir_path.is_dir():
+        paths.update(f"/{path.relative_to(static_dir_path).as_posix()}" for path in static_dir_path.rglob("*") if path.is_file())
+    return paths
+
+
+class LinkIndex:
+    # Site-wide index of the links found while parsing, keyed by source file.
+    # check() looks every internal target up in a set of site paths, so it runs in O(links).
+    def __init__(self, dest_dir_path: str | Path):
+        self.dest_dir_path = Path(dest_dir_path)
+        self.pages = {}
+
+    def add_page(self, source: str | Path, dest_path: str | Path, links: list):
+        # Relative links are resolved against the page's own site path, e.g. "/blog/index.html"
+        page_path = f"/{Path(dest_path).relative_to(self.dest_dir_path).as_posix()}"
+        self.pages[Path(source).as_posix()] = (page_path, links)
+
+    def links_for(self, source: str | Path) -> list:
+        return self.pages[Path(source).as_posix()][1]
+
+    def link_count(self) -> int:
+        return sum(len(links) for _, links in self.pages.values())
+
+    def check(self, paths: set) -> list:
+        # Returns (source, line, url) for every internal link whose target isn't in `paths`.
+        # A directory URL such as "/blog" or "/blog/" is satisfied by "/blog/index.html".
+        broken = []
+        for source, (page_path, links) in self.pages.items():
+            for line, url in links:
+                target = link_target(page_path, url)
+                if target is None or target in paths or posixpath.join(target, "index.html") in paths:
+                    continue
+                broken.append((source, line, url))
+        return sorted(broken)
+
+    def report(self, paths: set) -> bool:
+        broken = self.check(paths)
+        for source, line, url in broken:
+            print(f"{source}:{line}: broken link to '{url}'")
+        print(f"Checked {self.link_count()} link(s) on {len(self.pages)} page(s), {len(broken)} broken.")
+        return not broken
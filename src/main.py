@@ -1,7 +1,36 @@
+import argparse
 import sys
 
-from copy_static import copy_directory_recursive
-from generate_content import generate_pages_recursive
+from pathlib import Path
+
+from async_pipeline import default_io_concurrency, generate_pages_async
+from build_client import default_socket_path
+from copy_static import (
+    asset_manifest_name,
+    copy_directory_fingerprinted,
+    copy_directory_recursive,
+    fingerprint_asset_urls,
+    link_modes,
+    load_asset_urls,
+    remove_directory_contents,
+    remove_unlisted_files,
+    sync_directory
+)
+from daemon import BuildDaemon
+from generate_content import discover_pages, generate_pages_incremental, generate_pages_recursive
+from image_size import measure_images
+from inline_memo import InlineMemo, default_max_entries
+from link_checker import LinkIndex, site_paths
+from manifest import load_manifest, remove_manifest
+from page_cache import MemoryPageCache, PageCache
+from page_metadata import MetadataIndex
+from precompress import precompress_directory
+from profiler import BuildProfiler
+from sharding import merge_shards, parse_shard, shard_dest_path, shard_pages, write_shard_manifest
+from site_index import SiteIndex
+from template import load_template
+from url_resolver import UrlResolver
+from watch import Watcher, serve
 
 default_basepath = "/"
 static_dir_path = "static"
@@ -9,16 +38,204 @@ dest_dir_path = "docs" # used for GitHub pages
 # dest_dir_path = "public" # used for local hosting
 content_dir_path = "content"
 template_path = "template.html"
+manifest_path = ".build/manifest.json"
+profile_trace_path = ".build/profile-trace.json"
+cache_dir_path = ".build/cache"
+image_sizes_path = ".build/image-sizes.json"
+metadata_index_path = ".build/page-metadata.json"
+default_cache_size_mb = 256
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the static site.")
+    parser.add_argument("basepath", nargs="?", default=default_basepath, help="URL prefix the site is served under")
+    parser.add_argument("--incremental", action="store_true", help="only regenerate pages whose source, template or basepath changed")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N", help="number of worker processes used to generate pages")
+    parser.add_argument("--async", dest="async_build", action="store_true", help="overlap directory listing, reads and writes with parsing in an asyncio pipeline (for content or output on slow storage such as NFS)")
+    parser.add_argument("--io-concurrency", type=int, default=default_io_concurrency, metavar="N", help=f"with --async, how many listings, reads and writes may be in flight at once (default: {default_io_concurrency})")
+    parser.add_argument("--link", choices=link_modes, default="copy", help="how --incremental places static files: copy, hardlink or reflink (falls back to copying)")
+    parser.add_argument("--sync-hash", action="store_true", help="with --incremental, also compare static file hashes when size or mtime changed")
+    parser.add_argument("--watch", action="store_true", help="build incrementally, serve the site and rebuild whatever changes")
+    parser.add_argument("--daemon", action="store_true", help="build incrementally, then keep the page cache, template and content snapshot in memory and rebuild whenever src/build_client.py asks")
+    parser.add_argument("--socket", default=default_socket_path, metavar="PATH", help=f"Unix socket the --daemon listens on (default: {default_socket_path})")
+    parser.add_argument("--port", type=int, default=8888, help="port for the --watch dev server")
+    parser.add_argument("--profile", nargs="?", const=profile_trace_path, metavar="TRACE_PATH", help=f"time every page and stage (runs serially), print the slowest and write a Chrome trace (default: {profile_trace_path})")
+    parser.add_argument("--no-cache", action="store_true", help="parse every page instead of reusing parsed trees from the page cache")
+    parser.add_argument("--cache-size", type=int, default=default_cache_size_mb, metavar="MB", help=f"size cap of the page cache; least recently used entries are evicted (default: {default_cache_size_mb})")
+    parser.add_argument("--clear-cache", action="store_true", help="empty the page cache before building")
+    parser.add_argument("--inline-memo", nargs="?", type=int, const=default_max_entries, metavar="ENTRIES", help=f"reuse the nodes parsed from repeated inline text (list items, disclaimers, ...), keeping the most recently used ENTRIES strings (default: {default_max_entries}); hit/miss counts are printed after the build")
+    parser.add_argument("--fingerprint", action="store_true", help="write static files as name.<hash>.ext, record them in an asset manifest and point pages at the new names")
+    parser.add_argument("--minify", action="store_true", help="minify the template and strip redundant whitespace from rendered pages (<pre> and <code> are left as they are)")
+    parser.add_argument("--image-sizes", action="store_true", help="add width/height (read from the image files under static/) and lazy-loading attributes to markdown images")
+    parser.add_argument("--gzip", action="store_true", help="write a .gz sibling next to every HTML, CSS, JS and SVG file written or changed by this build")
+    parser.add_argument("--metadata-index", nargs="?", const=metadata_index_path, metavar="PATH", help=f"write every page's front matter and title, keyed by page path, to a JSON index (default: {metadata_index_path})")
+    parser.add_argument("--check-links", action="store_true", help="report internal links and images whose targets are not generated pages or static files")
+    parser.add_argument("--shard", type=parse_shard_arg, metavar="i/N", help=f"build only shard i of N (pages partitioned by a hash of their path; shard 0 also copies static files) into {dest_dir_path}-shard-i")
+    parser.add_argument("--merge-shards", nargs="+", metavar="SHARD_DIR", help=f"merge shard outputs into {dest_dir_path}, failing on overlapping files or missing pages; shards built with --metadata-index are merged into one index (default: {metadata_index_path})")
+    args = parser.parse_args()
+    if args.shard is not None and (args.incremental or args.watch):
+        parser.error("--shard builds from scratch and cannot be combined with --incremental or --watch")
+    if args.daemon and (args.watch or args.shard is not None or args.merge_shards):
+        parser.error("--daemon cannot be combined with --watch, --shard or --merge-shards")
+    if (args.watch or args.daemon) and (args.check_links or args.metadata_index):
+        parser.error("--check-links and --metadata-index only run with one-off builds, not --watch or --daemon")
+    if args.inline_memo is not None and args.inline_memo < 1:
+        parser.error("--inline-memo needs at least 1 entry")
+    if args.async_build and (args.incremental or args.watch or args.daemon or args.profile):
+        parser.error("--async builds from scratch and cannot be combined with --incremental, --watch, --daemon or --profile")
+    if args.io_concurrency < 1:
+        parser.error("--io-concurrency must be at least 1")
+    return args
+
+def parse_shard_arg(text: str) -> tuple:
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def main() -> bool:
+    # Returns False when the build, the merge or the link check failed
+    args = parse_args()
+    basepath = args.basepath
+
+    cache_type = MemoryPageCache if args.daemon else PageCache
+    cache = None if args.no_cache else cache_type(cache_dir_path, args.cache_size * 1024 * 1024)
+    if args.clear_cache:
+        removed = PageCache(cache_dir_path).clear()
+        print(f"Cleared {removed} page cache entries from '{cache_dir_path}'")
+
+    if args.watch or args.daemon:
+        if args.inline_memo is not None:
+            # Kept across builds; its counts are printed after each one
+            InlineMemo(args.inline_memo).start()
+        if args.watch:
+            watch(args, cache)
+        else:
+            daemon(args, cache)
+        return True
+
+    if args.merge_shards:
+        # The merged output replaces whatever the incremental manifest describes
+        success = remove_manifest(manifest_path) and merge_shards(args.merge_shards, dest_dir_path, verbose=True, metadata_index_path=args.metadata_index or metadata_index_path)
+        if success:
+            print(f"Successfully merged shards into '{dest_dir_path}'")
+        else:
+            print(f"Failed to merge shards into '{dest_dir_path}'")
+        return success
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) >= 2 else default_basepath
+    build_profiler = None
+    if args.profile:
+        if args.jobs > 1:
+            print("Profiling runs in a single process; ignoring --jobs.")
+            args.jobs = 1
+        build_profiler = BuildProfiler()
+        build_profiler.start()
 
-    copy_directory_recursive(static_dir_path, dest_dir_path, remove_dest=True, verbose=True)
-    
-    if generate_pages_recursive(content_dir_path, template_path, dest_dir_path, basepath, verbose=False):
-        print(f"Successfully generated page from '{content_dir_path}' to '{dest_dir_path}' using '{template_path}'")
+    memo = None
+    if args.inline_memo is not None:
+        if args.jobs > 1:
+            print("The inline memo's counts only cover pages parsed in this process; worker processes keep their own.")
+        memo = InlineMemo(args.inline_memo)
+        memo.start()
+
+    dest = dest_dir_path if args.shard is None else shard_dest_path(dest_dir_path, args.shard)
+    site_index = SiteIndex(LinkIndex(dest) if args.check_links else None, MetadataIndex(dest) if args.metadata_index else None)
+    image_sizes = measure_images(static_dir_path, image_sizes_path) if args.image_sizes else None
+    try:
+        if args.incremental:
+            success = sync_directory(static_dir_path, dest_dir_path, manifest_path, args.sync_hash, args.link, verbose=True, fingerprint=args.fingerprint)
+            asset_urls = load_asset_urls(dest_dir_path) if args.fingerprint else None
+            template = load_template(template_path, basepath, UrlResolver(basepath, asset_urls, image_sizes), args.minify)
+            success = success and template is not None and generate_pages_incremental(content_dir_path, template, dest_dir_path, basepath, manifest_path, args.jobs, verbose=False, cache=cache, site_index=site_index)
+        else:
+            if args.shard is None:
+                # A full build rewrites the pages the incremental manifest describes, possibly
+                # with another basepath or options, so the next incremental build starts over.
+                # Static files are synced rather than copied into an emptied docs/, so whatever
+                # this build doesn't change keeps its mtime (and rsync or a CDN can skip it).
+                success = remove_manifest(manifest_path) and sync_directory(static_dir_path, dest, manifest_path, verbose=True, fingerprint=args.fingerprint)
+                asset_urls = load_asset_urls(dest) if args.fingerprint else None
+            elif args.shard[0] != 0:
+                # Static files belong to shard 0 alone; the others only need their URLs
+                success = remove_directory_contents(dest, verbose=True)
+                asset_urls = fingerprint_asset_urls(static_dir_path) if args.fingerprint else None
+            elif args.fingerprint:
+                success = copy_directory_fingerprinted(static_dir_path, dest, remove_dest=True, verbose=True)
+                asset_urls = load_asset_urls(dest)
+            else:
+                success = copy_directory_recursive(static_dir_path, dest, remove_dest=True, verbose=True)
+                asset_urls = None
+            template = load_template(template_path, basepath, UrlResolver(basepath, asset_urls, image_sizes), args.minify)
+            success = success and template is not None
+            if args.async_build:
+                success = success and generate_pages_async(content_dir_path, template, dest, basepath, args.jobs, args.io_concurrency, verbose=False, cache=cache, site_index=site_index, shard=args.shard)
+            else:
+                success = success and generate_pages_recursive(content_dir_path, template, dest, basepath, args.jobs, verbose=False, cache=cache, site_index=site_index, shard=args.shard)
+            if success and args.shard is None:
+                success = remove_unlisted_files(dest, full_build_outputs(dest, args.fingerprint, args.gzip), verbose=True)
+        if success and site_index.metadata is not None:
+            success = site_index.metadata.save(args.metadata_index)
+        if success and args.gzip:
+            success = precompress_directory(dest)
+        if success and args.shard is not None:
+            all_pages = discover_pages(content_dir_path, dest)
+            all_keys = [dest_path.relative_to(dest).as_posix() for _, dest_path in all_pages]
+            metadata = None if site_index.metadata is None else site_index.metadata.pages
+            success = write_shard_manifest(dest, args.shard, shard_pages(all_pages, dest, args.shard), all_keys, metadata)
+    finally:
+        if build_profiler is not None:
+            build_profiler.stop()
+            print(build_profiler.summary())
+            if build_profiler.write_chrome_trace(args.profile):
+                print(f"Wrote Chrome trace to '{args.profile}'")
+        if memo is not None:
+            memo.stop()
+            print(memo.summary())
+
+    if success:
+        print(f"Successfully generated page from '{content_dir_path}' to '{dest}' using '{template_path}'")
     else:
-        print(f"Failed to generate page from '{content_dir_path}' to '{dest_dir_path}' using '{template_path}'")
+        print(f"Failed to generate page from '{content_dir_path}' to '{dest}' using '{template_path}'")
+
+    if success and site_index.links is not None:
+        dest_paths = [dest_path for _, dest_path in discover_pages(content_dir_path, dest)]
+        success = site_index.links.report(site_paths(dest, dest_paths, static_dir_path))
+    return success
+
+def full_build_outputs(dest: str | Path, fingerprint: bool, gzip: bool) -> set:
+    # Paths, relative to dest, of every file a full build writes: the static files sync_directory
+    # recorded, the asset manifest and the pages, plus their .gz siblings if they are kept
+    static = load_manifest(manifest_path)["static"]
+    outputs = {record.get("name", key) for key, record in static.items()}
+    if fingerprint:
+        outputs.add(asset_manifest_name)
+    outputs.update(dest_path.relative_to(dest).as_posix() for _, dest_path in discover_pages(content_dir_path, dest))
+    if gzip:
+        # precompress_directory drops the stale ones and refreshes the rest
+        outputs.update([f"{output}.gz" for output in outputs])
+    return outputs
+
+def make_watcher(args, cache: PageCache | None) -> Watcher:
+    image_sizes = image_sizes_path if args.image_sizes else None
+    return Watcher(content_dir_path, static_dir_path, template_path, dest_dir_path, args.basepath, manifest_path, args.jobs, cache, args.link, args.sync_hash, args.fingerprint, args.minify, image_sizes, args.gzip)
+
+def watch(args, cache: PageCache | None):
+    watcher = make_watcher(args, cache)
+    watcher.build()
+    server = serve(dest_dir_path, args.port)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("Stopping watch mode.")
+    finally:
+        server.shutdown()
+
+def daemon(args, cache: PageCache | None):
+    watcher = make_watcher(args, cache)
+    watcher.build()
+    try:
+        BuildDaemon(watcher, args.socket).serve()
+    except KeyboardInterrupt:
+        print("Stopping build daemon.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,65 @@
+import hashlib
+import json
+
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+def hash_file(path: str | Path) -> str:
+    # Hash in chunks so large sources never have to sit in memory at once
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "pages": {}, "static": {}}
+
+def load_manifest(manifest_path: str | Path) -> dict:
+    # A missing, unreadable or outdated manifest just means "nothing is known to be up to date"
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return empty_manifest()
+    try:
+        with open(manifest_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest '{manifest_path}': {e}")
+        return empty_manifest()
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        print(f"Ignoring manifest '{manifest_path}' from a different version.")
+        return empty_manifest()
+    manifest.setdefault("pages", {})
+    manifest.setdefault("static", {})
+    return manifest
+
+def remove_manifest(manifest_path: str | Path) -> bool:
+    # For builds that rewrite the output without recording it: the next incremental build
+    # must not trust what the manifest says is already in place
+    manifest_path = Path(manifest_path)
+    try:
+        manifest_path.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"Error removing manifest '{manifest_path}': {e}")
+        return False
+    return True
+
+def save_manifest(manifest_path: str | Path, manifest: dict) -> bool:
+    manifest_path = Path(manifest_path)
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    except Exception as e:
+        print(f"Error writing manifest '{manifest_path}': {e}")
+        return False
+    return True
@@ -0,0 +1,76 @@
+import re
+
+comment_pattern = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# Elements whose content is whitespace-sensitive or not HTML, kept byte for byte
+preserved_pattern = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.IGNORECASE)
+# Whitespace spanning a line break between two tags (indentation and blank lines)
+indentation_pattern = re.compile(r"(<[^<>]*>)\s*\n\s*(?=(<[^<>]*>))")
+tag_name_pattern = re.compile(r"</?([A-Za-z][\w-]*)")
+# Elements laid out as blocks, so whitespace next to their tags is never rendered
+block_tags = {
+    "address", "article", "aside", "base", "blockquote", "body", "dd", "details", "div",
+    "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3",
+    "h4", "h5", "h6", "head", "header", "hr", "html", "li", "link", "main", "meta", "nav",
+    "ol", "p", "pre", "script", "section", "style", "table", "tbody", "td", "tfoot", "th",
+    "thead", "title", "tr", "ul",
+}
+whitespace_pattern = re.compile(r"\s+")
+placeholder_pattern = re.compile(r"<\0(\d+)>")
+# The opening tag of a <pre> or <code> element (not just text that starts with "<code")
+preformatted_pattern = re.compile(r"<(pre|code)[\s>]")
+
+
+def minify_html(html: str) -> str:
+    # Minifies hand-written markup such as the template: drops comments (but not
+    # conditional comments), removes whitespace spanning a line break between two tags when
+    # either of them is a block-level tag (indentation and blank lines) and collapses every
+    # other whitespace run to one space. Whitespace between two inline elements is kept as
+    # a space, since it is rendered.
+    html = comment_pattern.sub("", html)
+    # Preserved elements are swapped for tag-like placeholders, so the whitespace around
+    # them is handled like the whitespace around any other tag
+    preserved = []
+    def stash(match):
+        preserved.append(match.group(1))
+        return f"<\0{len(preserved) - 1}>"
+    html = preserved_pattern.sub(stash, html)
+    def is_block(tag):
+        if placeholder := placeholder_pattern.fullmatch(tag):
+            tag = preserved[int(placeholder.group(1))]
+        # Doctypes and conditional comments have no tag name and render nothing either
+        name = tag_name_pattern.match(tag)
+        return name is None or name.group(1).lower() in block_tags
+    def indentation(match):
+        if is_block(match.group(1)) or is_block(match.group(2)):
+            return match.group(1)
+        return match.group(1) + " "
+    html = whitespace_pattern.sub(" ", indentation_pattern.sub(indentation, html)).strip()
+    return placeholder_pattern.sub(lambda match: preserved[int(match.group(1))], html)
+
+def minify_chunks(chunks):
+    # Collapses whitespace runs in rendered chunks (as yielded by HTMLNode.iter_html) as they
+    # stream past. Everything inside <pre> and inline <code> elements is passed through
+    # untouched; a chunk is never split across an element boundary, so the opening and
+    # closing tags are enough to track them. A run split across chunks still becomes one
+    # space, so the output doesn't depend on where the chunks happen to be split.
+    preformatted_depth = 0
+    ended_in_whitespace = False
+    for chunk in chunks:
+        if preformatted_pattern.match(chunk):
+            if not chunk.endswith(("</pre>", "</code>")):
+                preformatted_depth += 1
+            ended_in_whitespace = False
+            yield chunk
+        elif preformatted_depth and chunk in ("</pre>", "</code>"):
+            preformatted_depth -= 1
+            ended_in_whitespace = False
+            yield chunk
+        elif preformatted_depth:
+            yield chunk
+        else:
+            chunk = whitespace_pattern.sub(" ", chunk)
+            if ended_in_whitespace and chunk.startswith(" "):
+                chunk = chunk[1:]
+            if chunk:
+                ended_in_whitespace = chunk.endswith(" ")
+                yield chunk
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+
+from pathlib import Path
+
+from manifest import hash_file
+
+
+class OutputWriter:
+    # Text stream used in place of open(dest_path, 'w') for generated files.
+    # Writes go to a temporary file in the destination directory while being hashed.
+    # On a clean exit the result is compared with the existing file: identical
+    # output is thrown away so the file's mtime stays put, and changed output
+    # replaces the file atomically with os.replace, so readers never see a
+    # half-written page. On an exception the temporary file is removed and the
+    # existing file is left untouched.
+    def __init__(self, dest_path: str | Path):
+        self.dest_path = Path(dest_path)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.changed = None
+        fd, temp_path = tempfile.mkstemp(dir=self.dest_path.parent, prefix=f".{self.dest_path.name}.", suffix=".tmp")
+        self.temp_path = Path(temp_path)
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self.digest.update(data)
+        self.size += len(data)
+        self.file.write(data)
+        return len(text)
+
+    def is_unchanged(self) -> bool:
+        # Size is checked first so most changed files are caught without reading them
+        try:
+            if self.dest_path.stat().st_size != self.size:
+                return False
+        except FileNotFoundError:
+            return False
+        return hash_file(self.dest_path) == self.digest.hexdigest()
+
+    def commit(self) -> bool:
+        # Returns True if the destination was (re)written, False if it was already up to date
+        self.file.close()
+        if self.is_unchanged():
+            self.temp_path.unlink()
+            self.changed = False
+            return False
+        # mkstemp creates files readable only by their owner; keep the usual mode instead
+        try:
+            mode = self.dest_path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(self.temp_path, mode)
+        os.replace(self.temp_path, self.dest_path)
+        self.changed = True
+        return True
+
+    def discard(self):
+        self.file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.discard()
+            return False
+        try:
+            self.commit()
+        except BaseException:
+            self.temp_path.unlink(missing_ok=True)
+            raise
+        return False
+
+def write_output(dest_path: str | Path, text: str) -> bool:
+    # Writes a whole string through an OutputWriter; returns True if the file changed
+    with OutputWriter(dest_path) as writer:
+        writer.write(text)
+    return writer.changed
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import sys
+
+from collections import OrderedDict
+
+from pathlib import Path
+
+from htmlnode import LeafNode, ParentNode
+
+# Bump by hand for changes the source fingerprint below can't see
+CACHE_FORMAT_VERSION = 3
+parser_modules = ["block_markdown.py", "inline_markdown.py", "htmlnode.py", "textnode.py", "link_checker.py"]
+
+
+def parser_fingerprint() -> str:
+    # Any edit to the parser invalidates every cached tree without a manual version bump
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{sys.version_info[:2]}".encode())
+    source_dir = Path(__file__).parent
+    for module in parser_modules:
+        digest.update((source_dir / module).read_bytes())
+    return digest.hexdigest()[:16]
+
+parser_version = parser_fingerprint()
+
+def node_to_data(node) -> list:
+    # Compact JSON form: ["L", tag, value, props] for leaves, ["P", tag, [children], props] for parents
+    if isinstance(node, ParentNode):
+        return ["P", node.tag, [node_to_data(child) for child in node.children], node.props]
+    return ["L", node.tag, node.value, node.props]
+
+def data_to_node(data: list):
+    kind, tag, payload, props = data
+    if kind == "P":
+        return ParentNode._make(tag=tag, children=[data_to_node(child) for child in payload], props=props)
+    return LeafNode._make(tag=tag, value=payload, props=props)
+
+
+class PageCache:
+    # Parsed HTMLNode trees on disk, one file per source hash + parser version, stored
+    # with the [line, url] links and the metadata (front matter, title) collected while parsing.
+    # A file's mtime is its last use; evict() removes the least recently used
+    # files until the cache fits in max_bytes.
+    def __init__(self, cache_dir: str | Path, max_bytes: int=256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, source_hash: str) -> Path:
+        return self.cache_dir / f"{parser_version}-{source_hash}.json"
+
+    def get(self, source_hash: str):
+        entry = self.get_page(source_hash)
+        return None if entry is None else entry[0]
+
+    def get_page(self, source_hash: str) -> tuple | None:
+        # Returns (node, links, metadata), or None on a miss
+        path = self.path_for(source_hash)
+        try:
+            with open(path, "r") as cache_file:
+                data = json.load(cache_file)
+            os.utime(path)
+            node = data_to_node(data["tree"])
+            links = data["links"]
+            metadata = data["metadata"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return node, links, metadata
+
+    def put(self, source_hash: str, node, links: list=None, metadata: dict=None) -> bool:
+        path = self.path_for(source_hash)
+        # Written under a temporary name and renamed so readers never see a partial file
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as cache_file:
+                data = {
+                    "tree": node_to_data(node),
+                    "links": links if links is not None else [],
+                    "metadata": metadata if metadata is not None else {},
+                }
+                json.dump(data, cache_file, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing cache entry '{path}': {e}")
+            if temp_path.exists():
+                temp_path.unlink()
+            return False
+        return True
+
+    def evict(self) -> int:
+        if not self.cache_dir.is_dir():
+            return 0
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        removed = 0
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class MemoryPageCache(PageCache):
+    # PageCache with the most recently used max_entries pages also held in memory, for
+    # long-running processes such as the build daemon. Trees are never modified while
+    # rendering, so the same objects can be handed to every build.
+    def __init__(self, cache_dir: str | Path, max_bytes: int=256 * 1024 * 1024, max_entries: int=4096):
+        super().__init__(cache_dir, max_bytes)
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+
+    def __getstate__(self):
+        # Worker processes get the disk cache alone instead of a copy of every tree
+        state = self.__dict__.copy()
+        state["memory"] = OrderedDict()
+        return state
+
+    def get_page(self, source_hash: str) -> tuple | None:
+        entry = self.memory.get(source_hash)
+        if entry is None:
+            entry = super().get_page(source_hash)
+            if entry is not None:
+                self.remember(source_hash, entry)
+            return entry
+        self.memory.move_to_end(source_hash)
+        self.hits += 1
+        return entry
+
+    def put(self, source_hash: str, node, links: list=None, metadata: dict=None) -> bool:
+        self.remember(source_hash, (node, links if links is not None else [], metadata if metadata is not None else {}))
+        return super().put(source_hash, node, links, metadata)
+
+    def remember(self, source_hash: str, entry: tuple):
+        self.memory[source_hash] = entry
+        self.memory.move_to_end(source_hash)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def clear(self) -> int:
+        self.memory.clear()
+        return super().clear()
@@ -0,0 +1,37 @@
+import json
+
+from pathlib import Path
+
+
+class MetadataIndex:
+    # Site-wide index of every generated page's metadata (its front matter, plus the title
+    # taken from the first "# " heading when the front matter has none), keyed by the page's
+    # site path such as "/blog/index.html". Filled while the pages are parsed.
+    def __init__(self, dest_dir_path: str | Path):
+        self.dest_dir_path = Path(dest_dir_path)
+        self.pages = {}
+
+    def add_page(self, source: str | Path, dest_path: str | Path, metadata: dict):
+        page_path = f"/{Path(dest_path).relative_to(self.dest_dir_path).as_posix()}"
+        self.pages[page_path] = {"source": Path(source).as_posix(), "metadata": metadata}
+
+    def metadata_for(self, dest_path: str | Path) -> dict:
+        return self.pages[f"/{Path(dest_path).relative_to(self.dest_dir_path).as_posix()}"]["metadata"]
+
+    def pages_where(self, key: str, value: str | None=None) -> list:
+        # Site paths of the pages that set `key` (to `value`, when given), in path order
+        return sorted(
+            page_path for page_path, page in self.pages.items()
+            if key in page["metadata"] and (value is None or page["metadata"][key] == value)
+        )
+
+    def save(self, index_path: str | Path) -> bool:
+        index_path = Path(index_path)
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(index_path, "w") as index_file:
+                json.dump(dict(sorted(self.pages.items())), index_file, indent=2)
+        except OSError as e:
+            print(f"Error writing page metadata index '{index_path}': {e}")
+            return False
+        return True
@@ -0,0 +1,102 @@
+import gzip
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+compressible_suffixes = {".html", ".css", ".js", ".svg"}
+gzip_level = 9
+
+
+def needs_compression(path: Path) -> bool:
+    # A .gz sibling carries its source's mtime, so any other mtime means the source was
+    # written (or replaced) since it was compressed
+    gz_path = path.with_name(f"{path.name}.gz")
+    try:
+        return gz_path.stat().st_mtime_ns != path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+def compress_file(path: Path) -> Path:
+    gz_path = path.with_name(f"{path.name}.gz")
+    temp_path = path.with_name(f".{path.name}.gz.{os.getpid()}.tmp")
+    stat = path.stat()
+    # mtime=0 keeps the gzip header, and so the .gz, identical for identical input
+    data = gzip.compress(path.read_bytes(), gzip_level, mtime=0)
+    try:
+        temp_path.write_bytes(data)
+        os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(temp_path, gz_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return gz_path
+
+def precompress_directory(directory: str | Path, workers: int | None=None, verbose: bool=False) -> bool:
+    # Writes a .gz sibling next to every text asset in directory that was written or changed
+    # since it was last compressed, and removes .gz files whose source is gone.
+    # zlib releases the GIL while compressing, so a thread pool runs the files in parallel.
+    if not isinstance(directory, (str, Path)):
+        print(f"directory must be a string or Path object.")
+        return False
+    directory = Path(directory)
+    if not directory.is_dir():
+        print(f"Directory not found at '{directory}'.")
+        return False
+
+    pending = []
+    removed = 0
+    for path in directory.rglob("*"):
+        if path.name.startswith(".") or not path.is_file():
+            continue
+        if path.suffix == ".gz":
+            source_path = path.with_name(path.name[:-3])
+            if source_path.suffix in compressible_suffixes and not source_path.exists():
+                path.unlink()
+                removed += 1
+                if verbose:
+                    print(f"Removed stale file '{path}'")
+            continue
+        if path.suffix in compressible_suffixes and needs_compression(path):
+            pending.append(path)
+
+    success = compress_files(pending, workers, verbose)
+    print(f"Compressed {len(pending)} file(s) in '{directory}', {removed} stale .gz removed.")
+    return success
+
+def precompress_files(paths: list, workers: int | None=None, verbose: bool=False) -> bool:
+    # precompress_directory for a build that knows which files it wrote or removed: each
+    # existing text asset gets a fresh .gz sibling, and a missing one loses its .gz
+    pending = []
+    removed = 0
+    for path in paths:
+        path = Path(path)
+        if path.suffix not in compressible_suffixes:
+            continue
+        if path.is_file():
+            if needs_compression(path):
+                pending.append(path)
+            continue
+        gz_path = path.with_name(f"{path.name}.gz")
+        if gz_path.exists():
+            gz_path.unlink()
+            removed += 1
+            if verbose:
+                print(f"Removed stale file '{gz_path}'")
+
+    success = compress_files(pending, workers, verbose)
+    print(f"Compressed {len(pending)} file(s), {removed} stale .gz removed.")
+    return success
+
+def compress_files(pending: list, workers: int | None=None, verbose: bool=False) -> bool:
+    success = True
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, future in [(path, executor.submit(compress_file, path)) for path in pending]:
+            try:
+                gz_path = future.result()
+            except OSError as e:
+                print(f"Error compressing '{path}': {e}")
+                success = False
+                continue
+            if verbose:
+                print(f"Compressed '{path}' to '{gz_path}'")
+    return success
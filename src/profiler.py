@@ -0,0 +1,108 @@
+import json
+import time
+import tracemalloc
+
+from pathlib import Path
+
+# The BuildProfiler collecting timings for this process, if profiling is enabled.
+# Instrumented code checks this and does nothing extra when it is None.
+current = None
+
+page_stages = ["read", "cache", "markdown_to_blocks", "block_to_html_node", "text_to_text_nodes", "to_html", "template", "write"]
+
+
+class BuildProfiler:
+    # Records per-page, per-stage wall time and per-page peak traced memory.
+    # Nested stages (text_to_text_nodes runs inside block_to_html_node) are
+    # accumulated separately and are not subtracted from their parent.
+    def __init__(self, trace_memory: bool=True):
+        self.trace_memory = trace_memory
+        self.pages = []
+        self.events = []
+        self.page = None
+        self.origin = time.perf_counter()
+
+    def start(self):
+        global current
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current = self
+
+    def stop(self):
+        global current
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        current = None
+
+    def start_page(self, name: str):
+        self.page = {"name": name, "stages": {}, "start": time.perf_counter()}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self.page["memory_base"] = tracemalloc.get_traced_memory()[0]
+
+    def end_page(self):
+        page = self.page
+        end = time.perf_counter()
+        page["seconds"] = end - page.pop("start")
+        if self.trace_memory:
+            page["peak_bytes"] = tracemalloc.get_traced_memory()[1] - page.pop("memory_base")
+        else:
+            page["peak_bytes"] = 0
+        self.add_event(page["name"], "page", end - page["seconds"], page["seconds"], {"peak_bytes": page["peak_bytes"]})
+        self.pages.append(page)
+        self.page = None
+
+    def timed(self, stage: str, function, *args):
+        # Runs function(*args), charging its time to `stage` of the current page
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        if self.page is not None:
+            self.page["stages"][stage] = self.page["stages"].get(stage, 0.0) + seconds
+            if stage != "text_to_text_nodes": # called per inline string; too many to trace one by one
+                self.add_event(stage, "stage", start, seconds, {"page": self.page["name"]})
+        return result
+
+    def add_event(self, name: str, category: str, start: float, seconds: float, args: dict):
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1_000_000, 3),
+            "dur": round(seconds * 1_000_000, 3),
+            "pid": 1,
+            "tid": 1,
+            "args": args,
+        })
+
+    def stage_totals(self) -> dict:
+        totals = {stage: 0.0 for stage in page_stages}
+        for page in self.pages:
+            for stage, seconds in page["stages"].items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def summary(self, top: int=10) -> str:
+        total = sum(page["seconds"] for page in self.pages)
+        lines = [f"Profiled {len(self.pages)} page(s) in {total:.3f}s", "", f"{'stage':<22}{'seconds':>10}{'share':>8}"]
+        for stage, seconds in sorted(self.stage_totals().items(), key=lambda item: item[1], reverse=True):
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"{stage:<22}{seconds:>10.4f}{share:>7.1f}%")
+        lines.append("(text_to_text_nodes is also counted in block_to_html_node)")
+        lines.extend(["", f"Slowest {min(top, len(self.pages))} page(s):", f"{'seconds':>10}{'peak KiB':>10}  {'slowest stage':<22}page"])
+        for page in sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:top]:
+            slowest_stage = max(page["stages"], key=page["stages"].get, default="")
+            lines.append(f"{page['seconds']:>10.4f}{page['peak_bytes'] / 1024:>10.1f}  {slowest_stage:<22}{page['name']}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, trace_path: str | Path) -> bool:
+        # Trace Event Format; open in chrome://tracing or https://ui.perfetto.dev
+        trace_path = Path(trace_path)
+        try:
+            trace_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(trace_path, "w") as trace_file:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+        except Exception as e:
+            print(f"Error writing trace '{trace_path}': {e}")
+            return False
+        return True
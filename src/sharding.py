@@ -0,0 +1,174 @@
+import hashlib
+import json
+import shutil
+
+from pathlib import Path
+
+from copy_static import remove_directory_contents
+from page_metadata import MetadataIndex
+
+SHARD_MANIFEST_VERSION = 1
+shard_manifest_name = "shard-manifest.json"
+
+
+def parse_shard(text: str) -> tuple:
+    # "i/N" -> (i, N), with 0 <= i < N
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like 'i/N', got '{text}'.")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be between 0 and N-1, got '{text}'.")
+    return index, count
+
+def shard_of(key: str, count: int) -> int:
+    # Depends only on the page's relative path, so every runner computes the same partition
+    return int(hashlib.sha256(key.encode("utf-8")).hexdigest()[:16], 16) % count
+
+def shard_pages(pages: list, dest_dir_path: str | Path, shard: tuple) -> list:
+    # The (source, destination) pairs that belong to shard (index, count)
+    index, count = shard
+    dest_dir_path = Path(dest_dir_path)
+    return [(from_path, dest_path) for from_path, dest_path in pages if shard_of(dest_path.relative_to(dest_dir_path).as_posix(), count) == index]
+
+def shard_dest_path(dest_dir_path: str | Path, shard: tuple) -> Path:
+    # Each shard builds into its own tree next to the real output, e.g. docs-shard-0
+    dest_dir_path = Path(dest_dir_path)
+    return dest_dir_path.with_name(f"{dest_dir_path.name}-shard-{shard[0]}")
+
+def write_shard_manifest(shard_dir_path: str | Path, shard: tuple, pages: list, all_pages: list, metadata: dict | None=None) -> bool:
+    # Records which pages this shard built, every page the site has (so the merge can find
+    # gaps) and every file in the shard's tree (so it can find overlaps). `metadata`, the
+    # shard's MetadataIndex pages, lets the merge write the site-wide metadata index.
+    shard_dir_path = Path(shard_dir_path)
+    files = sorted(
+        path.relative_to(shard_dir_path).as_posix()
+        for path in shard_dir_path.rglob("*")
+        if path.is_file() and path.name != shard_manifest_name
+    )
+    manifest = {
+        "version": SHARD_MANIFEST_VERSION,
+        "shard": shard[0],
+        "count": shard[1],
+        "pages": sorted(dest_path.relative_to(shard_dir_path).as_posix() for _, dest_path in pages),
+        "all_pages": sorted(all_pages),
+        "files": files,
+    }
+    if metadata is not None:
+        manifest["metadata"] = metadata
+    try:
+        with open(shard_dir_path / shard_manifest_name, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+    except OSError as e:
+        print(f"Error writing shard manifest in '{shard_dir_path}': {e}")
+        return False
+    return True
+
+def load_shard_manifest(shard_dir_path: Path) -> dict | None:
+    try:
+        with open(shard_dir_path / shard_manifest_name, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError) as e:
+        print(f"Error reading shard manifest in '{shard_dir_path}': {e}")
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != SHARD_MANIFEST_VERSION:
+        print(f"Shard manifest in '{shard_dir_path}' has an unsupported format.")
+        return None
+    return manifest
+
+def check_shards(manifests: dict) -> list:
+    # Returns every problem that makes the shards unsafe to merge; empty if there are none
+    problems = []
+    counts = {manifest["count"] for manifest in manifests.values()}
+    if len(counts) != 1:
+        return [f"Shards disagree on the shard count: {sorted(counts)}."]
+    count = counts.pop()
+
+    seen_shards = {}
+    for shard_dir_path, manifest in manifests.items():
+        if manifest["shard"] in seen_shards:
+            problems.append(f"Shard {manifest['shard']} given twice: '{seen_shards[manifest['shard']]}' and '{shard_dir_path}'.")
+        seen_shards[manifest["shard"]] = shard_dir_path
+    for missing in sorted(set(range(count)) - seen_shards.keys()):
+        problems.append(f"Shard {missing}/{count} is missing.")
+
+    all_pages = {tuple(manifest["all_pages"]) for manifest in manifests.values()}
+    if len(all_pages) != 1:
+        problems.append("Shards were built from different content (their page lists differ).")
+        return problems
+
+    page_owners = {}
+    file_owners = {}
+    for shard_dir_path, manifest in manifests.items():
+        for page in manifest["pages"]:
+            page_owners.setdefault(page, []).append(shard_dir_path)
+        for file in manifest["files"]:
+            file_owners.setdefault(file, []).append(shard_dir_path)
+            if not (shard_dir_path / file).is_file():
+                problems.append(f"'{file}' is listed by '{shard_dir_path}' but missing from it.")
+        listed = set(manifest["files"])
+        for path in sorted(shard_dir_path.rglob("*")):
+            file = path.relative_to(shard_dir_path).as_posix()
+            if path.is_file() and path.name != shard_manifest_name and file not in listed:
+                problems.append(f"'{file}' is in '{shard_dir_path}' but not in its manifest.")
+    for file, owners in sorted(file_owners.items()):
+        if len(owners) > 1:
+            owner_names = ", ".join(f"'{owner}'" for owner in owners)
+            problems.append(f"Overlap: '{file}' is in {owner_names}.")
+    for page in sorted(set(all_pages.pop()) - page_owners.keys()):
+        problems.append(f"Gap: page '{page}' was not built by any shard.")
+    return problems
+
+def merge_shards(shard_dir_paths: list, dest_dir_path: str | Path, verbose: bool=False, metadata_index_path: str | Path | None=None) -> bool:
+    # Combines the shard trees into dest_dir_path. Nothing is written unless the shards
+    # cover every page exactly once and no output file comes from two shards.
+    # With a metadata_index_path, the shards' metadata is merged into the index there; if
+    # some shard recorded none, any index already there is removed instead, since it no
+    # longer describes the merged site.
+    shard_dir_paths = [Path(shard_dir_path) for shard_dir_path in shard_dir_paths]
+    dest_dir_path = Path(dest_dir_path)
+    manifests = {}
+    for shard_dir_path in shard_dir_paths:
+        manifest = load_shard_manifest(shard_dir_path)
+        if manifest is None:
+            return False
+        manifests[shard_dir_path] = manifest
+
+    problems = check_shards(manifests)
+    if problems:
+        for problem in problems:
+            print(problem)
+        print(f"Refusing to merge {len(shard_dir_paths)} shard(s) into '{dest_dir_path}'.")
+        return False
+
+    if not remove_directory_contents(dest_dir_path, verbose):
+        return False
+    copied = 0
+    for shard_dir_path, manifest in manifests.items():
+        for file in manifest["files"]:
+            dest_file = dest_dir_path / file
+            try:
+                dest_file.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(shard_dir_path / file, dest_file)
+            except OSError as e:
+                print(f"Error copying '{shard_dir_path / file}' to '{dest_file}': {e}")
+                return False
+            copied += 1
+    print(f"Merged {len(manifests)} shard(s) into '{dest_dir_path}': {copied} file(s).")
+    if metadata_index_path is not None:
+        return merge_metadata_indexes(manifests, dest_dir_path, Path(metadata_index_path))
+    return True
+
+def merge_metadata_indexes(manifests: dict, dest_dir_path: Path, metadata_index_path: Path) -> bool:
+    if not all("metadata" in manifest for manifest in manifests.values()):
+        try:
+            metadata_index_path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Error removing stale page metadata index '{metadata_index_path}': {e}")
+            return False
+        print(f"Not every shard recorded page metadata; no index written to '{metadata_index_path}'.")
+        return True
+    metadata_index = MetadataIndex(dest_dir_path)
+    for manifest in manifests.values():
+        metadata_index.pages.update(manifest["metadata"])
+    return metadata_index.save(metadata_index_path)
@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from link_checker import LinkIndex
+from page_metadata import MetadataIndex
+
+
+class SiteIndex:
+    # Collects what page generation learns about every generated page: its links, for the
+    # link checker, and its metadata, for the metadata index. Either index may be None
+    # when the build doesn't need it.
+    def __init__(self, links: LinkIndex | None=None, metadata: MetadataIndex | None=None):
+        self.links = links
+        self.metadata = metadata
+
+    def add_page(self, source: str | Path, dest_path: str | Path, links: list, metadata: dict):
+        if self.links is not None:
+            self.links.add_page(source, dest_path, links)
+        if self.metadata is not None:
+            self.metadata.add_page(source, dest_path, metadata)
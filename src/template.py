@@ -0,0 +1,87 @@
+import re
+
+from pathlib import Path
+
+from minify import minify_html
+from url_resolver import UrlResolver
+
+placeholder_pattern = re.compile(r"\{\{ (\w[\w-]*) \}\}")
+# template path -> (compile inputs, Template), see load_template
+compiled_templates = {}
+
+
+class Template:
+    # A template split into literal segments with a named slot between each pair:
+    # segments[0] slots[0] segments[1] slots[1] ... segments[-1]
+    # `resolver` is the UrlResolver pages rendered into this template should use, and
+    # `minify` tells page generation to minify content rendered into it as well.
+    def __init__(self, segments: list, slots: list, basepath: str | Path="/", path: str | Path=None, resolver: UrlResolver=None, minify: bool=False):
+        if len(segments) != len(slots) + 1:
+            raise ValueError("Template needs exactly one more segment than slots")
+        self.segments = segments
+        self.slots = slots
+        self.basepath = Path(basepath)
+        self.path = path
+        self.resolver = resolver if resolver is not None else UrlResolver(basepath)
+        self.minify = minify
+
+    def render(self, values: dict) -> str:
+        return "".join(self.iter_render(values))
+
+    def iter_render(self, values: dict):
+        # A value is either a string or an iterable of string chunks (e.g. HTMLNode.iter_html()),
+        # which lets page content be streamed into its slot. Placeholders without a value are
+        # left in the page verbatim.
+        yield self.segments[0]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot, f"{{{{ {slot} }}}}")
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield segment
+
+    def write(self, stream, values: dict):
+        for chunk in self.iter_render(values):
+            stream.write(chunk)
+
+    def __repr__(self):
+        return f"Template(path={self.path}, slots={self.slots}, basepath={self.basepath})"
+
+def compile_template(template_content: str, basepath: str | Path="/", path: str | Path=None, resolver: UrlResolver=None, minify: bool=False) -> Template:
+    if type(template_content) != str:
+        raise TypeError("Template content must be a string.")
+    if minify:
+        # Once per build, instead of once per page
+        template_content = minify_html(template_content)
+    segments = []
+    slots = []
+    previous_end = 0
+    for match in placeholder_pattern.finditer(template_content):
+        segments.append(template_content[previous_end:match.start()])
+        slots.append(match.group(1))
+        previous_end = match.end()
+    segments.append(template_content[previous_end:])
+    # The template's own attributes are resolved once, here; page content is resolved
+    # as it is rendered
+    if resolver is None:
+        resolver = UrlResolver(basepath)
+    segments = [resolver.resolve_markup(segment) for segment in segments]
+    return Template(segments, slots, basepath, path, resolver, minify)
+
+def load_template(template_path: str | Path, basepath: str | Path="/", resolver: UrlResolver=None, minify: bool=False) -> Template | None:
+    try:
+        with open(template_path, 'r') as template_file:
+            template_content = template_file.read()
+    except FileNotFoundError as fnfe:
+        print(f"Template file '{template_path}' not found.")
+        return None
+    # A long-running process (watch mode, the build daemon) reuses the compiled template
+    # until the file or any compile input changes. Only the latest version per path is kept.
+    key = (template_content, str(basepath), None if resolver is None else resolver.fingerprint(), minify)
+    cached = compiled_templates.get(str(template_path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    template = compile_template(template_content, basepath, template_path, resolver, minify)
+    compiled_templates[str(template_path)] = (key, template)
+    return template
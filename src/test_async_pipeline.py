@@ -0,0 +1,116 @@
+import io
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import async_pipeline
+
+from async_pipeline import generate_pages_async
+from generate_content import generate_pages_recursive
+from link_checker import LinkIndex
+from page_metadata import MetadataIndex
+from site_index import SiteIndex
+from template import load_template
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.template = self.root / "template.html"
+        for i in range(10):
+            (self.content / f"post{i}" / "nested").mkdir(parents=True)
+            (self.content / f"post{i}" / "index.md").write_text(f"# Post {i}\n\nSee [the next one](/post{i + 1}/) and `code`.")
+            (self.content / f"post{i}" / "nested" / "index.md").write_text(f"# Nested {i}\n\n- a\n- b")
+        (self.content / "index.md").write_text("# Home\n\n![logo](/images/logo.png)")
+        self.template.write_text("<title>{{ Title }}</title><a href=\"/\">home</a>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, build_function, dest: Path, *args, **kwargs) -> bool:
+        with redirect_stdout(io.StringIO()):
+            return build_function(self.content, self.template, dest, "/base", *args, **kwargs)
+
+    def outputs(self, dest: Path) -> dict:
+        return {path.relative_to(dest).as_posix(): path.read_text() for path in dest.rglob("*") if path.is_file()}
+
+    def test_matches_serial_build(self):
+        self.assertTrue(self.build(generate_pages_recursive, self.root / "serial"))
+        self.assertTrue(self.build(generate_pages_async, self.root / "async", io_concurrency=3, queue_size=1))
+        serial = self.outputs(self.root / "serial")
+        self.assertEqual(len(serial), 21)
+        self.assertEqual(self.outputs(self.root / "async"), serial)
+
+    def test_matches_serial_build_with_processes_and_minify(self):
+        self.template = load_template(self.template, "/base", minify=True)
+        self.assertTrue(self.build(generate_pages_recursive, self.root / "serial"))
+        self.assertTrue(self.build(generate_pages_async, self.root / "async", jobs=2, io_concurrency=2))
+        self.assertIn("<title>Post 1</title><a href=\"/base/\">", self.outputs(self.root / "async")["post1/index.html"])
+        self.assertEqual(self.outputs(self.root / "async"), self.outputs(self.root / "serial"))
+
+    def test_collects_links(self):
+        dest = self.root / "async"
+        link_index = LinkIndex(dest)
+        self.assertTrue(self.build(generate_pages_async, dest, site_index=SiteIndex(link_index)))
+        self.assertEqual(link_index.links_for(self.content / "post3" / "index.md"), [[3, "/post4/"]])
+        self.assertEqual(link_index.links_for(self.content / "index.md"), [[3, "/images/logo.png"]])
+        self.assertEqual(link_index.link_count(), 11)
+
+    def test_collects_metadata(self):
+        (self.content / "post2" / "index.md").write_text("---\ntags: a, b\n---\n# Post 2")
+        dest = self.root / "async"
+        metadata_index = MetadataIndex(dest)
+        self.assertTrue(self.build(generate_pages_async, dest, jobs=2, site_index=SiteIndex(metadata=metadata_index)))
+        self.assertEqual(len(metadata_index.pages), 21)
+        self.assertEqual(metadata_index.metadata_for(dest / "post2" / "index.html"), {"tags": "a, b", "title": "Post 2"})
+
+    def test_shard(self):
+        dest = self.root / "async"
+        self.assertTrue(self.build(generate_pages_async, dest, shard=(1, 3)))
+        serial_dest = self.root / "serial"
+        self.assertTrue(self.build(generate_pages_recursive, serial_dest, shard=(1, 3)))
+        self.assertEqual(self.outputs(dest), self.outputs(serial_dest))
+
+    def test_streams_large_sources(self):
+        dest = self.root / "async"
+        with mock.patch("async_pipeline.streaming_threshold_bytes", 0):
+            self.assertTrue(self.build(generate_pages_async, dest))
+        self.assertTrue(self.build(generate_pages_recursive, self.root / "serial"))
+        self.assertEqual(self.outputs(dest), self.outputs(self.root / "serial"))
+
+    def test_stops_on_failure(self):
+        (self.content / "post5" / "index.md").write_text("No heading here")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertFalse(generate_pages_async(self.content, self.template, self.root / "async", "/"))
+        self.assertIn(f"Stopping build after failure on '{self.content / 'post5' / 'index.md'}'.", output.getvalue())
+        self.assertIn("ValueError: Markdown does not contain a header.", output.getvalue())
+
+    def test_unreadable_directory_fails(self):
+        unreadable = self.content / "post3"
+        list_directory = async_pipeline.list_directory
+        def list_readable_directory(directory):
+            if directory == unreadable:
+                raise PermissionError(f"Permission denied: '{directory}'")
+            return list_directory(directory)
+        output = io.StringIO()
+        with mock.patch("async_pipeline.list_directory", list_readable_directory), redirect_stdout(output):
+            self.assertFalse(generate_pages_async(self.content, self.template, self.root / "async", "/"))
+        self.assertIn(f"Stopping build after failure on '{unreadable}'.", output.getvalue())
+        self.assertIn("PermissionError: Permission denied", output.getvalue())
+
+    def test_indexing_failure_fails(self):
+        site_index = SiteIndex()
+        output = io.StringIO()
+        with mock.patch.object(site_index, "add_page", side_effect=RuntimeError("index full")), redirect_stdout(output):
+            self.assertFalse(generate_pages_async(self.content, self.template, self.root / "async", "/", site_index=site_index))
+        self.assertIn("RuntimeError: index full", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
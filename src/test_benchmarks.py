@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from benchmarks.corpus import generate_corpus, shapes
+from benchmarks.suite import inline_texts, run_shape, stage_names
+
+class TestCorpus(unittest.TestCase):
+    def read_tree(self, root: Path) -> dict:
+        return {path.relative_to(root): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+    def test_generate_corpus_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            summary = generate_corpus(first, "deep", scale=0.02, seed=7)
+            generate_corpus(second, "deep", scale=0.02, seed=7)
+            self.assertEqual(self.read_tree(Path(first)), self.read_tree(Path(second)))
+            self.assertEqual(summary["pages"], len(list(Path(first).rglob("*.md"))))
+
+    def test_generate_corpus_every_shape(self):
+        for shape in shapes:
+            with tempfile.TemporaryDirectory() as tmp:
+                summary = generate_corpus(tmp, shape, scale=0.01)
+                self.assertGreater(summary["bytes"], 0)
+                self.assertTrue((Path(tmp) / "template.html").exists())
+
+    def test_generate_corpus_unknown_shape(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                generate_corpus(tmp, "no-such-shape")
+
+    def test_inline_texts(self):
+        md = "# Title\n\nSome **bold**\ntext\n\n- item _one_\n\n```\ncode\n```"
+        self.assertListEqual(inline_texts(md), ["Title", "Some **bold** text", "item _one_"])
+
+    def test_run_shape_results(self):
+        result = run_shape("code-heavy", scale=0.01, repeat=1)
+        self.assertListEqual(list(result["stages"]), stage_names)
+        self.assertGreater(result["stages"]["build"]["seconds"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
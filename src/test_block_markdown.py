@@ -1,10 +1,15 @@
+import io
+import types
 import unittest
 
 from block_markdown import (
     BlockType,
     block_to_block_type,
+    iter_blocks,
+    iter_numbered_blocks,
     markdown_to_blocks,
     markdown_to_html_node,
+    parse_front_matter,
 )
 
 class TestBlockMarkdown(unittest.TestCase):
@@ -255,6 +260,99 @@ the **same** even with inline stuff
         expected_html = "<div><ol><li>one</li><li>two</li><li>three</li><li>four</li><li>five</li><li>six</li><li>seven</li><li>eight</li><li>nine</li><li>ten</li><li>eleven</li></ol></div>"
         self.assertEqual(html, expected_html)
 
+    def test_iter_blocks_types_and_lines(self):
+        md = "# Title\n\nSome text\nmore text\n\n- one\n- two\n\n> quoted"
+        blocks = list(iter_blocks(md))
+        expected_blocks = [
+            (BlockType.HEADING, ["# Title"]),
+            (BlockType.PARAGRAPH, ["Some text", "more text"]),
+            (BlockType.ULIST, ["- one", "- two"]),
+            (BlockType.QUOTE, ["> quoted"]),
+        ]
+        self.assertListEqual(blocks, expected_blocks)
+
+    def test_iter_blocks_is_lazy(self):
+        self.assertIsInstance(iter_blocks("text"), types.GeneratorType)
+
+    def test_iter_blocks_from_file_lines(self):
+        stream = io.StringIO("1. a\n2. b\n\n```\ncode\n```\n")
+        blocks = list(iter_blocks(stream))
+        expected_blocks = [
+            (BlockType.OLIST, ["1. a", "2. b"]),
+            (BlockType.CODE, ["```", "code", "```"]),
+        ]
+        self.assertListEqual(blocks, expected_blocks)
+
+    def test_iter_numbered_blocks_start_lines(self):
+        md = "\n# Title\n\n```\na\n\nb\n```\n\n\n  Text\nmore"
+        starts = [(start_line, block_type) for start_line, block_type, _ in iter_numbered_blocks(md)]
+        self.assertListEqual(starts, [(2, BlockType.HEADING), (4, BlockType.CODE), (11, BlockType.PARAGRAPH)])
+
+    def test_iter_numbered_blocks_front_matter(self):
+        md = "---\ntitle: Custom\n\ndate: 2024-05-01\n---\n# Heading\n\n---\n\nText"
+        blocks = list(iter_numbered_blocks(md))
+        self.assertEqual(blocks[0], (1, BlockType.FRONT_MATTER, ["title: Custom", "", "date: 2024-05-01"]))
+        # Only a "---" on the first line opens front matter
+        self.assertListEqual([(start, block_type) for start, block_type, _ in blocks[1:]], [(6, BlockType.HEADING), (8, BlockType.PARAGRAPH), (10, BlockType.PARAGRAPH)])
+
+    def test_iter_numbered_blocks_unclosed_front_matter(self):
+        with self.assertRaises(ValueError):
+            list(iter_numbered_blocks("---\ntitle: x\n\n# Heading"))
+
+    def test_parse_front_matter(self):
+        metadata = parse_front_matter(["title: \"A: quoted\"", "draft:true", "", "tags: a, b", "empty:", "last-modified: 2024-05-01"])
+        self.assertEqual(metadata, {"title": "A: quoted", "draft": "true", "tags": "a, b", "empty": "", "last-modified": "2024-05-01"})
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a pair"])
+        with self.assertRaises(ValueError):
+            parse_front_matter(["bad key: x"])
+        with self.assertRaises(ValueError):
+            parse_front_matter(["-key: x"])
+
+    def test_markdown_to_html_node_collects_metadata(self):
+        metadata = {}
+        html = markdown_to_html_node("---\ndate: 2024-05-01\n---\nIntro\n\n```\n# not it\n```\n\n# The [title](/)\n\n# Second", metadata=metadata).to_html()
+        self.assertEqual(metadata, {"date": "2024-05-01", "title": "The [title](/)"})
+        self.assertNotIn("date", html)
+        metadata = {}
+        markdown_to_html_node("---\ntitle: From front matter\n---\n# Heading", metadata=metadata)
+        self.assertEqual(metadata, {"title": "From front matter"})
+
+    def test_markdown_to_html_node_collects_links(self):
+        md = "# [Home](/)\n\nIntro\nsee [a](/a) and\n![b](b.png) then [a](/a)\n\n```\n[not](/link)\n```"
+        links = []
+        markdown_to_html_node(md, links=links)
+        self.assertListEqual(links, [[1, "/"], [4, "/a"], [5, "b.png"], [5, "/a"]])
+
+    def test_markdown_to_blocks_code_with_blank_line(self):
+        md = "```\nfirst\n\nsecond\n```\n\nAfter"
+        blocks = markdown_to_blocks(md)
+        self.assertListEqual(blocks, ["```\nfirst\n\nsecond\n```", "After"])
+
+    def test_markdown_to_html_node_code_block_with_blank_lines(self):
+        md = """
+```
+def main():
+
+    return 0
+```
+
+Done
+"""
+        html = markdown_to_html_node(md).to_html()
+        expected_html = "<div><pre><code>def main():\n\n    return 0\n</code></pre><p>Done</p></div>"
+        self.assertEqual(html, expected_html)
+
+    def test_markdown_to_html_node_code_block_info_string(self):
+        md = "```python\nprint('hi')\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>print('hi')\n</code></pre></div>")
+
+    def test_markdown_to_html_node_whitespace_only_line_separates_blocks(self):
+        md = "First\n   \nSecond"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><p>First</p><p>Second</p></div>")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
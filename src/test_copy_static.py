@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from copy_static import (
+    asset_manifest_name,
+    copy_directory_fingerprinted,
+    fingerprinted_name,
+    load_asset_urls,
+    remove_unlisted_files,
+    sync_directory
+)
+from manifest import hash_bytes
+
+class TestSyncDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.src = root / "static"
+        self.dest = root / "docs"
+        self.manifest = root / ".build" / "manifest.json"
+        (self.src / "images").mkdir(parents=True)
+        (self.src / "index.css").write_text("body {}")
+        (self.src / "images" / "a.png").write_bytes(b"png-a")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sync(self, **kwargs):
+        self.assertTrue(sync_directory(self.src, self.dest, self.manifest, **kwargs))
+
+    def test_first_sync_copies_everything(self):
+        self.sync()
+        self.assertEqual((self.dest / "index.css").read_text(), "body {}")
+        self.assertEqual((self.dest / "images" / "a.png").read_bytes(), b"png-a")
+
+    def test_unchanged_files_are_not_rewritten(self):
+        self.sync()
+        before = (self.dest / "index.css").stat().st_mtime_ns
+        (self.dest / "index.css").write_text("marker")
+        os.utime(self.dest / "index.css", ns=(before, before))
+        self.sync()
+        self.assertEqual((self.dest / "index.css").read_text(), "marker")
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        (self.src / "index.css").write_text("body { color: red; }")
+        os.utime(self.src / "index.css", ns=(0, 10**9))
+        self.sync()
+        self.assertEqual((self.dest / "index.css").read_text(), "body { color: red; }")
+
+    def test_deleted_file_is_removed_and_other_outputs_kept(self):
+        self.sync()
+        (self.dest / "index.html").write_text("generated page")
+        (self.src / "images" / "a.png").unlink()
+        self.sync()
+        self.assertFalse((self.dest / "images" / "a.png").exists())
+        self.assertFalse((self.dest / "images").exists())
+        self.assertTrue((self.dest / "index.html").exists())
+
+    def test_remove_unlisted_files(self):
+        self.sync()
+        (self.dest / "blog").mkdir()
+        (self.dest / "blog" / "index.html").write_text("stale page")
+        (self.dest / "index.html").write_text("page")
+        self.assertTrue(remove_unlisted_files(self.dest, {"index.html", "index.css"}))
+        self.assertListEqual(sorted(path.name for path in self.dest.rglob("*")), ["index.css", "index.html"])
+
+    def test_touched_identical_file_skipped_with_hash(self):
+        self.sync(use_hash=True)
+        (self.dest / "index.css").write_text("marker")
+        os.utime(self.src / "index.css", ns=(0, 10**9))
+        self.sync(use_hash=True)
+        self.assertEqual((self.dest / "index.css").read_text(), "marker")
+
+    def test_hardlink_mode(self):
+        self.sync(link_mode="hardlink")
+        self.assertTrue(os.path.samefile(self.src / "index.css", self.dest / "index.css"))
+
+    def test_reflink_mode_falls_back_to_copy(self):
+        self.sync(link_mode="reflink")
+        self.assertEqual((self.dest / "index.css").read_text(), "body {}")
+
+    def test_invalid_link_mode(self):
+        self.assertFalse(sync_directory(self.src, self.dest, self.manifest, link_mode="symlink"))
+    def test_fingerprinted_sync(self):
+        self.sync(fingerprint=True)
+        css_name = fingerprinted_name("index.css", hash_bytes(b"body {}"))
+        self.assertEqual((self.dest / css_name).read_text(), "body {}")
+        self.assertFalse((self.dest / "index.css").exists())
+        self.assertEqual(load_asset_urls(self.dest)["/index.css"], f"/{css_name}")
+
+    def test_fingerprinted_sync_replaces_changed_asset(self):
+        self.sync(fingerprint=True)
+        old_name = load_asset_urls(self.dest)["/index.css"]
+        (self.src / "index.css").write_text("body { color: red; }")
+        os.utime(self.src / "index.css", ns=(0, 10**9))
+        self.sync(fingerprint=True)
+        new_name = load_asset_urls(self.dest)["/index.css"]
+        self.assertNotEqual(old_name, new_name)
+        self.assertFalse((self.dest / old_name.lstrip("/")).exists())
+        self.assertTrue((self.dest / new_name.lstrip("/")).exists())
+
+    def test_switching_fingerprint_off(self):
+        self.sync(fingerprint=True)
+        self.sync()
+        self.assertEqual(sorted(path.relative_to(self.dest).as_posix() for path in self.dest.rglob("*") if path.is_file()), ["images/a.png", "index.css"])
+        self.assertEqual(load_asset_urls(self.dest), {})
+
+class TestFingerprint(unittest.TestCase):
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("images/a.png", "0123456789abcdef"), "images/a.0123456789.png")
+        self.assertEqual(fingerprinted_name("app.min.js", "0123456789abcdef"), "app.min.0123456789.js")
+        self.assertEqual(fingerprinted_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+        self.assertEqual(fingerprinted_name("favicon.ico", "0123456789abcdef"), "favicon.ico")
+
+    def test_copy_directory_fingerprinted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "static"
+            dest = Path(tmp) / "docs"
+            (src / "images").mkdir(parents=True)
+            (src / "images" / "a.png").write_bytes(b"png-a")
+            self.assertTrue(copy_directory_fingerprinted(src, dest))
+            name = fingerprinted_name("images/a.png", hash_bytes(b"png-a"))
+            self.assertEqual((dest / name).read_bytes(), b"png-a")
+            self.assertTrue((dest / asset_manifest_name).exists())
+            self.assertEqual(load_asset_urls(dest), {"/images/a.png": f"/{name}"})
+
+if __name__ == "__main__":
+    unittest.main()
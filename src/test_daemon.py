@@ -0,0 +1,127 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from build_client import send_request
+from daemon import BuildDaemon
+from page_cache import MemoryPageCache
+from watch import Watcher
+
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.static = root / "static"
+        self.dest = root / "docs"
+        self.template = root / "template.html"
+        self.content.mkdir()
+        self.static.mkdir()
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "other.md").write_text("# Other\n\nPage")
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+        self.cache = MemoryPageCache(root / ".build" / "cache")
+        watcher = Watcher(self.content, self.static, self.template, self.dest, "/", root / ".build" / "manifest.json", cache=self.cache)
+        self.socket_path = str(root / ".build" / "daemon.sock")
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(watcher.build())
+        self.daemon = BuildDaemon(watcher, self.socket_path)
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.start()
+        # The socket file appears when it is bound, a moment before the daemon listens on it
+        for _ in range(100):
+            with redirect_stdout(io.StringIO()):
+                if send_request(self.socket_path, {"command": "status"}, io.StringIO()):
+                    break
+            threading.Event().wait(0.02)
+
+    def serve(self):
+        with redirect_stdout(io.StringIO()):
+            self.daemon.serve()
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            self.request({"command": "stop"})
+        self.thread.join(timeout=5)
+        self.tmp.cleanup()
+
+    def request(self, request: dict) -> tuple:
+        output = io.StringIO()
+        with redirect_stdout(io.StringIO()):
+            success = send_request(self.socket_path, request, output)
+        return success, output.getvalue()
+
+    def touch(self, path: Path, text: str):
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_build_without_changes(self):
+        success, output = self.request({"command": "build"})
+        self.assertTrue(success)
+        self.assertIn("No changes; the site is up to date.", output)
+
+    def test_build_streams_rebuild_of_changed_page(self):
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        success, output = self.request({"command": "build"})
+        self.assertTrue(success)
+        self.assertIn("Regenerated 1 page(s), 1 unchanged.", output)
+        self.assertIn("Edited", (self.dest / "index.html").read_text())
+
+    def test_build_checks_only_named_paths(self):
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        self.touch(self.content / "other.md", "# Other\n\nEdited")
+        success, output = self.request({"command": "build", "paths": [str(self.content / "index.md")]})
+        self.assertTrue(success, output)
+        self.assertIn("Regenerated 1 page(s), 1 unchanged.", output)
+        self.assertNotIn("Edited", (self.dest / "other.html").read_text())
+        self.assertFalse(self.request({"command": "build", "paths": "content"})[0])
+
+    def test_failed_build_is_reported(self):
+        self.touch(self.content / "index.md", "No heading")
+        success, output = self.request({"command": "build"})
+        self.assertFalse(success)
+        self.assertIn("Rebuild failed", output)
+        # The daemon keeps serving after a failed build
+        self.touch(self.content / "index.md", "# Fixed")
+        self.assertTrue(self.request({"command": "build"})[0])
+
+    def test_page_cache_is_kept_in_memory(self):
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        self.request({"command": "build"})
+        # Served from memory even with the disk cache gone
+        for path in self.cache.cache_dir.glob("*.json"):
+            path.unlink()
+        self.touch(self.content / "index.md", "# Home\n\nWelcome")
+        hits = self.cache.hits
+        self.assertTrue(self.request({"command": "build"})[0])
+        self.assertEqual(self.cache.hits, hits + 1)
+
+    def test_status_and_unknown_command(self):
+        success, output = self.request({"command": "status"})
+        self.assertTrue(success)
+        self.assertIn("0 build(s)", output)
+        self.assertFalse(self.request({"command": "explode"})[0])
+
+    def test_stop(self):
+        success, output = self.request({"command": "stop"})
+        self.assertTrue(success)
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+        self.assertFalse(self.request({"command": "build"})[0])
+
+    def test_second_daemon_refuses_socket(self):
+        self.request({"command": "status"})
+        with redirect_stdout(io.StringIO()):
+            self.assertFalse(BuildDaemon(self.daemon.watcher, self.socket_path).serve())
+
+
+if __name__ == "__main__":
+    unittest.main()
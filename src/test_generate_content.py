@@ -1,6 +1,19 @@
+import io
+import json
+import tempfile
 import unittest
 
-from generate_content import extract_title
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import generate_content
+
+from generate_content import discover_pages, extract_title, generate_pages, generate_pages_incremental
+from link_checker import LinkIndex
+from page_metadata import MetadataIndex
+from site_index import SiteIndex
+from template import compile_template, load_template
+from url_resolver import UrlResolver
 
 class TestGenerateContent(unittest.TestCase):
     def test_extract_title(self):
@@ -42,6 +55,13 @@ That comes after
         with self.assertRaises(ValueError):
             title = extract_title(md)
     
+    def test_extract_title_from_front_matter(self):
+        self.assertEqual(extract_title("---\ntitle: Custom\n---\n# Heading"), "Custom")
+        self.assertEqual(extract_title("---\ndate: 2024\n---\n# Heading"), "Heading")
+
+    def test_extract_title_skips_code(self):
+        self.assertEqual(extract_title("```\n\n# comment\n```\n\n# Title"), "Title")
+
     def test_extract_title_empty_heading(self):
         md = "# "
         title = extract_title(md)
@@ -53,5 +73,218 @@ That comes after
         with self.assertRaises(ValueError):
             title = extract_title(md)
 
+class TestGeneratePagesIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.dest = root / "docs"
+        self.template = root / "template.html"
+        self.manifest = root / ".build" / "manifest.json"
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "index.md").write_text("# Blog\n\nPosts")
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath="/"):
+        self.assertTrue(generate_pages_incremental(self.content, self.template, self.dest, basepath, self.manifest))
+
+    def mtimes(self):
+        return {path: path.stat().st_mtime_ns for path in self.dest.rglob("*.html")}
+
+    def test_discover_pages(self):
+        pages = sorted(discover_pages(self.content, self.dest))
+        expected = [
+            (self.content / "blog" / "index.md", self.dest / "blog" / "index.html"),
+            (self.content / "index.md", self.dest / "index.html"),
+        ]
+        self.assertListEqual(pages, expected)
+
+    def test_first_build_generates_everything(self):
+        self.build()
+        self.assertEqual((self.dest / "index.html").read_text(), "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>")
+        self.assertTrue((self.dest / "blog" / "index.html").exists())
+        self.assertTrue(self.manifest.exists())
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        (self.dest / "index.html").write_text("untouched")
+        self.build()
+        self.assertEqual((self.dest / "index.html").read_text(), "untouched")
+
+    def test_changed_source_is_regenerated(self):
+        self.build()
+        (self.dest / "blog" / "index.html").write_text("untouched")
+        (self.content / "index.md").write_text("# Home\n\nEdited")
+        self.build()
+        self.assertIn("Edited", (self.dest / "index.html").read_text())
+        self.assertEqual((self.dest / "blog" / "index.html").read_text(), "untouched")
+
+    def test_template_change_regenerates_everything(self):
+        self.build()
+        self.template.write_text("<h2>{{ Title }}</h2>{{ Content }}")
+        self.build()
+        self.assertTrue((self.dest / "index.html").read_text().startswith("<h2>Home</h2>"))
+        self.assertTrue((self.dest / "blog" / "index.html").read_text().startswith("<h2>Blog</h2>"))
+
+    def test_basepath_change_regenerates_everything(self):
+        self.build()
+        (self.dest / "index.html").write_text("untouched")
+        self.build(basepath="/site")
+        self.assertNotEqual((self.dest / "index.html").read_text(), "untouched")
+
+    def test_generator_change_regenerates_everything(self):
+        self.build()
+        manifest = json.loads(self.manifest.read_text())
+        for entry in manifest["pages"].values():
+            entry["generator_version"] = "older"
+        self.manifest.write_text(json.dumps(manifest))
+        (self.dest / "index.html").write_text("untouched")
+        self.build()
+        self.assertNotEqual((self.dest / "index.html").read_text(), "untouched")
+
+    def test_links_indexed_for_skipped_pages(self):
+        (self.content / "index.md").write_text("# Home\n\n[Blog](/blog/)")
+        self.build()
+        link_index = LinkIndex(self.dest)
+        self.assertTrue(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, site_index=SiteIndex(link_index)))
+        self.assertListEqual(link_index.links_for(self.content / "index.md"), [[3, "/blog/"]])
+        self.assertListEqual(link_index.check({"/index.html", "/blog/index.html"}), [])
+
+    def test_metadata_indexed_for_skipped_pages(self):
+        (self.content / "index.md").write_text("---\ndate: 2024-05-01\n---\n# Home")
+        self.build()
+        metadata_index = MetadataIndex(self.dest)
+        self.assertTrue(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, site_index=SiteIndex(metadata=metadata_index)))
+        self.assertEqual(metadata_index.metadata_for(self.dest / "index.html"), {"date": "2024-05-01", "title": "Home"})
+        self.assertEqual(metadata_index.metadata_for(self.dest / "blog" / "index.html"), {"title": "Blog"})
+
+    def test_asset_urls_rewritten_and_tracked(self):
+        (self.content / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+        self.build()
+        template = load_template(self.template, "/", UrlResolver("/", {"/logo.png": "/logo.abc.png"}))
+        self.assertTrue(generate_pages_incremental(self.content, template, self.dest, "/", self.manifest))
+        self.assertIn('src="/logo.abc.png"', (self.dest / "index.html").read_text())
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        (self.content / "blog" / "index.md").unlink()
+        self.build()
+        self.assertFalse((self.dest / "blog" / "index.html").exists())
+        self.assertTrue((self.dest / "index.html").exists())
+
+class TestGeneratePagesParallel(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.template = root / "template.html"
+        self.content.mkdir()
+        for i in range(8):
+            (self.content / f"post{i}.md").write_text(f"# Post {i}\n\nSome **bold** [link](/post{i})")
+        self.template.write_text('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, dest_name, jobs):
+        dest = Path(self.tmp.name) / dest_name
+        pages = discover_pages(self.content, dest)
+        self.assertTrue(generate_pages(pages, self.template, "/site", jobs))
+        return {path.relative_to(dest): path.read_bytes() for path in dest.rglob("*")}
+
+    def test_parallel_matches_serial(self):
+        self.assertEqual(self.build("serial", 1), self.build("parallel", 4))
+
+    def test_parallel_collects_links(self):
+        dest = Path(self.tmp.name) / "docs"
+        link_index = LinkIndex(dest)
+        self.assertTrue(generate_pages(discover_pages(self.content, dest), self.template, "/", 4, site_index=SiteIndex(link_index)))
+        self.assertEqual(link_index.link_count(), 8)
+        self.assertListEqual(link_index.links_for(self.content / "post3.md"), [[3, "/post3"]])
+
+    def test_parallel_collects_metadata(self):
+        dest = Path(self.tmp.name) / "docs"
+        metadata_index = MetadataIndex(dest)
+        self.assertTrue(generate_pages(discover_pages(self.content, dest), self.template, "/", 4, site_index=SiteIndex(metadata=metadata_index)))
+        self.assertEqual(metadata_index.metadata_for(dest / "post3.html"), {"title": "Post 3"})
+        self.assertEqual(len(metadata_index.pages), 8)
+
+    def test_parallel_failure_is_reported(self):
+        (self.content / "broken.md").write_text("# Broken\n\nUnterminated **bold")
+        dest = Path(self.tmp.name) / "docs"
+        self.assertFalse(generate_pages(discover_pages(self.content, dest), self.template, "/", 4))
+
+    def test_parallel_failure_blames_first_page(self):
+        dest = Path(self.tmp.name) / "docs"
+        pages = discover_pages(self.content, dest)
+        # The first broken page takes longest, so it is not the first failure to finish
+        pages[0][0].write_text("# Broken\n\n" + "Some *text* " * 20000 + "Unterminated **bold")
+        pages[-1][0].write_text("# Broken\n\nUnterminated **bold")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertFalse(generate_pages(pages, self.template, "/", 4))
+        self.assertIn(f"Stopping build after failure on '{pages[0][0]}'.", output.getvalue())
+        self.assertNotIn(f"failure on '{pages[-1][0]}'", output.getvalue())
+
+class TestGeneratePageStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.template = compile_template('<title>{{ Title }}</title><a href="/">{{ Content }}</a>', "/site", None)
+        self.source = self.root / "big.md"
+        self.source.write_text(
+            "Intro before the title\n\n# Big **page**\n\n"
+            + "Some [link](/post) and `code`\n\n```\nfenced\n\nblock\n```\n\n- one\n- two\n\n" * 50
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_streaming_matches_in_memory(self):
+        self.assertTrue(generate_content.generate_page_with_template(self.source, self.template, self.root / "normal.html"))
+        self.assertTrue(generate_content.generate_page_streaming(self.source, self.template, self.root / "streamed.html"))
+        self.assertEqual((self.root / "normal.html").read_text(), (self.root / "streamed.html").read_text())
+
+    def test_threshold_selects_streaming(self):
+        threshold = generate_content.streaming_threshold_bytes
+        generate_content.streaming_threshold_bytes = 1
+        try:
+            self.assertTrue(generate_content.generate_page_with_template(self.source, self.template, self.root / "out.html"))
+        finally:
+            generate_content.streaming_threshold_bytes = threshold
+        self.assertIn('<a href="/site/post">link</a>', (self.root / "out.html").read_text())
+
+    def test_code_samples_not_rewritten(self):
+        self.source.write_text('# Title\n\n```\n<a href="/x">\n```\n\n[x](/x)')
+        for generate in (generate_content.generate_page_with_template, generate_content.generate_page_streaming):
+            self.assertTrue(generate(self.source, self.template, self.root / "out.html"))
+            html = (self.root / "out.html").read_text()
+            self.assertIn('<code><a href="/x">\n</code>', html)
+            self.assertIn('<a href="/site/x">x</a>', html)
+
+    def test_front_matter(self):
+        template = compile_template("<title>{{ Title }}</title><time>{{ date }}</time>{{ Content }}")
+        self.source.write_text("---\ntitle: Custom\ndate: 2024-05-01\n---\nIntro\n\n# Heading")
+        for generate in (generate_content.generate_page_with_template, generate_content.generate_page_streaming):
+            metadata = {}
+            self.assertTrue(generate(self.source, template, self.root / "out.html", metadata=metadata))
+            self.assertEqual((self.root / "out.html").read_text(), "<title>Custom</title><time>2024-05-01</time><div><p>Intro</p><h1>Heading</h1></div>")
+            self.assertEqual(metadata, {"title": "Custom", "date": "2024-05-01"})
+
+    def test_missing_metadata_slot_is_empty(self):
+        template = compile_template("<title>{{ Title }}</title><time>{{ date }}</time>{{ Content }}")
+        self.source.write_text("# Heading")
+        self.assertTrue(generate_content.generate_page_with_template(self.source, template, self.root / "out.html"))
+        self.assertEqual((self.root / "out.html").read_text(), "<title>Heading</title><time></time><div><h1>Heading</h1></div>")
+
+    def test_streaming_without_title_raises(self):
+        self.source.write_text("No title here\n\nat all")
+        with self.assertRaises(ValueError):
+            generate_content.generate_page_streaming(self.source, self.template, self.root / "out.html")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,8 @@
+import io
 import unittest
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from url_resolver import UrlResolver
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -53,6 +55,22 @@ class TestHTMLNode(unittest.TestCase):
         expected_repr = "HTMLNode(tag=div, value=Hello, children=[], props={'property': 'value'})"
         self.assertEqual(repr(node), expected_repr)
     
+    def test_slots_no_instance_dict(self):
+        for node in [HTMLNode(), LeafNode(tag="p", value="x"), ParentNode(tag="div", children=[LeafNode(tag=None, value="x")])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            LeafNode(tag="p", value="x").extra = "not allowed"
+
+    def test_make_skips_validation(self):
+        node = LeafNode._make(tag="a", value="Link", props={"href": "/page"})
+        self.assertIsInstance(node, LeafNode)
+        self.assertIsNone(node.children)
+        self.assertEqual(node.to_html(), LeafNode(tag="a", value="Link", props={"href": "/page"}).to_html())
+
+        parent = ParentNode._make(tag="p", children=[node])
+        self.assertIsInstance(parent, ParentNode)
+        self.assertEqual(parent.to_html(), '<p><a href="/page">Link</a></p>')
+
     def test_repr_none_fields(self):
         node = HTMLNode()
         expected_repr = "HTMLNode(tag=None, value=None, children=None, props=None)"
@@ -155,6 +173,39 @@ class TestParentNode(unittest.TestCase):
         expected_html = '<section class="outer"><div><span>Inner Child</span></div></section>'
         self.assertEqual(outer_parent.to_html(), expected_html)
 
+    def test_iter_html_chunks(self):
+        child1 = LeafNode(tag="a", value="Link", props={"href": "/page"})
+        child2 = LeafNode(tag=None, value=" text")
+        parent = ParentNode(tag="p", children=[child1, child2])
+        expected_chunks = ['<p>', '<a href="/page">Link</a>', ' text', '</p>']
+        self.assertListEqual(list(parent.iter_html()), expected_chunks)
+
+    def test_write_html(self):
+        inner_parent = ParentNode(tag="li", children=[LeafNode(tag="b", value="Item")])
+        outer_parent = ParentNode(tag="ul", children=[inner_parent, LeafNode(tag="li", value="Other")])
+        stream = io.StringIO()
+        outer_parent.write_html(stream)
+        self.assertEqual(stream.getvalue(), outer_parent.to_html())
+        self.assertEqual(stream.getvalue(), "<ul><li><b>Item</b></li><li>Other</li></ul>")
+
+    def test_to_html_deeply_nested(self):
+        node = LeafNode(tag=None, value="deep")
+        depth = 5000
+        for _ in range(depth):
+            node = ParentNode(tag="div", children=[node])
+        self.assertEqual(node.to_html(), "<div>" * depth + "deep" + "</div>" * depth)
+
+    def test_to_html_with_resolver(self):
+        props = {"href": "/blog"}
+        node = ParentNode(tag="p", children=[
+            LeafNode(tag="a", value="Blog", props=props),
+            LeafNode(tag="img", value="", props={"src": "/logo.png", "alt": "Logo"}),
+        ])
+        self.assertEqual(node.to_html(UrlResolver("/site")), '<p><a href="/site/blog">Blog</a><img src="/site/logo.png" alt="Logo"></img></p>')
+        # Resolving never changes the tree itself
+        self.assertEqual(props, {"href": "/blog"})
+        self.assertEqual(node.to_html(), '<p><a href="/blog">Blog</a><img src="/logo.png" alt="Logo"></img></p>')
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import struct
+import tempfile
+import unittest
+
+from pathlib import Path
+from unittest import mock
+
+from image_size import measure_images, read_image_size
+from url_resolver import UrlResolver
+
+png_header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 640, 480) + b"\x08\x06\x00\x00\x00"
+gif_header = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 8
+jpeg_header = (
+    b"\xff\xd8"
+    + b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9 # APP0 segment, skipped
+    + b"\xff\xc2" + struct.pack(">HBHH", 17, 8, 300, 200) + b"\x03" + b"\x00" * 9 # progressive SOF
+)
+webp_lossy_header = b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 120, 90) + b"\x00" * 4
+webp_lossless_header = b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2f" + ((99) | (49 << 14)).to_bytes(4, "little") + b"\x00" * 8
+webp_extended_header = b"RIFF\x00\x00\x00\x00WEBPVP8X\x00\x00\x00\x00\x00\x00\x00\x00" + (1919).to_bytes(3, "little") + (1079).to_bytes(3, "little") + b"\x00" * 4
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def image(self, name: str, data: bytes) -> Path:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def test_formats(self):
+        cases = [
+            ("a.png", png_header, (640, 480)),
+            ("a.gif", gif_header, (32, 16)),
+            ("a.jpg", jpeg_header, (200, 300)),
+            ("lossy.webp", webp_lossy_header, (120, 90)),
+            ("lossless.webp", webp_lossless_header, (100, 50)),
+            ("extended.webp", webp_extended_header, (1920, 1080)),
+        ]
+        for name, data, expected in cases:
+            with self.subTest(name=name):
+                self.assertEqual(tuple(read_image_size(self.image(name, data))), expected)
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(read_image_size(self.image("a.txt", b"not an image")))
+        self.assertIsNone(read_image_size(self.image("b.png", png_header[:20])))
+        self.assertIsNone(read_image_size(self.image("c.jpg", jpeg_header[:24])))
+
+    def test_measure_images_caches_by_hash(self):
+        static = self.root / "static"
+        self.image("static/images/a.png", png_header)
+        self.image("static/images/b.gif", gif_header)
+        self.image("static/notes.txt", b"text")
+        cache_path = self.root / ".build" / "image-sizes.json"
+        sizes = measure_images(static, cache_path)
+        self.assertEqual(sizes, {"/images/a.png": (640, 480), "/images/b.gif": (32, 16)})
+        # A copy with the same content is answered from the cache without being parsed
+        self.image("static/images/copy.png", png_header)
+        with mock.patch("image_size.read_image_size") as read_image_size_mock:
+            sizes = measure_images(static, cache_path)
+        read_image_size_mock.assert_not_called()
+        self.assertEqual(sizes["/images/copy.png"], (640, 480))
+
+    def test_resolver_adds_image_attributes(self):
+        resolver = UrlResolver("/site", {"/a.png": "/a.123.png"}, {"/a.png": (640, 480)})
+        props = resolver.resolve_props("img", {"src": "/a.png", "alt": "A"})
+        self.assertEqual(props, {"src": "/site/a.123.png", "alt": "A", "width": "640", "height": "480", "loading": "lazy", "decoding": "async"})
+        props = resolver.resolve_props("img", {"src": "https://example.com/b.png", "alt": "B"})
+        self.assertEqual(props, {"src": "https://example.com/b.png", "alt": "B", "loading": "lazy", "decoding": "async"})
+        self.assertEqual(resolver.resolve_props("a", {"href": "/b.png"}), {"href": "/site/b.png"})
+
+    def test_resolver_fingerprint(self):
+        self.assertEqual(UrlResolver("/site").fingerprint(), UrlResolver("/site").fingerprint())
+        self.assertNotEqual(UrlResolver("/site").fingerprint(), UrlResolver("/site", image_sizes={}).fingerprint())
+        self.assertNotEqual(UrlResolver("/site", image_sizes={"/a.png": (1, 2)}).fingerprint(), UrlResolver("/site", image_sizes={"/a.png": (2, 2)}).fingerprint())
+
+if __name__ == "__main__":
+    unittest.main()
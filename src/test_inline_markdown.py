@@ -1,15 +1,21 @@
+import random
 import unittest
 
 from inline_markdown import (
     extract_markdown_images,
     extract_markdown_links,
+    split_nodes_bold,
+    split_nodes_code,
     split_nodes_delimiter,
     split_nodes_image,
+    split_nodes_italic,
     split_nodes_link,
+    split_text_nodes,
     text_node_to_html_node,
     text_to_text_nodes
 )
 from textnode import TextNode, TextType
+from url_resolver import UrlResolver
 
 class TestInlineMarkdown(unittest.TestCase):
 
@@ -55,6 +61,13 @@ class TestInlineMarkdown(unittest.TestCase):
         self.assertTrue("alt" in html_node.props)
         self.assertEqual(html_node.props["alt"], "Image text")
 
+    def test_text_node_to_html_node_with_resolver(self):
+        resolver = UrlResolver("/site")
+        link_node = text_node_to_html_node(TextNode("Blog", TextType.LINK, "/blog"), resolver)
+        self.assertEqual(link_node.props["href"], "/site/blog")
+        image_node = text_node_to_html_node(TextNode("Logo", TextType.IMAGE, "https://example.com/logo.png"), resolver)
+        self.assertEqual(image_node.props["src"], "https://example.com/logo.png")
+
     def test_split_nodes_delimiter_not_in_text(self):
         node_list = [TextNode("This is text with no delimiters", TextType.PLAIN)]
         new_nodes = split_nodes_delimiter(node_list, "`", TextType.CODE)
@@ -346,6 +359,75 @@ class TestInlineMarkdown(unittest.TestCase):
         with self.assertRaises(TypeError):
             new_nodes = text_to_text_nodes(None)
 
+    def test_text_to_text_nodes_matches_split_chain(self):
+        texts = [
+            "**bold** and _italic_ and `code`",
+            "This is `` empty code block",
+            "`code1``code2` next to each other",
+            "![image](/a.png)![second](/b.png) and [link](/c)",
+            "Not a link [just brackets] or ![broken]() image",
+            "Mixed **bold [link](/x)** text",
+            "****",
+        ]
+        for text in texts:
+            new_nodes = [TextNode(text, TextType.PLAIN)]
+            for function in [split_nodes_bold, split_nodes_italic, split_nodes_code, split_nodes_image, split_nodes_link]:
+                new_nodes = function(new_nodes)
+            self.assertListEqual(text_to_text_nodes(text), new_nodes)
+
+    def test_text_to_text_nodes_unterminated_backtick_in_span(self):
+        for text in ["**x ` y**", "_`_", "use _ and a ` tick_"]:
+            self.assertListEqual(text_to_text_nodes(text), split_text_nodes(text))
+        self.assertListEqual(text_to_text_nodes("**x ` y**"), [TextNode("x ` y", TextType.BOLD)])
+
+    def test_text_to_text_nodes_accepts_what_split_chain_accepts(self):
+        # Differential check: any text the split chain parses must parse, and text using a
+        # single kind of markup must parse the same way
+        rng = random.Random(5)
+        alphabet = ["a", " ", "**", "_", "`", "[", "]", "(", ")", "!", "/x"]
+        for _ in range(20000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 9)))
+            try:
+                expected = split_text_nodes(text)
+            except SyntaxError:
+                continue
+            new_nodes = text_to_text_nodes(text)
+            if sum(token in text for token in ("**", "_", "`", "[")) <= 1:
+                self.assertListEqual(new_nodes, expected, text)
+
+    def test_text_to_text_nodes_code_is_opaque(self):
+        new_nodes = text_to_text_nodes("Use `a**b**_c_` here")
+        expected_nodes = [
+            TextNode("Use ", TextType.PLAIN),
+            TextNode("a**b**_c_", TextType.CODE),
+            TextNode(" here", TextType.PLAIN),
+        ]
+        self.assertListEqual(new_nodes, expected_nodes)
+
+    def test_text_to_text_nodes_underscore_in_url(self):
+        new_nodes = text_to_text_nodes("See [the docs](https://example.com/some_page_name) and _this_")
+        expected_nodes = [
+            TextNode("See ", TextType.PLAIN),
+            TextNode("the docs", TextType.LINK, "https://example.com/some_page_name"),
+            TextNode(" and ", TextType.PLAIN),
+            TextNode("this", TextType.ITALIC),
+        ]
+        self.assertListEqual(new_nodes, expected_nodes)
+
+    def test_text_to_text_nodes_nested_emphasis(self):
+        new_nodes = text_to_text_nodes("_outer **inner** outer_ and **bold _italic_ bold**")
+        expected_nodes = [
+            TextNode("outer **inner** outer", TextType.ITALIC),
+            TextNode(" and ", TextType.PLAIN),
+            TextNode("bold _italic_ bold", TextType.BOLD),
+        ]
+        self.assertListEqual(new_nodes, expected_nodes)
+
+    def test_text_to_text_nodes_unterminated(self):
+        for text in ["**bold", "_italic", "`code"]:
+            with self.assertRaises(SyntaxError):
+                text_to_text_nodes(text)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import unittest
+
+import inline_memo
+
+from block_markdown import markdown_to_html_node, text_to_children_html_nodes
+from inline_memo import InlineMemo
+
+markdown = """# Notes
+
+- See [the docs](/docs) for **details**
+- Plain item
+- See [the docs](/docs) for **details**
+
+See [the docs](/docs) for **details**
+
+![logo](/images/logo.png)
+
+![logo](/images/logo.png)"""
+
+
+class TestInlineMemo(unittest.TestCase):
+    def setUp(self):
+        self.memo = InlineMemo(max_entries=3)
+        self.memo.start()
+
+    def tearDown(self):
+        self.memo.stop()
+
+    def test_same_html_as_without_memo(self):
+        with_memo = markdown_to_html_node(markdown).to_html()
+        self.memo.stop()
+        self.assertEqual(with_memo, markdown_to_html_node(markdown).to_html())
+
+    def test_counts_repeats(self):
+        markdown_to_html_node(markdown)
+        self.assertEqual(self.memo.hits, 3)
+        self.assertEqual(self.memo.misses, 4)
+        self.assertEqual(self.memo.summary(), "Inline memo: 3 hit(s), 4 miss(es) (42.9% hit rate), 3 of 3 entries used.")
+
+    def test_evicts_least_recently_used(self):
+        for text in ("a", "b", "c", "a", "d"):
+            text_to_children_html_nodes(text)
+        self.assertEqual(list(self.memo.entries), ["c", "a", "d"])
+        text_to_children_html_nodes("b")
+        self.assertEqual(self.memo.misses, 5)
+
+    def test_hits_return_fresh_nodes(self):
+        first = text_to_children_html_nodes("a [link](/x)")
+        second = text_to_children_html_nodes("a [link](/x)")
+        self.assertEqual(self.memo.hits, 1)
+        self.assertIsNot(first[1], second[1])
+        self.assertIsNot(first[1].props, second[1].props)
+        second[1].props["href"] = "/changed"
+        second.append("extra")
+        third = text_to_children_html_nodes("a [link](/x)")
+        self.assertEqual(len(third), 2)
+        self.assertEqual(third[1].props, {"href": "/x"})
+        self.assertEqual(first[1].props, {"href": "/x"})
+
+    def test_disabled_by_default(self):
+        self.memo.stop()
+        self.assertIsNone(inline_memo.current)
+        text_to_children_html_nodes("a")
+        self.assertEqual(self.memo.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
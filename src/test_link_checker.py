@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from htmlnode import LeafNode, ParentNode
+from link_checker import LinkIndex, collect_block_links, link_target, site_paths
+
+
+class TestLinkChecker(unittest.TestCase):
+    def test_collect_block_links_lines(self):
+        block = ParentNode(tag="ul", children=[
+            ParentNode(tag="li", children=[LeafNode(tag="a", value="a", props={"href": "/a"})]),
+            ParentNode(tag="li", children=[LeafNode(tag="img", value="", props={"src": "/b.png", "alt": "b"})]),
+        ])
+        links = collect_block_links(block, 10, ["- [a](/a)", "- ![b](/b.png)"])
+        self.assertListEqual(links, [[10, "/a"], [11, "/b.png"]])
+
+    def test_link_target(self):
+        self.assertEqual(link_target("/blog/post/index.html", "/images/a.png"), "/images/a.png")
+        self.assertEqual(link_target("/blog/post/index.html", "../other/"), "/blog/other")
+        self.assertEqual(link_target("/blog/post/index.html", "a.png#frag"), "/blog/post/a.png")
+        self.assertEqual(link_target("/index.html", "/"), "/")
+
+    def test_link_target_unverifiable(self):
+        for url in ("https://example.com/", "//cdn.example.com/a.js", "mailto:a@example.com", "#top", "?q=1"):
+            self.assertIsNone(link_target("/index.html", url))
+
+    def test_check_reports_broken_links(self):
+        index = LinkIndex("docs")
+        index.add_page("content/index.md", "docs/index.html", [[3, "/"], [4, "/blog"], [5, "/images/a.png"], [7, "/missing"]])
+        index.add_page("content/blog/index.md", "docs/blog/index.html", [[2, "../images/b.png"], [3, "https://example.com"]])
+        paths = {"/index.html", "/blog/index.html", "/images/a.png"}
+        broken = index.check(paths)
+        self.assertListEqual(broken, [("content/blog/index.md", 2, "../images/b.png"), ("content/index.md", 7, "/missing")])
+        self.assertEqual(index.link_count(), 6)
+
+    def test_site_paths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "static" / "images").mkdir(parents=True)
+            (root / "static" / "index.css").write_text("")
+            (root / "static" / "images" / "a.png").write_bytes(b"")
+            dest = root / "docs"
+            paths = site_paths(dest, [dest / "index.html", dest / "blog" / "index.html"], root / "static")
+        self.assertSetEqual(paths, {"/index.html", "/blog/index.html", "/index.css", "/images/a.png"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import main
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "static").mkdir()
+        (self.root / "content" / "index.md").write_text("# Home\n\n[Blog](/blog/)")
+        (self.root / "content" / "blog" / "index.md").write_text("# Blog\n\n[Home](/)")
+        (self.root / "static" / "index.css").write_text("body {}")
+        (self.root / "template.html").write_text('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_main(self, *args) -> bool:
+        with mock.patch("sys.argv", ["main.py", *args]), redirect_stdout(io.StringIO()):
+            return main.main()
+
+    def test_success(self):
+        self.assertTrue(self.run_main("--check-links"))
+        self.assertTrue((self.root / "docs" / "blog" / "index.html").exists())
+
+    def test_full_build_invalidates_incremental_manifest(self):
+        index = self.root / "docs" / "index.html"
+        self.assertTrue(self.run_main("--incremental"))
+        self.assertIn('href="/blog/"', index.read_text())
+        self.assertTrue(self.run_main("/site"))
+        self.assertIn('href="/site/blog/"', index.read_text())
+        self.assertEqual(json.loads((self.root / ".build" / "manifest.json").read_text())["pages"], {})
+        self.assertTrue(self.run_main("--incremental"))
+        self.assertIn('href="/blog/"', index.read_text())
+        self.assertIn('href="/index.css"', index.read_text())
+
+    def test_full_build_keeps_unchanged_mtimes(self):
+        self.assertTrue(self.run_main())
+        outputs = [self.root / "docs" / "index.html", self.root / "docs" / "blog" / "index.html", self.root / "docs" / "index.css"]
+        mtimes = [path.stat().st_mtime_ns for path in outputs]
+        self.assertTrue(self.run_main())
+        self.assertEqual([path.stat().st_mtime_ns for path in outputs], mtimes)
+
+    def test_full_build_removes_stale_outputs(self):
+        self.assertTrue(self.run_main("--fingerprint", "--gzip"))
+        (self.root / "content" / "blog" / "index.md").unlink()
+        (self.root / "docs" / "leftover.txt").write_text("stale")
+        self.assertTrue(self.run_main())
+        outputs = sorted(path.relative_to(self.root / "docs").as_posix() for path in (self.root / "docs").rglob("*"))
+        self.assertListEqual(outputs, ["index.css", "index.html"])
+
+    def test_watch_rejects_one_off_reports(self):
+        for flag in ("--check-links", "--metadata-index"):
+            with self.assertRaises(SystemExit), mock.patch("sys.stderr", io.StringIO()):
+                self.run_main("--daemon", flag)
+
+    def test_broken_links_fail(self):
+        (self.root / "content" / "index.md").write_text("# Home\n\n[Missing](/missing/)")
+        self.assertFalse(self.run_main("--check-links"))
+
+    def test_failed_build_fails(self):
+        (self.root / "template.html").unlink()
+        self.assertFalse(self.run_main())
+
+if __name__ == "__main__":
+    unittest.main()
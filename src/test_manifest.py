@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from manifest import MANIFEST_VERSION, hash_file, hash_text, load_manifest, save_manifest
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_file_matches_hash_text(self):
+        path = self.root / "page.md"
+        path.write_text("# Title")
+        self.assertEqual(hash_file(path), hash_text("# Title"))
+
+    def test_load_missing_manifest(self):
+        manifest = load_manifest(self.root / "missing.json")
+        self.assertEqual(manifest, {"version": MANIFEST_VERSION, "pages": {}, "static": {}})
+
+    def test_save_and_load_round_trip(self):
+        path = self.root / "nested" / "manifest.json"
+        manifest = {"version": MANIFEST_VERSION, "pages": {"index.html": {"source_hash": "abc"}}, "static": {}}
+        self.assertTrue(save_manifest(path, manifest))
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_load_corrupt_manifest(self):
+        path = self.root / "manifest.json"
+        path.write_text("{not json")
+        self.assertEqual(load_manifest(path)["pages"], {})
+
+    def test_load_other_version(self):
+        path = self.root / "manifest.json"
+        path.write_text('{"version": -1, "pages": {"index.html": {}}}')
+        self.assertEqual(load_manifest(path)["pages"], {})
+
+if __name__ == "__main__":
+    unittest.main()
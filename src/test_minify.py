@@ -0,0 +1,57 @@
+import unittest
+
+from block_markdown import markdown_to_html_node
+from minify import minify_chunks, minify_html
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify_html_template(self):
+        html = """<!doctype html>
+<html>
+  <head>
+    <!-- page title -->
+    <title>{{ Title }}</title>
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+        expected = "<!doctype html><html><head><title>{{ Title }}</title></head><body><article>{{ Content }}</article></body></html>"
+        self.assertEqual(minify_html(html), expected)
+
+    def test_minify_html_keeps_inline_spaces(self):
+        self.assertEqual(minify_html("<p><b>a</b>   <i>b</i>\n  text</p>"), "<p><b>a</b> <i>b</i> text</p>")
+
+    def test_minify_html_keeps_space_between_inline_lines(self):
+        self.assertEqual(minify_html("<b>Hello</b>\n  <i>world</i>"), "<b>Hello</b> <i>world</i>")
+        self.assertEqual(minify_html("<nav>\n  <a>one</a>\n  <a>two</a>\n</nav>"), "<nav><a>one</a> <a>two</a></nav>")
+
+    def test_minify_html_preserves_pre_and_script(self):
+        html = "<div>\n  <pre>  keep\n    this</pre>\n  <script>if (a  <  b) {}</script>\n</div>"
+        self.assertEqual(minify_html(html), "<div><pre>  keep\n    this</pre><script>if (a  <  b) {}</script></div>")
+
+    def test_minify_html_keeps_conditional_comments(self):
+        self.assertEqual(minify_html("<!--[if IE]><p>ie</p><![endif]--><!-- note -->"), "<!--[if IE]><p>ie</p><![endif]-->")
+
+    def test_minify_chunks(self):
+        chunks = ["<ul>", "<li>", "one   two", "</li>", "</ul>"]
+        self.assertEqual("".join(minify_chunks(chunks)), "<ul><li>one two</li></ul>")
+
+    def test_minify_chunks_matches_minify_html(self):
+        chunks = ["<p>", "one  ", "  two ", "\n", "<b>three</b>", " ", " four", "</p>", "<pre>", "<code>a  \n  b</code>", "</pre>"]
+        self.assertEqual("".join(minify_chunks(chunks)), minify_html("".join(chunks)))
+        self.assertEqual("".join(minify_chunks(chunks)), "<p>one two <b>three</b> four</p><pre><code>a  \n  b</code></pre>")
+
+    def test_minify_chunks_ignores_code_in_text(self):
+        chunks = ["<p>", "<codecs   x", "</p>", "<p>", "c   d", "</p>"]
+        self.assertEqual("".join(minify_chunks(chunks)), "<p><codecs x</p><p>c d</p>")
+
+    def test_minify_chunks_leaves_code_untouched(self):
+        md = "- spaced   item `a   b`\n\n```\nx  =  1\n\n    y\n```"
+        html = "".join(minify_chunks(markdown_to_html_node(md).iter_html()))
+        self.assertEqual(html, "<div><ul><li>spaced item <code>a   b</code></li></ul><pre><code>x  =  1\n\n    y\n</code></pre></div>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from output_writer import OutputWriter, write_output
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dest = self.root / "index.html"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def leftovers(self):
+        return [path.name for path in self.root.iterdir() if path.name.endswith(".tmp")]
+
+    def test_writes_new_file(self):
+        self.assertTrue(write_output(self.dest, "<p>hello</p>"))
+        self.assertEqual(self.dest.read_text(), "<p>hello</p>")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_identical_output_keeps_mtime(self):
+        write_output(self.dest, "<p>hello</p>")
+        os.utime(self.dest, ns=(1_000_000_000, 1_000_000_000))
+        self.assertFalse(write_output(self.dest, "<p>hello</p>"))
+        self.assertEqual(self.dest.stat().st_mtime_ns, 1_000_000_000)
+        self.assertEqual(self.leftovers(), [])
+
+    def test_changed_output_is_replaced(self):
+        write_output(self.dest, "<p>hello</p>")
+        self.assertTrue(write_output(self.dest, "<p>world</p>"))
+        self.assertEqual(self.dest.read_text(), "<p>world</p>")
+
+    def test_same_size_different_content(self):
+        write_output(self.dest, "aaaa")
+        self.assertTrue(write_output(self.dest, "bbbb"))
+        self.assertEqual(self.dest.read_text(), "bbbb")
+
+    def test_failure_leaves_existing_file(self):
+        write_output(self.dest, "<p>complete</p>")
+        with self.assertRaises(RuntimeError):
+            with OutputWriter(self.dest) as writer:
+                writer.write("<p>trunc")
+                raise RuntimeError("render failed")
+        self.assertEqual(self.dest.read_text(), "<p>complete</p>")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_streamed_chunks(self):
+        with OutputWriter(self.dest) as writer:
+            for chunk in ("<div>", "<p>a</p>", "</div>"):
+                writer.write(chunk)
+        self.assertTrue(writer.changed)
+        self.assertEqual(self.dest.read_text(), "<div><p>a</p></div>")
+        self.assertEqual(self.dest.stat().st_mode & 0o777, 0o644)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from block_markdown import markdown_to_html_node
+from generate_content import discover_pages, generate_pages
+from htmlnode import LeafNode
+from page_cache import MemoryPageCache, PageCache, data_to_node, node_to_data
+
+markdown = """# Title
+
+Some **bold** and a [link](/page)
+
+- one
+- ![image](/a.png)
+
+```
+code
+```
+"""
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache = PageCache(self.root / "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_node_data_round_trip(self):
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(data_to_node(node_to_data(node)).to_html(), node.to_html())
+
+    def test_get_miss_then_hit(self):
+        node = markdown_to_html_node(markdown)
+        self.assertIsNone(self.cache.get("abc"))
+        self.assertTrue(self.cache.put("abc", node))
+        self.assertEqual(self.cache.get("abc").to_html(), node.to_html())
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_links_stored_with_tree(self):
+        links = []
+        node = markdown_to_html_node(markdown, links=links)
+        self.assertListEqual(links, [[3, "/page"], [6, "/a.png"]])
+        self.cache.put("abc", node, links)
+        cached_node, cached_links, cached_metadata = self.cache.get_page("abc")
+        self.assertEqual(cached_node.to_html(), node.to_html())
+        self.assertListEqual(cached_links, links)
+        self.assertEqual(cached_metadata, {})
+
+    def test_metadata_stored_with_tree(self):
+        metadata = {}
+        node = markdown_to_html_node(f"---\ndate: 2024-05-01\n---\n{markdown}", metadata=metadata)
+        self.assertEqual(metadata, {"date": "2024-05-01", "title": "Title"})
+        self.cache.put("abc", node, [], metadata)
+        self.assertEqual(self.cache.get_page("abc")[2], metadata)
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("abc", markdown_to_html_node(markdown))
+        self.cache.path_for("abc").write_text("{broken")
+        self.assertIsNone(self.cache.get("abc"))
+
+    def test_evict_least_recently_used(self):
+        node = markdown_to_html_node(markdown)
+        for number, key in enumerate(["old", "middle", "new"]):
+            self.cache.put(key, node)
+            os.utime(self.cache.path_for(key), ns=(number * 10**9, number * 10**9))
+        entry_size = self.cache.path_for("old").stat().st_size
+        self.cache.max_bytes = entry_size * 2
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertFalse(self.cache.path_for("old").exists())
+        self.assertTrue(self.cache.path_for("new").exists())
+
+    def test_get_refreshes_recency(self):
+        node = markdown_to_html_node(markdown)
+        self.cache.put("first", node)
+        self.cache.put("second", node)
+        os.utime(self.cache.path_for("first"), ns=(0, 0))
+        os.utime(self.cache.path_for("second"), ns=(10**9, 10**9))
+        self.cache.get("first")
+        self.cache.max_bytes = self.cache.path_for("first").stat().st_size
+        self.cache.evict()
+        self.assertTrue(self.cache.path_for("first").exists())
+        self.assertFalse(self.cache.path_for("second").exists())
+
+    def test_clear(self):
+        self.cache.put("abc", markdown_to_html_node(markdown))
+        self.assertEqual(self.cache.clear(), 1)
+        self.assertIsNone(self.cache.get("abc"))
+
+    def test_cached_build_matches_uncached(self):
+        content = self.root / "content"
+        content.mkdir()
+        (content / "index.md").write_text(markdown)
+        template = self.root / "template.html"
+        template.write_text("<title>{{ Title }}</title>{{ Content }}")
+
+        def build(dest_name, cache):
+            dest = self.root / dest_name
+            self.assertTrue(generate_pages(discover_pages(content, dest), template, "/", cache=cache))
+            return (dest / "index.html").read_text()
+
+        uncached = build("uncached", None)
+        self.assertEqual(build("first", self.cache), uncached)
+        self.assertEqual(build("second", self.cache), uncached)
+        self.assertEqual(self.cache.hits, 1)
+
+class TestMemoryPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_evicts_least_recently_used_from_memory(self):
+        cache = MemoryPageCache(self.cache_dir, max_entries=2)
+        for name in ("a", "b", "c"):
+            cache.put(name, LeafNode("p", name), [[1, name]])
+        self.assertEqual(list(cache.memory), ["b", "c"])
+        # Still on disk
+        node, links, metadata = cache.get_page("a")
+        self.assertEqual(node.to_html(), "<p>a</p>")
+        self.assertEqual(list(cache.memory), ["c", "a"])
+        self.assertIs(cache.get_page("a")[0], node)
+
+    def test_pickles_without_memory(self):
+        cache = MemoryPageCache(self.cache_dir)
+        cache.put("a", LeafNode("p", "a"))
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(len(copy.memory), 0)
+        self.assertEqual(copy.get_page("a")[0].to_html(), "<p>a</p>")
+
+if __name__ == "__main__":
+    unittest.main()
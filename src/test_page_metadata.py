@@ -0,0 +1,35 @@
+import json
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from page_metadata import MetadataIndex
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = MetadataIndex("docs")
+        self.index.add_page("content/index.md", Path("docs/index.html"), {"title": "Home"})
+        self.index.add_page("content/blog/a.md", Path("docs/blog/a.html"), {"title": "A", "draft": "true", "tags": "x"})
+        self.index.add_page("content/blog/b.md", Path("docs/blog/b.html"), {"title": "B", "draft": "false"})
+
+    def test_metadata_for(self):
+        self.assertEqual(self.index.metadata_for("docs/blog/a.html"), {"title": "A", "draft": "true", "tags": "x"})
+
+    def test_pages_where(self):
+        self.assertListEqual(self.index.pages_where("draft"), ["/blog/a.html", "/blog/b.html"])
+        self.assertListEqual(self.index.pages_where("draft", "true"), ["/blog/a.html"])
+        self.assertListEqual(self.index.pages_where("date"), [])
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            index_path = Path(tmp) / ".build" / "page-metadata.json"
+            self.assertTrue(self.index.save(index_path))
+            saved = json.loads(index_path.read_text())
+        self.assertListEqual(list(saved), ["/blog/a.html", "/blog/b.html", "/index.html"])
+        self.assertEqual(saved["/index.html"], {"source": "content/index.md", "metadata": {"title": "Home"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
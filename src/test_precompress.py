@@ -0,0 +1,74 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from precompress import precompress_directory, precompress_files
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "blog").mkdir()
+        (self.root / "index.html").write_text("<p>home</p>" * 100)
+        (self.root / "blog" / "index.html").write_text("<p>blog</p>")
+        (self.root / "index.css").write_text("body {}")
+        (self.root / "logo.png").write_bytes(b"png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compresses_text_assets(self):
+        self.assertTrue(precompress_directory(self.root))
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), (self.root / "index.html").read_bytes())
+        self.assertTrue((self.root / "blog" / "index.html.gz").exists())
+        self.assertTrue((self.root / "index.css.gz").exists())
+        self.assertFalse((self.root / "logo.png.gz").exists())
+
+    def test_output_is_deterministic(self):
+        precompress_directory(self.root)
+        first = (self.root / "index.html.gz").read_bytes()
+        (self.root / "index.html.gz").unlink()
+        precompress_directory(self.root)
+        self.assertEqual((self.root / "index.html.gz").read_bytes(), first)
+
+    def test_only_changed_files_recompressed(self):
+        precompress_directory(self.root)
+        (self.root / "index.css.gz").write_bytes(b"marker")
+        stat = (self.root / "index.css").stat()
+        os.utime(self.root / "index.css.gz", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        (self.root / "index.html").write_text("<p>changed</p>")
+        os.utime(self.root / "index.html", ns=(0, 10**9))
+        precompress_directory(self.root)
+        self.assertEqual((self.root / "index.css.gz").read_bytes(), b"marker")
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), b"<p>changed</p>")
+
+    def test_stale_gz_removed(self):
+        precompress_directory(self.root)
+        (self.root / "blog" / "index.html").unlink()
+        precompress_directory(self.root)
+        self.assertFalse((self.root / "blog" / "index.html.gz").exists())
+        self.assertTrue((self.root / "index.html.gz").exists())
+
+    def test_precompress_files(self):
+        precompress_directory(self.root)
+        (self.root / "index.html").write_text("<p>edited</p>")
+        (self.root / "blog" / "index.html").unlink()
+        (self.root / "index.css").write_text("body { margin: 0; }")
+        with redirect_stdout(StringIO()):
+            self.assertTrue(precompress_files([self.root / "index.html", self.root / "blog" / "index.html"]))
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), b"<p>edited</p>")
+        self.assertFalse((self.root / "blog" / "index.html.gz").exists())
+        # Files that weren't named are left for the next full pass
+        self.assertEqual(gzip.decompress((self.root / "index.css.gz").read_bytes()), b"body {}")
+
+    def test_missing_directory(self):
+        self.assertFalse(precompress_directory(self.root / "missing"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import tempfile
+import unittest
+
+from pathlib import Path
+
+import profiler
+
+from generate_content import discover_pages, generate_pages
+from profiler import BuildProfiler, page_stages
+
+class TestBuildProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.content.mkdir()
+        (self.content / "index.md").write_text("# Home\n\nSome **bold** text\n\n- a [link](/x)")
+        (self.content / "other.md").write_text("# Other\n\n```\ncode\n```")
+        self.template = self.root / "template.html"
+        self.template.write_text('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+
+    def tearDown(self):
+        profiler.current = None
+        self.tmp.cleanup()
+
+    def build(self, dest_name: str) -> dict:
+        dest = self.root / dest_name
+        self.assertTrue(generate_pages(discover_pages(self.content, dest), self.template, "/site"))
+        return {path.name: path.read_text() for path in dest.iterdir()}
+
+    def profiled_build(self) -> tuple:
+        build_profiler = BuildProfiler()
+        build_profiler.start()
+        try:
+            pages = self.build("profiled")
+        finally:
+            build_profiler.stop()
+        return build_profiler, pages
+
+    def test_profiled_output_matches_streaming(self):
+        _, pages = self.profiled_build()
+        self.assertEqual(pages, self.build("streamed"))
+
+    def test_records_every_page_and_stage(self):
+        build_profiler, _ = self.profiled_build()
+        self.assertIsNone(profiler.current)
+        self.assertEqual(len(build_profiler.pages), 2)
+        for page in build_profiler.pages:
+            self.assertTrue(set(page["stages"]) <= set(page_stages))
+            self.assertIn("to_html", page["stages"])
+            self.assertGreater(page["peak_bytes"], 0)
+        self.assertGreater(build_profiler.stage_totals()["text_to_text_nodes"], 0)
+
+    def test_summary(self):
+        build_profiler, _ = self.profiled_build()
+        summary = build_profiler.summary(top=1)
+        self.assertIn("Profiled 2 page(s)", summary)
+        self.assertIn("Slowest 1 page(s):", summary)
+
+    def test_write_chrome_trace(self):
+        build_profiler, _ = self.profiled_build()
+        trace_path = self.root / "trace" / "trace.json"
+        self.assertTrue(build_profiler.write_chrome_trace(trace_path))
+        with open(trace_path) as trace_file:
+            trace = json.load(trace_file)
+        names = {event["name"] for event in trace["traceEvents"]}
+        self.assertIn("markdown_to_blocks", names)
+        self.assertTrue(all(event["ph"] == "X" for event in trace["traceEvents"]))
+
+if __name__ == "__main__":
+    unittest.main()
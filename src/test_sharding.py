@@ -0,0 +1,93 @@
+import json
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from generate_content import discover_pages, generate_pages_recursive
+from page_metadata import MetadataIndex
+from site_index import SiteIndex
+from sharding import merge_shards, parse_shard, shard_dest_path, shard_of, shard_pages, write_shard_manifest
+
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.template = self.root / "template.html"
+        self.dest = self.root / "docs"
+        for i in range(12):
+            (self.content / f"post{i}").mkdir(parents=True)
+            (self.content / f"post{i}" / "index.md").write_text(f"# Post {i}\n\nText")
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_shard(self, shard: tuple, metadata: bool=False) -> Path:
+        shard_dir = shard_dest_path(self.dest, shard)
+        metadata_index = MetadataIndex(shard_dir) if metadata else None
+        self.assertTrue(generate_pages_recursive(self.content, self.template, shard_dir, "/", site_index=SiteIndex(metadata=metadata_index), shard=shard))
+        all_pages = discover_pages(self.content, shard_dir)
+        all_keys = [dest_path.relative_to(shard_dir).as_posix() for _, dest_path in all_pages]
+        pages = None if metadata_index is None else metadata_index.pages
+        self.assertTrue(write_shard_manifest(shard_dir, shard, shard_pages(all_pages, shard_dir, shard), all_keys, pages))
+        return shard_dir
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("1/4"), (1, 4))
+        for text in ("4/4", "-1/2", "1", "a/b", "0/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_partition_is_deterministic_and_complete(self):
+        pages = discover_pages(self.content, self.dest)
+        slices = [shard_pages(pages, self.dest, (index, 3)) for index in range(3)]
+        self.assertEqual(sorted(page for pages in slices for page in pages), sorted(pages))
+        self.assertEqual(shard_of("post1/index.html", 3), shard_of("post1/index.html", 3))
+
+    def test_merge(self):
+        shard_dirs = [self.build_shard((index, 3)) for index in range(3)]
+        self.assertTrue(merge_shards(shard_dirs, self.dest))
+        self.assertEqual(len(list(self.dest.rglob("*.html"))), 12)
+        self.assertFalse((self.dest / "shard-manifest.json").exists())
+
+    def test_merge_metadata_index(self):
+        shard_dirs = [self.build_shard((index, 3), metadata=True) for index in range(3)]
+        index_path = self.root / ".build" / "page-metadata.json"
+        self.assertTrue(merge_shards(shard_dirs, self.dest, metadata_index_path=index_path))
+        pages = json.loads(index_path.read_text())
+        self.assertEqual(len(pages), 12)
+        self.assertEqual(pages["/post3/index.html"]["metadata"], {"title": "Post 3"})
+
+    def test_merge_removes_stale_metadata_index(self):
+        shard_dirs = [self.build_shard((0, 2), metadata=True), self.build_shard((1, 2))]
+        index_path = self.root / "page-metadata.json"
+        index_path.write_text("{}")
+        self.assertTrue(merge_shards(shard_dirs, self.dest, metadata_index_path=index_path))
+        self.assertFalse(index_path.exists())
+
+    def test_merge_fails_on_gap(self):
+        shard_dirs = [self.build_shard((index, 3)) for index in range(2)]
+        self.assertFalse(merge_shards(shard_dirs, self.dest))
+        self.assertFalse(self.dest.exists())
+
+    def test_merge_fails_on_overlap(self):
+        shard_dirs = [self.build_shard((index, 2)) for index in range(2)]
+        (shard_dirs[1] / "extra.css").write_text("")
+        self.assertFalse(merge_shards(shard_dirs, self.dest))
+        # Listed in both manifests
+        (shard_dirs[0] / "extra.css").write_text("")
+        for index, shard_dir in enumerate(shard_dirs):
+            all_pages = discover_pages(self.content, shard_dir)
+            all_keys = [dest_path.relative_to(shard_dir).as_posix() for _, dest_path in all_pages]
+            write_shard_manifest(shard_dir, (index, 2), shard_pages(all_pages, shard_dir, (index, 2)), all_keys)
+        self.assertFalse(merge_shards(shard_dirs, self.dest))
+
+    def test_merge_fails_on_mismatched_counts(self):
+        shard_dirs = [self.build_shard((0, 2)), self.build_shard((1, 3))]
+        self.assertFalse(merge_shards(shard_dirs, self.dest))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from link_checker import LinkIndex
+from page_metadata import MetadataIndex
+from site_index import SiteIndex
+
+class TestSiteIndex(unittest.TestCase):
+    def test_add_page_fills_both_indexes(self):
+        index = SiteIndex(LinkIndex("docs"), MetadataIndex("docs"))
+        index.add_page("content/index.md", "docs/index.html", [[3, "/blog/"]], {"title": "Home"})
+        self.assertEqual(index.links.links_for("content/index.md"), [[3, "/blog/"]])
+        self.assertEqual(index.metadata.metadata_for("docs/index.html"), {"title": "Home"})
+
+    def test_missing_indexes_are_skipped(self):
+        index = SiteIndex(metadata=MetadataIndex("docs"))
+        index.add_page("content/index.md", "docs/index.html", [[3, "/blog/"]], {"title": "Home"})
+        self.assertIsNone(index.links)
+        self.assertEqual(index.metadata.pages_where("title"), ["/index.html"])
+
+if __name__ == "__main__":
+    unittest.main()
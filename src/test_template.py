@@ -0,0 +1,91 @@
+import io
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from template import compile_template, load_template
+from url_resolver import UrlResolver
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertListEqual(template.segments, ["<title>", "</title><article>", "</article>"])
+        self.assertListEqual(template.slots, ["Title", "Content"])
+
+    def test_compile_hyphenated_slot(self):
+        template = compile_template("<time>{{ last-modified }}</time>")
+        self.assertListEqual(template.slots, ["last-modified"])
+
+    def test_compile_no_placeholders(self):
+        template = compile_template("<p>static</p>")
+        self.assertListEqual(template.segments, ["<p>static</p>"])
+        self.assertListEqual(template.slots, [])
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        html = template.render({"Title": "Home", "Content": "<p>Hi</p>"})
+        self.assertEqual(html, "<title>Home</title><p>Hi</p>")
+
+    def test_render_repeated_placeholder(self):
+        template = compile_template("{{ Title }} | {{ Title }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home | Home")
+
+    def test_iter_render_streams_chunks(self):
+        template = compile_template("<article>{{ Content }}</article>")
+        chunks = list(template.iter_render({"Content": iter(["<p>", "Hi", "</p>"])}))
+        self.assertListEqual(chunks, ["<article>", "<p>", "Hi", "</p>", "</article>"])
+
+    def test_write(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        stream = io.StringIO()
+        template.write(stream, {"Title": "Home", "Content": ["<p>", "Hi", "</p>"]})
+        self.assertEqual(stream.getvalue(), "<title>Home</title><p>Hi</p>")
+
+    def test_render_missing_value_left_verbatim(self):
+        template = compile_template("<p>{{ Unknown }}</p>")
+        self.assertEqual(template.render({}), "<p>{{ Unknown }}</p>")
+
+    def test_basepath_rewritten_at_compile_time(self):
+        template = compile_template('<link href="/index.css"><img src="/logo.png">{{ Content }}', "/site")
+        self.assertEqual(template.segments[0], '<link href="/site/index.css"><img src="/site/logo.png">')
+        # Slot values are not touched by the template
+        self.assertEqual(template.render({"Content": '<a href="/x">'}), '<link href="/site/index.css"><img src="/site/logo.png"><a href="/x">')
+
+    def test_root_basepath_leaves_urls_alone(self):
+        template = compile_template('<link href="/index.css">{{ Content }}', "/")
+        self.assertEqual(template.segments[0], '<link href="/index.css">')
+
+    def test_compile_with_resolver(self):
+        resolver = UrlResolver("/site", {"/index.css": "/index.abc123.css"})
+        template = compile_template('<link href="/index.css">{{ Content }}', "/site", resolver=resolver)
+        self.assertEqual(template.segments[0], '<link href="/site/index.abc123.css">')
+        self.assertIs(template.resolver, resolver)
+
+    def test_compile_minified(self):
+        template = compile_template('<html>\n  <head>\n    <link href="/index.css" />\n  </head>\n  <body>{{ Content }}</body>\n</html>\n', "/site", minify=True)
+        self.assertTrue(template.minify)
+        self.assertEqual(template.render({"Content": "x"}), '<html><head><link href="/site/index.css" /></head><body>x</body></html>')
+
+    def test_compile_non_str(self):
+        with self.assertRaises(TypeError):
+            compile_template(None)
+
+    def test_load_template_missing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(load_template(Path(tmp) / "missing.html"))
+
+    def test_load_template_reuses_compiled_template(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "template.html"
+            path.write_text('<a href="/">{{ Title }}</a>')
+            template = load_template(path, "/site")
+            self.assertIs(load_template(path, "/site"), template)
+            self.assertIsNot(load_template(path, "/other"), template)
+            self.assertIsNot(load_template(path, "/other", minify=True), load_template(path, "/other"))
+            path.write_text('<b>{{ Title }}</b>')
+            self.assertEqual(load_template(path, "/site").render({"Title": "x"}), "<b>x</b>")
+
+if __name__ == "__main__":
+    unittest.main()
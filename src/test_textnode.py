@@ -51,5 +51,9 @@ class TestTextNode(unittest.TestCase):
         expected_repr = "TextNode(Sample text, TextType.CODE, None)"
         self.assertEqual(repr(node), expected_repr)
 
+    def test_slots_no_instance_dict(self):
+        node = TextNode("Sample text", TextType.PLAIN)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
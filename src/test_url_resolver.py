@@ -0,0 +1,49 @@
+import unittest
+
+from pathlib import Path
+
+from url_resolver import UrlResolver
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_resolve_site_absolute(self):
+        resolver = UrlResolver("/site")
+        self.assertEqual(resolver.resolve("/blog/"), "/site/blog/")
+        self.assertEqual(resolver.resolve("/"), "/site/")
+
+    def test_resolve_root_basepath(self):
+        self.assertEqual(UrlResolver("/").resolve("/blog"), "/blog")
+        self.assertEqual(UrlResolver(Path("/")).resolve("/blog"), "/blog")
+
+    def test_trailing_slash_basepath(self):
+        self.assertEqual(UrlResolver("/site/").resolve("/blog"), "/site/blog")
+
+    def test_other_urls_untouched(self):
+        resolver = UrlResolver("/site")
+        for url in ("https://example.com/", "//cdn.example.com/a.js", "images/a.png", "#top", "mailto:a@example.com"):
+            self.assertEqual(resolver.resolve(url), url)
+
+    def test_rewrites_applied_before_basepath(self):
+        resolver = UrlResolver("/site", {"/index.css": "/index.abc123.css"})
+        self.assertEqual(resolver.resolve("/index.css"), "/site/index.abc123.css")
+        self.assertEqual(resolver.resolve("/other.css"), "/site/other.css")
+
+    def test_resolve_props(self):
+        resolver = UrlResolver("/site")
+        props = {"src": "/a.png", "alt": "/not-a-url"}
+        self.assertEqual(resolver.resolve_props("img", props), {"src": "/site/a.png", "alt": "/not-a-url"})
+        self.assertEqual(props["src"], "/a.png")
+        plain = {"class": "x"}
+        self.assertIs(resolver.resolve_props("span", plain), plain)
+
+    def test_resolve_markup(self):
+        resolver = UrlResolver("/site")
+        html = '<link href="/index.css"><img src="/a.png" alt="x"><a data-href="/no">'
+        self.assertEqual(resolver.resolve_markup(html), '<link href="/site/index.css"><img src="/site/a.png" alt="x"><a data-href="/no">')
+
+    def test_invalid_basepath(self):
+        with self.assertRaises(TypeError):
+            UrlResolver(None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from generate_content import generate_pages_incremental
+from watch import Watcher, changed_paths, refresh_snapshot, serve, snapshot_directories, snapshot_paths
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.static = root / "static"
+        self.dest = root / "docs"
+        self.template = root / "template.html"
+        self.content.mkdir()
+        self.static.mkdir()
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "other.md").write_text("# Other\n\nPage")
+        (self.static / "index.css").write_text("body {}")
+        self.template.write_text("<title>{{ Title }}</title>{{ Content }}")
+        self.watcher = Watcher(self.content, self.static, self.template, self.dest, "/", root / ".build" / "manifest.json")
+        self.assertTrue(self.watcher.build())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, path: Path, text: str):
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_changed_paths(self):
+        old_snapshot = {Path("a"): (1, 1), Path("b"): (1, 1), Path("c"): (1, 1)}
+        new_snapshot = {Path("a"): (1, 1), Path("b"): (2, 1), Path("d"): (1, 1)}
+        self.assertEqual(changed_paths(old_snapshot, new_snapshot), {Path("b"), Path("c"), Path("d")})
+
+    def test_snapshot_paths(self):
+        snapshot = snapshot_paths([self.content, self.template])
+        self.assertEqual(set(snapshot), {self.content / "index.md", self.content / "other.md", self.template})
+
+    def test_refresh_snapshot_lists_only_changed_directories(self):
+        (self.content / "blog").mkdir()
+        snapshot = snapshot_paths([self.content])
+        directories = snapshot_directories([self.content])
+        self.assertEqual(set(directories), {self.content, self.content / "blog"})
+        (self.content / "blog" / "new").mkdir()
+        (self.content / "blog" / "new" / "post.md").write_text("# Post")
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        (self.content / "other.md").unlink()
+        walked = []
+        rglob = Path.rglob
+        def record_rglob(path, pattern):
+            walked.append(path)
+            return rglob(path, pattern)
+        with mock.patch.object(Path, "rglob", record_rglob):
+            changed = refresh_snapshot(snapshot, directories)
+        self.assertEqual(changed, {self.content / "blog" / "new" / "post.md", self.content / "index.md", self.content / "other.md"})
+        # Only the new directory is walked
+        self.assertEqual(set(walked), {self.content / "blog" / "new"})
+        self.assertEqual(snapshot, snapshot_paths([self.content]))
+        self.assertEqual(refresh_snapshot(snapshot, directories), set())
+
+    def test_poll_named_paths(self):
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        self.touch(self.content / "other.md", "# Other\n\nEdited")
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(self.watcher.poll([(self.content / "index.md").resolve(), "/elsewhere/file.md"]), {self.content / "index.md"})
+        self.assertEqual(self.watcher.poll(), {self.content / "other.md"})
+
+    def test_content_change_skips_discovery(self):
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        (self.content / "new.md").write_text("# New")
+        (self.content / "other.md").unlink()
+        with mock.patch("generate_content.discover_pages", side_effect=AssertionError("rediscovered")):
+            self.assertTrue(self.watcher.rebuild(self.watcher.poll()))
+            self.touch(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+            self.assertTrue(self.watcher.rebuild(self.watcher.poll()))
+        self.assertEqual((self.dest / "index.html").read_text(), "<h1>Home</h1><div><h1>Home</h1><p>Edited</p></div>")
+        self.assertTrue((self.dest / "new.html").read_text().startswith("<h1>New</h1>"))
+        self.assertFalse((self.dest / "other.html").exists())
+        # A fresh incremental build agrees with the manifest the watcher saved
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertTrue(generate_pages_incremental(self.content, self.template, self.dest, "/", self.watcher.manifest_path))
+        self.assertIn("Regenerated 0 page(s), 2 unchanged.", output.getvalue())
+
+    def test_content_change_rebuilds_only_that_page(self):
+        (self.dest / "other.html").write_text("untouched")
+        self.touch(self.content / "index.md", "# Home\n\nEdited")
+        changed = self.watcher.poll()
+        self.assertEqual(changed, {self.content / "index.md"})
+        self.assertTrue(self.watcher.rebuild(changed))
+        self.assertIn("Edited", (self.dest / "index.html").read_text())
+        self.assertEqual((self.dest / "other.html").read_text(), "untouched")
+
+    def test_template_change_rebuilds_everything(self):
+        self.touch(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertTrue(self.watcher.rebuild(self.watcher.poll()))
+        self.assertTrue((self.dest / "index.html").read_text().startswith("<h1>Home</h1>"))
+        self.assertTrue((self.dest / "other.html").read_text().startswith("<h1>Other</h1>"))
+
+    def test_static_change_is_synced(self):
+        self.touch(self.static / "index.css", "body { margin: 0; }")
+        self.assertTrue(self.watcher.rebuild(self.watcher.poll()))
+        self.assertEqual((self.dest / "index.css").read_text(), "body { margin: 0; }")
+
+    def test_build_options_apply_to_rebuilds(self):
+        (self.static / "logo.png").write_bytes(b"png")
+        (self.content / "index.md").write_text("# Home\n\n![logo](/logo.png)")
+        root = Path(self.tmp.name)
+        watcher = Watcher(self.content, self.static, self.template, self.dest, "/", root / ".build" / "manifest.json", fingerprint=True, minify=True, gzip=True)
+        self.assertTrue(watcher.build())
+        self.assertRegex((self.dest / "index.html").read_text(), r'src="/logo\.[0-9a-f]+\.png"')
+        self.touch(self.content / "index.md", "# Home\n\nEdited   text")
+        self.assertTrue(watcher.rebuild(watcher.poll()))
+        html = (self.dest / "index.html").read_text()
+        self.assertIn("<p>Edited text</p>", html)
+        self.assertEqual(gzip.decompress((self.dest / "index.html.gz").read_bytes()).decode(), html)
+
+    def test_rebuild_failure_is_reported(self):
+        self.touch(self.content / "index.md", "# Home\n\nUnterminated **bold")
+        self.assertFalse(self.watcher.rebuild(self.watcher.poll()))
+
+    def test_serve(self):
+        server = serve(self.dest, port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://localhost:{port}/index.html") as response:
+                self.assertIn(b"<title>Home</title>", response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str=None):
         if not isinstance(text_type, TextType):
             raise TypeError("text_type must be a valid TextType")
@@ -0,0 +1,74 @@
+import json
+import re
+
+from pathlib import Path
+
+from manifest import hash_text
+
+# Attributes that carry a URL
+url_attributes = ("href", "src")
+attribute_pattern = re.compile(r'(?<![\w-])(href|src)="([^"]*)"')
+
+
+class UrlResolver:
+    # Turns the URLs written in content and templates into the URLs the built site serves.
+    # `rewrites` maps exact site-absolute URLs to replacements (e.g. fingerprinted asset
+    # names) and is applied first; any remaining site-absolute URL ("/...") is then
+    # prefixed with the basepath. Relative, external and protocol-relative ("//host")
+    # URLs are left as written.
+    # `image_sizes` maps site-absolute image URLs to (width, height); when given, every
+    # rendered <img> also gets width/height (if known) and lazy-loading attributes.
+    def __init__(self, basepath: str | Path="/", rewrites: dict=None, image_sizes: dict=None):
+        if not isinstance(basepath, (str, Path)):
+            raise TypeError("basepath must be a string or Path object.")
+        self.basepath = Path(basepath)
+        self.prefix = Path(basepath).as_posix().rstrip("/")
+        self.rewrites = rewrites if rewrites is not None else {}
+        self.image_sizes = image_sizes
+
+    def fingerprint(self) -> str:
+        # Changes whenever the resolver would render some URL or image differently
+        config = {
+            "basepath": self.prefix,
+            "rewrites": self.rewrites,
+            "image_sizes": None if self.image_sizes is None else {url: list(size) for url, size in self.image_sizes.items()},
+        }
+        return hash_text(json.dumps(config, sort_keys=True))
+
+    def resolve(self, url: str) -> str:
+        url = self.rewrites.get(url, url)
+        if url.startswith("/") and not url.startswith("//"):
+            return self.prefix + url
+        return url
+
+    def resolve_props(self, tag: str, props: dict) -> dict:
+        # Returns props with URL attributes resolved; the node's own dict is never modified
+        if tag == "img" and self.image_sizes is not None:
+            return self.resolve_image_props(props)
+        if not any(name in props for name in url_attributes):
+            return props
+        resolved = dict(props)
+        for name in url_attributes:
+            if name in resolved:
+                resolved[name] = self.resolve(resolved[name])
+        return resolved
+
+    def resolve_image_props(self, props: dict) -> dict:
+        # Sizes are looked up by the URL as written, before rewrites and the basepath
+        resolved = dict(props)
+        if "src" in props:
+            resolved["src"] = self.resolve(props["src"])
+            size = self.image_sizes.get(props["src"])
+            if size is not None:
+                resolved.setdefault("width", str(size[0]))
+                resolved.setdefault("height", str(size[1]))
+        resolved.setdefault("loading", "lazy")
+        resolved.setdefault("decoding", "async")
+        return resolved
+
+    def resolve_markup(self, html: str) -> str:
+        # Rewrites href/src attributes in hand-written markup, such as a template
+        return attribute_pattern.sub(lambda match: f'{match.group(1)}="{self.resolve(match.group(2))}"', html)
+
+    def __repr__(self):
+        return f"UrlResolver(basepath={self.basepath}, rewrites={len(self.rewrites)}, image_sizes={self.image_sizes is not None})"
@@ -0,0 +1,270 @@
+import threading
+import time
+
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import inline_memo
+
+from copy_static import link_modes, load_asset_urls, sync_directory
+from generate_content import generate_pages_incremental, page_dest_path, page_inputs, update_pages
+from image_size import measure_images
+from manifest import load_manifest, save_manifest
+from page_cache import PageCache
+from precompress import precompress_directory, precompress_files
+from template import Template, load_template
+from url_resolver import UrlResolver
+
+
+def snapshot_paths(paths: list) -> dict:
+    # Maps every file under the given files/directories to its (mtime_ns, size)
+    snapshot = {}
+    for path in paths:
+        path = Path(path)
+        files = [path] if path.is_file() else path.rglob("*")
+        for file in files:
+            try:
+                stat = file.stat()
+            except FileNotFoundError: # deleted while walking
+                continue
+            if file.is_file():
+                snapshot[file] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+# File timestamps advance in coarse ticks, so a directory modified this recently could be
+# modified again without its mtime changing; it is listed again on every refresh until
+# its mtime is old enough to trust (git treats "racily clean" files the same way)
+racy_window_ns = 2 * 10**9
+
+def directory_mtime(directory: Path) -> int | None:
+    mtime_ns = directory.stat().st_mtime_ns
+    return None if time.time_ns() - mtime_ns < racy_window_ns else mtime_ns
+
+def snapshot_directories(paths: list) -> dict:
+    # Maps every directory under the given paths (themselves included) to its mtime_ns,
+    # which changes whenever an entry is added to, removed from or renamed in it
+    directories = {}
+    for path in paths:
+        path = Path(path)
+        if not path.is_dir():
+            continue
+        for directory in [path, *path.rglob("*")]:
+            try:
+                if directory.is_dir():
+                    directories[directory] = directory_mtime(directory)
+            except FileNotFoundError: # deleted while walking
+                continue
+    return directories
+
+def changed_paths(old_snapshot: dict, new_snapshot: dict) -> set:
+    changed = {path for path, stat in new_snapshot.items() if old_snapshot.get(path) != stat}
+    return changed | (old_snapshot.keys() - new_snapshot.keys())
+
+def refresh_snapshot(snapshot: dict, directories: dict) -> set:
+    # Brings both maps up to date in place without walking the trees again: every tracked
+    # file is stat'ed, and only the directories whose mtime changed are listed, to find
+    # new files and subdirectories. Returns the files added, changed or removed.
+    changed = set()
+    for file, old_stat in list(snapshot.items()):
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            del snapshot[file]
+            changed.add(file)
+            continue
+        if (stat.st_mtime_ns, stat.st_size) != old_stat:
+            snapshot[file] = (stat.st_mtime_ns, stat.st_size)
+            changed.add(file)
+    for directory, mtime_ns in list(directories.items()):
+        try:
+            new_mtime_ns = directory_mtime(directory)
+        except FileNotFoundError:
+            del directories[directory]
+            continue
+        if mtime_ns is not None and new_mtime_ns == mtime_ns:
+            continue
+        directories[directory] = new_mtime_ns
+        for entry in directory.iterdir():
+            if entry in directories:
+                continue
+            directories.update(snapshot_directories([entry]))
+            # Files can already be tracked if a build request named them
+            added = {file: stat for file, stat in snapshot_paths([entry]).items() if snapshot.get(file) != stat}
+            snapshot.update(added)
+            changed.update(added)
+    return changed
+
+def update_snapshot(snapshot: dict, paths: list) -> set:
+    # Like refresh_snapshot, but only looks at the given files and directories, for
+    # callers that already know what changed. Returns the files added, changed or removed.
+    changed = set()
+    for path in paths:
+        if path in snapshot:
+            old = {path: snapshot[path]}
+        else:
+            old = {file: stat for file, stat in snapshot.items() if is_within(file, path)}
+        new = snapshot_paths([path])
+        for file in old.keys() - new.keys():
+            del snapshot[file]
+        snapshot.update(new)
+        changed |= changed_paths(old, new)
+    return changed
+
+def is_within(path: Path, directory: Path) -> bool:
+    return path == directory or directory in path.parents
+
+
+class Watcher:
+    # Polls content, static and the template, and rebuilds only what a change affects:
+    # static changes re-sync assets, content changes regenerate the changed pages, and a
+    # template change regenerates every page (the manifest's template hash changes).
+    # The remaining options match main.py's --link, --sync-hash, --fingerprint, --minify,
+    # --image-sizes and --gzip, so every build equals an --incremental build with them.
+    # Between builds it holds the snapshot, the manifest and the compiled template, so a
+    # content or template change is rebuilt without walking or rediscovering the site.
+    def __init__(self, content_dir_path: str | Path, static_dir_path: str | Path, template_path: str | Path, dest_dir_path: str | Path, basepath: str | Path, manifest_path: str | Path, jobs: int=1, cache: PageCache | None=None, link_mode: str="copy", use_hash: bool=False, fingerprint: bool=False, minify: bool=False, image_sizes_path: str | Path | None=None, gzip: bool=False):
+        if link_mode not in link_modes:
+            raise ValueError(f"link_mode must be one of {', '.join(link_modes)}.")
+        self.content_dir_path = Path(content_dir_path)
+        self.static_dir_path = Path(static_dir_path)
+        self.template_path = Path(template_path)
+        self.dest_dir_path = Path(dest_dir_path)
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.jobs = jobs
+        self.cache = cache
+        self.link_mode = link_mode
+        self.use_hash = use_hash
+        self.fingerprint = fingerprint
+        self.minify = minify
+        self.image_sizes_path = image_sizes_path
+        self.gzip = gzip
+        self.image_sizes = None
+        # Loaded on the first build that needs them, and dropped when a full build
+        # rewrites the manifest on disk
+        self.manifest = None
+        self.template = None
+        self.page_inputs = None
+        self.snapshot = snapshot_paths([self.content_dir_path, self.static_dir_path, self.template_path])
+        self.directories = snapshot_directories([self.content_dir_path, self.static_dir_path])
+
+    def poll(self, paths: list | None=None) -> set:
+        # Returns the watched files changed since the last poll. With `paths` (the files or
+        # directories the caller knows changed), only those are looked at.
+        if paths is None:
+            # The template is in no tracked directory, so a recreated one is only found by name
+            return refresh_snapshot(self.snapshot, self.directories) | update_snapshot(self.snapshot, [self.template_path])
+        tracked = []
+        for path in paths:
+            tracked_path = self.tracked_path(path)
+            if tracked_path is None:
+                print(f"Ignoring '{path}': not in '{self.content_dir_path}', '{self.static_dir_path}' or '{self.template_path}'.")
+            else:
+                tracked.append(tracked_path)
+        return update_snapshot(self.snapshot, tracked)
+
+    def tracked_path(self, path: str | Path) -> Path | None:
+        # The path as the snapshot spells it (relative or absolute, like the watched roots)
+        path = Path(path).resolve()
+        for root in (self.template_path, self.content_dir_path, self.static_dir_path):
+            if is_within(path, root.resolve()):
+                return root / path.relative_to(root.resolve())
+        return None
+
+    def build(self, sync_static: bool=True, generate_pages: bool=True) -> bool:
+        success = True
+        if sync_static:
+            success = sync_directory(self.static_dir_path, self.dest_dir_path, self.manifest_path, self.use_hash, self.link_mode, fingerprint=self.fingerprint)
+            # Fingerprinted names and image sizes end up in every page
+            generate_pages = generate_pages or self.fingerprint or self.image_sizes_path is not None
+        if success and generate_pages:
+            template = self.load_template(measure=sync_static or self.image_sizes is None)
+            success = template is not None and generate_pages_incremental(self.content_dir_path, template, self.dest_dir_path, self.basepath, self.manifest_path, self.jobs, cache=self.cache)
+        if success and self.gzip:
+            success = precompress_directory(self.dest_dir_path)
+        self.manifest = None
+        self.template = None
+        if inline_memo.current is not None:
+            print(inline_memo.current.summary())
+        return success
+
+    def update_pages(self, changed_sources: list, template_changed: bool) -> bool:
+        # Regenerates only what changed sources or a template change affect, using the
+        # manifest and template held in memory instead of rediscovering the content tree.
+        # Static files are untouched, so fingerprinted URLs and image sizes still hold.
+        if self.manifest is None:
+            self.manifest = load_manifest(self.manifest_path)
+        if self.template is None or template_changed:
+            self.template = self.load_template(measure=self.image_sizes is None)
+            if self.template is None:
+                return False
+            self.page_inputs = page_inputs(self.template, self.basepath)
+
+        manifest_pages = self.manifest["pages"]
+        pages = {}
+        removed_keys = set()
+        # A template change can affect any page, and pages a failed build didn't
+        # regenerate (their entries have no links yet) are retried
+        for key, entry in manifest_pages.items():
+            if template_changed or "links" not in entry:
+                pages[key] = (Path(entry["source"]), self.dest_dir_path / key)
+        for from_path in changed_sources:
+            dest_dir_path = self.dest_dir_path / from_path.relative_to(self.content_dir_path).parent
+            dest_path = page_dest_path(from_path, dest_dir_path)
+            key = dest_path.relative_to(self.dest_dir_path).as_posix()
+            if from_path.is_file():
+                pages[key] = (from_path, dest_path)
+            elif key in manifest_pages:
+                pages.pop(key, None)
+                removed_keys.add(key)
+
+        regenerated = update_pages(manifest_pages, list(pages.values()), removed_keys, self.template, self.dest_dir_path, self.basepath, self.jobs, cache=self.cache, inputs=self.page_inputs)
+        # Saved even after a failure: pages written before it must not look up to date
+        success = save_manifest(self.manifest_path, self.manifest) and regenerated is not None
+        if success and self.gzip:
+            success = precompress_files([dest_path for _, dest_path in regenerated] + [self.dest_dir_path / key for key in removed_keys])
+        if inline_memo.current is not None:
+            print(inline_memo.current.summary())
+        return success
+
+    def load_template(self, measure: bool=True) -> Template | None:
+        # Images are only re-measured when static files may have changed
+        asset_urls = load_asset_urls(self.dest_dir_path) if self.fingerprint else None
+        if self.image_sizes_path is not None and measure:
+            self.image_sizes = measure_images(self.static_dir_path, self.image_sizes_path)
+        return load_template(self.template_path, self.basepath, UrlResolver(self.basepath, asset_urls, self.image_sizes), self.minify)
+
+    def rebuild(self, changed: set) -> bool:
+        sync_static = any(is_within(path, self.static_dir_path) for path in changed)
+        changed_sources = sorted(path for path in changed if is_within(path, self.content_dir_path))
+        template_changed = self.template_path in changed
+        if not (sync_static or changed_sources or template_changed):
+            return True
+        for path in sorted(changed):
+            print(f"Changed: {path}")
+        try:
+            if sync_static:
+                return self.build(sync_static, bool(changed_sources) or template_changed)
+            return self.update_pages(changed_sources, template_changed)
+        except Exception as e:
+            # Keep watching; the next save will usually fix it
+            print(f"Rebuild failed: {type(e).__name__}: {e}")
+            return False
+
+    def run(self, interval: float=0.5):
+        print(f"Watching '{self.content_dir_path}', '{self.static_dir_path}' and '{self.template_path}' for changes. Press Ctrl+C to stop.")
+        while True:
+            time.sleep(interval)
+            changed = self.poll()
+            if changed:
+                self.rebuild(changed)
+
+def serve(directory: str | Path, port: int=8888) -> ThreadingHTTPServer:
+    # Serves `directory` from a background thread; call shutdown() on the result to stop it
+    handler = partial(SimpleHTTPRequestHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving '{directory}' at http://localhost:{server.server_address[1]}/")
+    return server